@@ -0,0 +1,162 @@
+# Python imports
+import argparse
+import json
+import time
+
+# App imports
+from src.conf.logger import Trace
+from src.adapters.candle_store import CandleStore
+from src.adapters.exchange import Exchange
+from src.conf.settings import (
+    API_KEY,
+    API_SECRET,
+    API_URL,
+    ASSET_WATCHLIST,
+    INITIAL_ASSET,
+    CANDLE_STORE_PATH,
+)
+from src.domain.backtest.services import BacktestDomainServices
+from src.domain.backtest.value_objects import BacktestConfig
+from src.application.backtest.services import BacktestApplicationServices
+from src.application.backtest.optimizer import (
+    SWEEP_METRICS,
+    ParameterSweepApplicationServices,
+)
+
+# Logger initialization
+logger = Trace(__name__).logger
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def load_history(args: argparse.Namespace):
+    """Load the price history from the exchange, or generate a synthetic one"""
+    if args.synthetic:
+        history = BacktestApplicationServices.generate_price_history(
+            symbols=args.synthetic,
+            candles=args.days * 24 * 12,
+        )
+        args.initial_asset = history.assets[0]
+        return history
+    exchange = Exchange(
+        api_key=API_KEY,
+        api_secret=API_SECRET,
+        api_url=API_URL,
+    )
+    exchange.get_client()
+    backtest_app_services = BacktestApplicationServices(
+        backtest_domain_services=BacktestDomainServices(),
+        exchange_client=exchange,
+        candle_store=CandleStore(path=args.store) if args.store else None,
+    )
+    symbols = list(dict.fromkeys(args.symbols.split(',') + [f"{args.initial_asset}USDT"]))
+    start_ms = int(time.time() * 1000) - args.days * DAY_MS
+    logger.info(f"Loading {args.days} days of 5m candles for {len(symbols)} symbols...")
+    history = backtest_app_services.load_price_history(symbols, start_ms=start_ms)
+    logger.info(f"Price history loaded: {history.as_dict()}")
+    return history
+
+
+def run(args: argparse.Namespace):
+    history = load_history(args)
+    backtest_app_services = BacktestApplicationServices(
+        backtest_domain_services=BacktestDomainServices(),
+    )
+    result = backtest_app_services.run(
+        history,
+        BacktestConfig(
+            initial_asset=args.initial_asset,
+            initial_value=args.initial_value,
+            fee_rate=args.fee,
+        ),
+    )
+    print(json.dumps(result.as_dict(), indent=2))
+    if args.trades:
+        for trade in result.trades:
+            print(json.dumps(trade.as_dict()))
+
+
+def bench(args: argparse.Namespace):
+    backtest_app_services = BacktestApplicationServices(
+        backtest_domain_services=BacktestDomainServices(),
+    )
+    report = backtest_app_services.benchmark(symbols=args.symbols, years=args.years, seed=args.seed)
+    print(json.dumps(report, indent=2))
+
+
+def sweep(args: argparse.Namespace):
+    history = load_history(args)
+    sweep_app_services = ParameterSweepApplicationServices(workers=args.workers)
+    parameter_sets = sweep_app_services.build_grid(
+        json.loads(args.grid),
+        samples=args.samples,
+        seed=args.seed,
+    )
+    results = sweep_app_services.sweep(
+        history,
+        BacktestConfig(
+            initial_asset=args.initial_asset,
+            initial_value=args.initial_value,
+            fee_rate=args.fee,
+        ),
+        parameter_sets,
+        metric=args.metric,
+    )
+    for rank, result in enumerate(results[:args.top], start=1):
+        print(json.dumps({'rank': rank, **result.as_dict()}))
+
+
+def add_history_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--symbols", default=",".join(ASSET_WATCHLIST))
+    parser.add_argument("--initial-asset", default=INITIAL_ASSET)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--initial-value", type=float, default=1000.0)
+    parser.add_argument("--fee", type=float, default=0.001)
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        metavar="SYMBOLS",
+        help="Use this many random-walk symbols instead of exchange data",
+    )
+    parser.add_argument(
+        "--store",
+        default=CANDLE_STORE_PATH,
+        help="Candle store directory used to cache downloaded history",
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backtest the trading rules on historical candles")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Backtest over exchange history")
+    add_history_arguments(run_parser)
+    run_parser.add_argument("--trades", action="store_true", help="Print every trade")
+    run_parser.set_defaults(handler=run)
+
+    sweep_parser = subparsers.add_parser("sweep", help="Rank strategy parameter sets by a metric")
+    add_history_arguments(sweep_parser)
+    sweep_parser.add_argument(
+        "--grid",
+        required=True,
+        help='JSON object of parameter lists, e.g. \'{"take_profit_pct": [2, 3, 4]}\'',
+    )
+    sweep_parser.add_argument("--samples", type=int, help="Evaluate a random sample of the grid")
+    sweep_parser.add_argument("--metric", choices=list(SWEEP_METRICS), default="pnl_pct")
+    sweep_parser.add_argument("--workers", type=int, help="Worker processes (defaults to all cores)")
+    sweep_parser.add_argument("--top", type=int, default=10)
+    sweep_parser.add_argument("--seed", type=int, default=0)
+    sweep_parser.set_defaults(handler=sweep)
+
+    bench_parser = subparsers.add_parser("bench", help="Measure throughput on synthetic candles")
+    bench_parser.add_argument("--symbols", type=int, default=10)
+    bench_parser.add_argument("--years", type=float, default=2.0)
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.set_defaults(handler=bench)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.handler(args)
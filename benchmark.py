@@ -0,0 +1,96 @@
+# Python imports
+import argparse
+import json
+import sys
+
+# App imports
+from src.conf.logger import Trace
+from src.domain.benchmark.services import BenchmarkDomainServices
+from src.application.benchmark.services import (
+    BENCHMARK_CASES,
+    DEFAULT_SCAN_SIZES,
+    BenchmarkApplicationServices,
+)
+
+# Logger initialization
+logger = Trace(__name__).logger
+
+
+def parse_list(value: str, cast=str) -> tuple:
+    return tuple(cast(item) for item in value.split(',') if item)
+
+
+def run(args: argparse.Namespace):
+    benchmark_app_services = BenchmarkApplicationServices(
+        benchmark_domain_services=BenchmarkDomainServices(),
+        repeat=args.repeat,
+        warmup=args.warmup,
+        seed=args.seed,
+        scan_workers=args.workers,
+        scan_vectorized=args.vectorized,
+    )
+    report = benchmark_app_services.run(
+        cases=parse_list(args.cases),
+        scan_sizes=parse_list(args.symbols, int),
+        lookbacks=parse_list(args.lookbacks, int),
+    )
+    output = json.dumps(report.as_dict(), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        logger.info(f"Benchmark report written to {args.output}")
+    else:
+        print(output)
+
+
+def compare(args: argparse.Namespace):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    benchmark_app_services = BenchmarkApplicationServices(
+        benchmark_domain_services=BenchmarkDomainServices(),
+    )
+    comparisons = benchmark_app_services.compare(base, head, threshold=args.threshold)
+    for comparison in comparisons:
+        print(json.dumps(comparison.as_dict()))
+    if any(comparison.regressed for comparison in comparisons):
+        sys.exit(1)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the trading hot paths on a fake exchange")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Measure latency, throughput and peak memory")
+    run_parser.add_argument("--cases", default=",".join(BENCHMARK_CASES))
+    run_parser.add_argument(
+        "--symbols",
+        default=",".join(str(size) for size in DEFAULT_SCAN_SIZES),
+        help="Watchlist sizes of the market scan and cycle cases",
+    )
+    run_parser.add_argument("--lookbacks", default="288,1000", help="Candle windows of the per-symbol cases")
+    run_parser.add_argument("--repeat", type=int, default=20)
+    run_parser.add_argument("--warmup", type=int, default=2)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--workers", type=int, default=1, help="Market scan threads")
+    run_parser.add_argument("--vectorized", action="store_true", help="Use the vectorized market scan")
+    run_parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two reports; exit 1 on a regression")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Median slowdown tolerated before a case counts as regressed",
+    )
+    compare_parser.set_defaults(handler=compare)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.handler(args)
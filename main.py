@@ -1,129 +1,110 @@
 # Python imports
-import time
 import sys
 import asyncio
 import traceback
+from typing import Optional
 
 # App imports
 from src.conf.logger import Trace
-from src.adapters.exchange import Exchange
-from src.adapters.redis import RedisAdapter
-from src.adapters.telegram import TelegramAdapter
+from src.adapters.metrics import metrics
 from src.conf.settings import (
-    API_KEY,
-    API_SECRET,
-    API_URL,
-    REDIS_HOST,
-    REDIS_PORT,
-    REDIS_DB,
-    ASSET_WATCHLIST,
-    TELEGRAM_API_TOKEN,
-    TELEGRAM_CHAT_ID,
+    MARKET_DATA_MODE,
+    BINANCE_WS_URL,
+    BOT_ROLE,
+    SCHEDULER_INTERVAL,
+    SCHEDULER_OFFSET,
+    SCHEDULER_OVERRUN,
 )
-from src.domain.calculator.value_objects import (
-    SELL_SIGNAL,
-)
-from src.domain.calculator.services import IndicatorCalculatorDomainServices
+from src.domain.calculator.value_objects import SELL_SIGNAL
 from src.domain.trading.entities import TradingOrderFactory
-from src.domain.trading.services import TradingDomainServices
-from src.application.trading.services import TradingApplicationServices
-from src.application.calculator.services import IndicatorCalculatorApplicationServices
+from src.application.bootstrap import (
+    Portfolio,
+    STREAM_MODE,
+    WORKER_ROLE,
+    TradingBotApp,
+)
 
 # Logger initialization
 logger = Trace(__name__).logger
 
-# Initialize Redis and Exchange clients
-redis_client = RedisAdapter(
-    host=REDIS_HOST,
-    port=REDIS_PORT,
-    db=REDIS_DB,
-    decode_responses=True,
-)
-
-# Initialize Exchange client
-exchange = Exchange(
-    api_key=API_KEY,
-    api_secret=API_SECRET,
-    api_url=API_URL,
-)
-
-client = exchange.get_client()
+# Candle windows used for the sell decision
+SHORT_TERM_INTERVAL = "5m"
+SHORT_TERM_LOOKBACK = 288
+LONG_TERM_INTERVAL = "1h"
+LONG_TERM_LOOKBACK = 168
 
-# Initialize Telegram adapter
-telegram = TelegramAdapter(
-    api_token=TELEGRAM_API_TOKEN,
-    chat_id=TELEGRAM_CHAT_ID,
-)
+# Adapters and services are built on first use, so importing this module is cheap
+app = TradingBotApp()
 
-# Domain services
-trading_domain_services = TradingDomainServices(
-    exchange_client=exchange,
-    redis_client=redis_client,
-    telegram_adapter=telegram,
-)
-indicator_calculator_domain_services = IndicatorCalculatorDomainServices()
+# Names this module used to build eagerly, for one-off maintenance from a shell
+LEGACY_COMPONENTS = {
+    'redis_client',
+    'async_redis_client',
+    'scan_queue',
+    'rate_limiter',
+    'exchange',
+    'async_exchange',
+    'telegram',
+    'metrics_server',
+    'market_data',
+    'default_parameters',
+    'portfolio_configs',
+    'portfolios',
+}
 
-# Application services
-indicator_calculator_app_services = IndicatorCalculatorApplicationServices(
-    indicator_calculator_domain_services=indicator_calculator_domain_services,
-)
-trading_app_services = TradingApplicationServices(
-    calculator_indicator_app_services=indicator_calculator_app_services,
-    trading_domain_services=trading_domain_services,
-)
+def __getattr__(name: str):
+    if name in LEGACY_COMPONENTS:
+        return getattr(app, name)
+    # Services of the first portfolio
+    if name in ('trading_app_services', 'indicator_calculator_app_services'):
+        return getattr(app.portfolios[0], name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# trading_app_services.wipe_current_asset()
+# import main; main.trading_app_services.wipe_current_asset()
 
-async def main():
-    logger.info("Starting trading bot...")
-    current_asset = trading_app_services.get_current_asset()
+async def main(portfolio: Optional[Portfolio] = None):
+    portfolio = portfolio or app.portfolios[0]
+    trading_app_services = portfolio.trading_app_services
+    indicator_calculator_app_services = portfolio.indicator_calculator_app_services
+    logger.info(f"Starting trading bot ({portfolio.config.name})...")
+    current_asset = await trading_app_services.get_current_asset_async()
     logger.info(f"Current asset: {current_asset}")
-    if current_asset.get("asset") == "USDT":
+    if current_asset.get("current_asset") == "USDT":
         logger.info("Current asset is USDT. No action taken.")
-        sys.exit(0)
+        if portfolio.standalone:
+            sys.exit(0)
+        return
     if not current_asset.get("entry_price"):
         logger.info("Entry price not set. Fetching current asset price...")
-        entry_price = trading_app_services.get_asset_price(current_asset.get("current_asset"))
-        trading_app_services.set_current_asset(current_asset.get("current_asset"), entry_price=entry_price)
+        entry_price = await asyncio.to_thread(trading_app_services.get_asset_price, current_asset.get("current_asset"))
+        await trading_app_services.set_current_asset_async(current_asset.get("current_asset"), entry_price=entry_price)
         logger.info(f"Entry price set for {current_asset.get('current_asset')}: {entry_price}")
-        current_asset = trading_app_services.get_current_asset()
+        current_asset = await trading_app_services.get_current_asset_async()
         logger.info(f"Current asset updated: {current_asset}")
     else:
         logger.info(f"Entry price already set for {current_asset.get('current_asset')}: {current_asset.get('entry_price')}")
 
-    short_term_hd = trading_app_services.get_historical_data(
+    # Historical data and indicators are shared with other portfolios holding the same asset.
+    # Exchange calls may wait on the rate limiter, so they run off the event loop.
+    short_term_hd, short_term_trend_indicators, short_term_trade_indicators = await asyncio.to_thread(
+        trading_app_services.get_market_indicators,
         symbol=f"{current_asset.get('current_asset')}USDT",
-        interval="5m",
-        lookback=288,
+        interval=SHORT_TERM_INTERVAL,
+        lookback=SHORT_TERM_LOOKBACK,
     )
-    long_term_hd = trading_app_services.get_historical_data(
+    long_term_hd, long_term_trend_indicators, long_term_trade_indicators = await asyncio.to_thread(
+        trading_app_services.get_market_indicators,
         symbol=f"{current_asset.get('current_asset')}USDT",
-        interval="1h",
-        lookback=168,
+        interval=LONG_TERM_INTERVAL,
+        lookback=LONG_TERM_LOOKBACK,
     )
-    logger.info("Historical data fetched successfully.")
+    logger.info("Historical data fetched and indicators applied successfully.")
     current_close_price = short_term_hd['close'].iloc[-1]
     logger.info(f"Current close price: {current_close_price}")
     # Percentage change
     entry_price = current_asset.get("entry_price")
     change_pct = ((current_close_price - entry_price) / entry_price) * 100
     logger.info(f"Percentage change: {change_pct}%")
-    # Apply trend indicators
-    short_term_trend_indicators = indicator_calculator_app_services.apply_trend_indicators(
-        close_prices=short_term_hd['close'],
-    )
-    long_term_trend_indicators = indicator_calculator_app_services.apply_trend_indicators(
-        close_prices=long_term_hd['close'],
-    )
-    logger.info("Trend indicators applied successfully.")
-    # Apply Bollinger Bands indicators
-    short_term_trade_indicators = indicator_calculator_app_services.apply_bollinger_bands_indicators(
-        close_prices=short_term_hd['close'],
-    )
-    long_term_trade_indicators = indicator_calculator_app_services.apply_bollinger_bands_indicators(
-        close_prices=long_term_hd['close'],
-    )
-    logger.info("Bollinger Bands indicators applied successfully.")
     # Evaluate trading decision
     short_term_decision = indicator_calculator_app_services.evaluate_trading_decision(
         entry_price=current_asset.get("entry_price"),
@@ -144,8 +125,8 @@ async def main():
     if short_term_decision == SELL_SIGNAL and long_term_decision == SELL_SIGNAL:
         logger.info("Both short-term and long-term decisions indicate selling.")
 
-        market_analysis = trading_app_services.analyze_markets(
-            watchlist=ASSET_WATCHLIST,
+        market_analysis = await trading_app_services.analyze_markets_async(
+            watchlist=portfolio.watchlist,
         )
         logger.info(f"Market analysis: {market_analysis}")
         best_market = indicator_calculator_app_services.get_best_market_opportunity(
@@ -156,22 +137,38 @@ async def main():
                 logger.info("No action taken. Current asset is the best market opportunity.")
                 return
             logger.info(f"Best market opportunity found: {best_market.asset}")
-            # Get trading intent
-            trading_intent = trading_app_services.get_trade_intent(
+            route = await asyncio.to_thread(
+                trading_app_services.get_conversion_route,
                 base_asset=current_asset.get("current_asset"),
                 quote_asset=best_market.asset,
             )
+            logger.info(f"Conversion route: {route.as_dict()}")
+            if not route.is_direct:
+                # The assets share no pair worth trading, so convert through hub assets
+                orders = await trading_app_services.execute_route(
+                    route,
+                    next_entry_price=best_market.price,
+                )
+                logger.info(f"Orders placed successfully: {[order.as_dict() for order in orders]}")
+                return
+            # Get trading intent
+            trading_intent = route.legs[0].as_intent()
             logger.info(f"Trade intent: {trading_intent.as_dict()}")
-            # Perform calculations for placing an order
-            equivalent_volume = trading_app_services.get_equivalent_volume(
-                origin_asset=trading_intent.origin,
-                target_asset=trading_intent.quote,
-            )
+            # Perform calculations for placing an order from one consistent snapshot
+            def size_order() -> tuple:
+                with trading_app_services.market_snapshot():
+                    return (
+                        trading_app_services.get_equivalent_volume(
+                            origin_asset=trading_intent.origin,
+                            target_asset=trading_intent.quote,
+                        ),
+                        trading_app_services.get_current_asset_holding_value(),
+                        trading_app_services.get_asset_balance(
+                            asset=current_asset.get("current_asset"),
+                        ),
+                    )
+            equivalent_volume, current_holding_value, current_balance = await asyncio.to_thread(size_order)
             logger.info(f"Equivalent volume calculated: {equivalent_volume}")
-            current_holding_value = trading_app_services.get_current_asset_holding_value()
-            current_balance = trading_app_services.get_asset_balance(
-                asset=current_asset.get("current_asset"),
-            )
             order = TradingOrderFactory.create_order(
                 symbol=trading_intent.symbol,
                 side=trading_intent.side,
@@ -180,28 +177,181 @@ async def main():
                 profit=current_holding_value - (entry_price * current_balance)
             )
             logger.info(f"Placing order: {order.as_dict()}")
-            await trading_app_services.place_order(order=order)
+            await trading_app_services.place_order(
+                order=order,
+                next_asset=best_market.asset,
+                next_entry_price=best_market.price,
+            )
             logger.info(f"Order placed successfully: {order.as_dict()}")
-            trading_app_services.set_current_asset(best_market.asset, entry_price=best_market.price)
         else:
             logger.info("No suitable market found for buying.")
             logger.info("Implementing stop loss strategy.")
             stop_loss_order = await trading_app_services.stop_loss()
             logger.info(f"Stop loss order placed: {stop_loss_order.as_dict()}")
-            trading_app_services.set_current_asset("USDT", entry_price=stop_loss_order.usd_amount)
-            sys.exit(0)
+            if portfolio.standalone:
+                sys.exit(0)
 
     else:
         logger.info("Market conditions not met for selling. No action taken.")
         logger.info("Trading bot stopping.")
 
-if __name__ == "__main__":
-    while True:
-        try:
-            asyncio.run(main())
-        except Exception:
-            logger.error(traceback.format_exc())
+async def get_held_symbols() -> list:
+    """USDT symbol of the current asset of every portfolio not parked in USDT"""
+    symbols = []
+    for portfolio in app.portfolios:
+        current_asset = await portfolio.trading_app_services.get_current_asset_async()
+        if current_asset.get('current_asset') == "USDT":
             continue
-        logger.info("-------------------------------")
-        time.sleep(180)
-        logger.info("Waking up...")
\ No newline at end of file
+        symbols.append(f"{current_asset.get('current_asset')}USDT")
+    return list(dict.fromkeys(symbols))
+
+async def get_tracked_symbols() -> list:
+    """Watchlists plus the current asset of every portfolio"""
+    return list(dict.fromkeys(app.market_watchlist() + await get_held_symbols()))
+
+async def run_portfolios():
+    """Evaluate every portfolio against one shared market data fetch"""
+    market_data = app.market_data
+    market_data.begin_tick()
+    metrics.begin_tick()
+    try:
+        with metrics.span('tick'):
+            # Drop cached candles for symbols that no portfolio tracks anymore
+            portfolios = app.portfolios
+            portfolios[0].trading_app_services.retain_market_data(symbols=await get_tracked_symbols())
+            for portfolio in portfolios:
+                if portfolio.standalone:
+                    await main(portfolio)
+                    continue
+                try:
+                    await main(portfolio)
+                except Exception:
+                    logger.error(f"Portfolio {portfolio.config.name} failed:\n{traceback.format_exc()}")
+    finally:
+        logger.info(f"Shared market data: {market_data.misses} computed, {market_data.hits} reused.")
+        logger.info(metrics.tick_summary())
+        await asyncio.to_thread(app.save_snapshot)
+
+def collect_runtime_metrics() -> list:
+    """Gauges read from the long-lived components on every scrape"""
+    samples = []
+    if app.created('market_data'):
+        samples.append(('shared_market_data_hits', {}, app.market_data.hits))
+        samples.append(('shared_market_data_misses', {}, app.market_data.misses))
+    rate_limiter = app.rate_limiter
+    if rate_limiter is not None:
+        samples.append(('rate_limiter_used_weight', {}, rate_limiter.used_weight))
+        samples.append(('rate_limiter_throttled', {}, rate_limiter.throttled))
+    if app.created('telegram') and app.telegram.notifications is not None:
+        notifications = app.telegram.notifications
+        samples.append(('telegram_queue_length', {}, len(notifications)))
+        samples.append(('telegram_sent', {}, notifications.sent))
+        samples.append(('telegram_dropped', {}, notifications.dropped))
+    return samples
+
+def start_metrics_server(*collectors):
+    metrics_server = app.metrics_server
+    if metrics_server is None:
+        return
+    for collector in (collect_runtime_metrics, *collectors):
+        metrics.add_collector(collector)
+    metrics_server.start()
+
+async def warm_up():
+    """Build the portfolios in a thread while the scheduler waits for the first candle close"""
+    try:
+        await asyncio.to_thread(app.warm_up)
+    except Exception:
+        # Whatever failed is built again by the first tick that needs it
+        logger.error(f"Warm-up failed:\n{traceback.format_exc()}")
+    app.telegram.start()
+
+async def poll():
+    """Evaluate the trading decision shortly after every candle close on one event loop"""
+    from src.adapters.scheduler import CandleScheduler
+    scheduler = CandleScheduler()
+    scheduler.schedule(
+        run_portfolios,
+        interval=SCHEDULER_INTERVAL,
+        offset=SCHEDULER_OFFSET,
+        overrun=SCHEDULER_OVERRUN,
+    )
+    start_metrics_server(lambda: [
+        (f"scheduler_{name}", {'job': job}, value)
+        for job, job_metrics in scheduler.metrics().items()
+        for name, value in job_metrics.items()
+    ])
+    app.report_startup('ready')
+    warm_up_task = asyncio.create_task(warm_up())
+    try:
+        await scheduler.run()
+    finally:
+        warm_up_task.cancel()
+        await app.aclose()
+
+def work():
+    """Analyze the market scan jobs queued by the trading processes"""
+    if app.scan_queue is None:
+        logger.error("MARKET_SCAN_QUEUE is not set. Nothing to work on.")
+        sys.exit(1)
+    start_metrics_server()
+    app.report_startup('ready')
+    app.warm_up()
+    app.worker_services.serve_market_scans()
+
+async def stream():
+    """Evaluate the trading decisions whenever a candle of a held asset closes"""
+    from src.adapters.market_stream import KlineStream
+    start_metrics_server()
+    app.report_startup('ready')
+    # The stream subscribes the held symbols right away, so there is nothing to overlap with
+    await warm_up()
+    symbols = await get_tracked_symbols()
+    tracked = {"symbols": set(await get_held_symbols())}
+    lookbacks = {
+        SHORT_TERM_INTERVAL: SHORT_TERM_LOOKBACK,
+        LONG_TERM_INTERVAL: LONG_TERM_LOOKBACK,
+    }
+    evaluation_lock = asyncio.Lock()
+    evaluations = set()
+
+    async def evaluate():
+        async with evaluation_lock:
+            try:
+                await run_portfolios()
+            except Exception:
+                logger.error(traceback.format_exc())
+            tracked["symbols"] = set(await get_held_symbols())
+            # A failed route leg can park a portfolio in an asset that is not streamed yet
+            await kline_stream.resubscribe(await get_tracked_symbols(), lookbacks)
+            logger.info("-------------------------------")
+
+    async def on_candle_close(symbol: str, interval: str, kline: list):
+        if interval != SHORT_TERM_INTERVAL or symbol not in tracked["symbols"]:
+            return
+        if evaluation_lock.locked():
+            logger.info("Previous evaluation still running. Skipping candle close.")
+            return
+        task = asyncio.create_task(evaluate())
+        evaluations.add(task)
+        task.add_done_callback(evaluations.discard)
+
+    kline_stream = KlineStream(
+        exchange=app.exchange,
+        kline_cache=app.exchange.kline_cache,
+        ws_url=BINANCE_WS_URL,
+        on_candle_close=on_candle_close,
+    )
+    for interval, lookback in lookbacks.items():
+        kline_stream.subscribe(symbols, interval, lookback)
+    try:
+        await kline_stream.run()
+    finally:
+        await app.aclose()
+
+if __name__ == "__main__" and BOT_ROLE == WORKER_ROLE:
+    work()
+elif __name__ == "__main__" and MARKET_DATA_MODE == STREAM_MODE:
+    asyncio.run(stream())
+elif __name__ == "__main__":
+    asyncio.run(poll())
@@ -0,0 +1,288 @@
+# Python imports
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+import aiohttp
+import pandas as pd
+from typing import (
+    Dict,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlencode
+
+# App imports
+from src.conf.logger import Trace
+from src.adapters import exchange_errors
+from src.adapters.candle_store import CandleStore
+from src.adapters.candles import (
+    DEFAULT_CANDLE_FIELDS,
+    Candles,
+    klines_to_candles,
+)
+from src.adapters.exchange import (
+    MAX_KLINES_LIMIT,
+    ORDER_TYPE_MARKET,
+    BaseExchange,
+    klines_to_dataframe,
+)
+from src.adapters.exchange_metadata import SymbolInfo
+from src.adapters.kline_cache import (
+    INTERVAL_MS,
+    KlineCache,
+)
+from src.adapters.metrics import metrics
+from src.adapters.rate_limiter import (
+    RequestWeightLimiter,
+    request_priority,
+    request_weight,
+)
+
+logger = Trace(__name__).logger
+
+RECV_WINDOW = 5000
+
+
+class AsyncExchange(BaseExchange):
+    """asyncio counterpart of `Exchange`, talking to the Binance REST API directly.
+
+    Requests share one keep-alive aiohttp session with a bounded connection
+    pool, so a whole watchlist can be fetched concurrently on a single loop.
+    Identical read requests issued while one is already in flight are
+    coalesced and share its response. Kline caching, the candle store and
+    the exchange metadata index behave as in `Exchange`.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        api_url: str,
+        kline_cache: Optional[KlineCache] = None,
+        candle_store: Optional[CandleStore] = None,
+        metadata_ttl: float = 3600,
+        max_connections: int = 20,
+        timeout: float = 20,
+        rate_limiter: Optional[RequestWeightLimiter] = None,
+    ):
+        super().__init__(
+            api_key=api_key,
+            api_secret=api_secret,
+            api_url=api_url,
+            kline_cache=kline_cache,
+            candle_store=candle_store,
+            metadata_ttl=metadata_ttl,
+            rate_limiter=rate_limiter,
+        )
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'X-MBX-APIKEY': self.api_key or ''},
+            )
+            self._loop = loop
+            self._in_flight = {}
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    def _sign(self, params: dict) -> dict:
+        params = {**params, 'timestamp': int(time.time() * 1000), 'recvWindow': RECV_WINDOW}
+        signature = hmac.new(
+            (self.api_secret or '').encode(),
+            urlencode(params).encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        return {**params, 'signature': signature}
+
+    async def _request(self, method: str, path: str, params: Optional[dict] = None, signed: bool = False):
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        if method != 'GET':
+            return await self._send(method, path, params, signed)
+        key = (path, signed, tuple(sorted(params.items())))
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.ensure_future(self._send(method, path, params, signed))
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _send(self, method: str, path: str, params: dict, signed: bool):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(request_weight(path, params), request_priority(path))
+        if signed:
+            params = self._sign(params)
+        url = f"{self.api_url.rstrip('/')}/v3/{path}"
+        with metrics.span('exchange_request', endpoint=path):
+            async with self.session.request(method, url, params=params) as response:
+                text = await response.text()
+        self._record_response(path, response.headers, response.status)
+        if response.status >= 400:
+            try:
+                json.loads(text)
+            except ValueError:
+                raise exchange_errors.BinanceRequestException(f"HTTP {response.status}: {text[:200]}")
+            raise exchange_errors.BinanceAPIException(response, response.status, text)
+        return json.loads(text)
+
+    async def get_historical_data(self, symbol: str, interval: str = '1h', lookback: int = 100) -> pd.DataFrame:
+        """Fetch historical klines (time series) and return DataFrame"""
+        klines = await self.get_klines(
+            symbol=symbol,
+            interval=interval,
+            lookback=lookback,
+        )
+        return klines_to_dataframe(klines)
+
+    async def get_candles(
+        self,
+        symbol: str,
+        interval: str = '1h',
+        lookback: int = 100,
+        fields: tuple = DEFAULT_CANDLE_FIELDS,
+        dtype: str = 'float64',
+    ) -> Candles:
+        """Fetch historical klines decoded into compact NumPy columns"""
+        klines = await self.get_klines(
+            symbol=symbol,
+            interval=interval,
+            lookback=lookback,
+        )
+        return klines_to_candles(klines, fields=fields, dtype=dtype)
+
+    async def get_klines(self, symbol: str, interval: str = '1h', lookback: int = 100) -> list:
+        """Return the latest `lookback` raw klines, served from the cache when possible"""
+        if not self._uses_kline_cache(interval, lookback):
+            return await self._request('GET', 'klines', {
+                'symbol': symbol,
+                'interval': interval,
+                'limit': lookback,
+            })
+        now_ms = int(time.time() * 1000)
+        klines = self._get_local_klines(symbol, interval, lookback, now_ms)
+        if klines is not None:
+            return klines
+        missing = self._get_missing_candles(symbol, interval, lookback, now_ms)
+        if missing is None:
+            return await self._refresh_klines(symbol, interval, lookback)
+        klines = await self._request('GET', 'klines', {
+            'symbol': symbol,
+            'interval': interval,
+            'startTime': self.kline_cache.last_close_time(symbol, interval) + 1,
+            'limit': missing,
+        })
+        await self._backfill_store(symbol, interval, klines[:-1])
+        merged = self._merge_klines(symbol, interval, lookback, klines, missing, now_ms)
+        if merged is None:
+            return await self._refresh_klines(symbol, interval, lookback)
+        return merged
+
+    async def _refresh_klines(self, symbol: str, interval: str, lookback: int) -> list:
+        """Fetch a full window and reseed the cache with its closed candles"""
+        klines = await self._request('GET', 'klines', {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': lookback,
+        })
+        await self._backfill_store(symbol, interval, klines[:-1])
+        self._reseed_klines(symbol, interval, klines)
+        return klines
+
+    async def _backfill_store(self, symbol: str, interval: str, klines: list):
+        """Store the candles missed since the store's newest one, so `klines` append without a hole"""
+        gap = self._store_gap(symbol, interval, klines)
+        if gap is not None:
+            self.store_klines(symbol, interval, await self.get_klines_range(symbol, interval, *gap))
+
+    async def get_klines_range(self, symbol: str, interval: str, start_ms: int, end_ms: Optional[int] = None) -> list:
+        """Fetch every raw kline between two timestamps, paginating as needed"""
+        klines = []
+        start = start_ms
+        while True:
+            page = await self._request('GET', 'klines', {
+                'symbol': symbol,
+                'interval': interval,
+                'startTime': start,
+                'endTime': end_ms,
+                'limit': MAX_KLINES_LIMIT,
+            })
+            klines.extend(page)
+            if len(page) < MAX_KLINES_LIMIT:
+                return klines
+            start = int(page[-1][0]) + INTERVAL_MS.get(interval, 1)
+
+    async def create_order(self, symbol: str, side: str, quantity: float, price: Optional[float] = None):
+        """Create a test order; `price` enables the minimum notional check"""
+        await self._ensure_metadata()
+        await self._request('POST', 'order/test', {
+            'symbol': symbol,
+            'side': side,
+            'type': ORDER_TYPE_MARKET,
+            'quantity': format(self.quantize_quantity(symbol, quantity, price=price), 'f'),
+        }, signed=True)
+
+    async def get_balance(self, asset: str) -> float:
+        balances = await self.get_balances()
+        return balances.get(asset, 0.0)
+
+    async def get_symbol_ticker(self, symbol: str) -> float:
+        """Get the current price of a specific asset"""
+        price = await self._request('GET', 'ticker/price', {'symbol': symbol})
+        price = price.get('price')
+        if not price:
+            raise ValueError(f"Price not found for {symbol}")
+        return float(price)
+
+    async def get_all_prices(self) -> dict:
+        """Get the latest price of every symbol in a single request"""
+        return {
+            ticker['symbol']: float(ticker['price'])
+            for ticker in await self._request('GET', 'ticker/price')
+        }
+
+    async def get_balances(self) -> dict:
+        """Get the free balance of every asset in a single request"""
+        account = await self._request('GET', 'account', signed=True)
+        return {
+            balance['asset']: float(balance['free'])
+            for balance in account.get('balances', [])
+        }
+
+    async def _ensure_metadata(self):
+        if not self.metadata.is_expired():
+            return
+        try:
+            self.metadata.load(await self._request('GET', 'exchangeInfo'))
+        except Exception as e:
+            self.metadata.refresh_failed(e)
+
+    async def get_available_symbols(self) -> list:
+        """Get all available symbols"""
+        await self._ensure_metadata()
+        return list(self.metadata.symbols())
+
+    async def has_symbol(self, symbol: str) -> bool:
+        """Check whether a symbol is listed, using the cached exchange metadata"""
+        await self._ensure_metadata()
+        return symbol in self.metadata
+
+    async def get_symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        """Get the cached trading rules (lot step, tick size, min notional) of a symbol"""
+        await self._ensure_metadata()
+        return self.metadata.get(symbol)
@@ -0,0 +1,200 @@
+# Python imports
+import os
+import threading
+import numpy as np
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# App imports
+from src.conf.logger import Trace
+from src.adapters.kline_cache import (
+    INTERVAL_MS,
+    OPEN_TIME_INDEX,
+    CLOSE_TIME_INDEX,
+)
+
+logger = Trace(__name__).logger
+
+# Fixed-width columns stored per (symbol, interval), with their kline row index
+CANDLE_COLUMNS = {
+    'timestamp': (np.dtype('<i8'), OPEN_TIME_INDEX),
+    'open': (np.dtype('<f8'), 1),
+    'high': (np.dtype('<f8'), 2),
+    'low': (np.dtype('<f8'), 3),
+    'close': (np.dtype('<f8'), 4),
+    'volume': (np.dtype('<f8'), 5),
+    'close_time': (np.dtype('<i8'), CLOSE_TIME_INDEX),
+    'quote_asset_volume': (np.dtype('<f8'), 7),
+    'number_of_trades': (np.dtype('<i8'), 8),
+    'taker_buy_base': (np.dtype('<f8'), 9),
+    'taker_buy_quote': (np.dtype('<f8'), 10),
+}
+
+
+class CandleStore:
+    """Append-only columnar candle store on local disk.
+
+    Each (symbol, interval) is a directory holding one raw little-endian file
+    per column. Reads memory-map the files, so range queries return views
+    into the page cache instead of copies. Rows are appended in timestamp
+    order and rows not newer than the last stored candle are skipped, which
+    makes re-appending an overlapping window harmless. Rows starting after
+    a hole are still appended; `gaps` reports the missing candles so
+    readers can fetch them instead of treating the hole as flat prices.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # Memory maps are cached per key and reopened when the file grows
+        self._maps: Dict[Tuple[str, str], Tuple[int, Dict[str, np.ndarray]]] = {}
+
+    def _directory(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.path, symbol, interval)
+
+    def _column_path(self, symbol: str, interval: str, column: str) -> str:
+        return os.path.join(self._directory(symbol, interval), f"{column}.bin")
+
+    def keys(self) -> Iterable[Tuple[str, str]]:
+        if not os.path.isdir(self.path):
+            return
+        for symbol in sorted(os.listdir(self.path)):
+            symbol_path = os.path.join(self.path, symbol)
+            if not os.path.isdir(symbol_path):
+                continue
+            for interval in sorted(os.listdir(symbol_path)):
+                yield symbol, interval
+
+    def size(self, symbol: str, interval: str) -> int:
+        """Number of stored candles"""
+        path = self._column_path(symbol, interval, 'timestamp')
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // CANDLE_COLUMNS['timestamp'][0].itemsize
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[int]:
+        columns = self._columns(symbol, interval)
+        if columns is None:
+            return None
+        return int(columns['timestamp'][-1])
+
+    def append(self, symbol: str, interval: str, klines: list) -> int:
+        """Append raw kline rows newer than the last stored candle.
+
+        Returns the number of rows written.
+        """
+        with self._lock:
+            last_timestamp = self.last_timestamp(symbol, interval)
+            rows = [
+                kline for kline in klines
+                if last_timestamp is None or int(kline[OPEN_TIME_INDEX]) > last_timestamp
+            ]
+            if not rows:
+                return 0
+            step = INTERVAL_MS.get(interval)
+            if last_timestamp is not None and step and int(rows[0][OPEN_TIME_INDEX]) > last_timestamp + step:
+                missing = (int(rows[0][OPEN_TIME_INDEX]) - last_timestamp) // step - 1
+                logger.warning(f"Candle store {symbol} {interval}: appending after {missing} missing candles.")
+            os.makedirs(self._directory(symbol, interval), exist_ok=True)
+            # Write the timestamp column last: its length defines how many
+            # rows are committed, so a crash mid-append leaves the other
+            # columns with trailing bytes that are ignored on read.
+            for column in [*[c for c in CANDLE_COLUMNS if c != 'timestamp'], 'timestamp']:
+                dtype, index = CANDLE_COLUMNS[column]
+                values = np.array([row[index] for row in rows], dtype=np.float64).astype(dtype)
+                path = self._column_path(symbol, interval, column)
+                committed = self.size(symbol, interval) * dtype.itemsize
+                with open(path, 'ab') as handle:
+                    handle.truncate(committed)
+                    handle.write(values.tobytes())
+            return len(rows)
+
+    def gaps(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> List[Tuple[int, int]]:
+        """Open times (first, last) of every run of candles missing between stored ones"""
+        step = INTERVAL_MS.get(interval)
+        timestamps = self.read(symbol, interval, start_ms, end_ms, columns=('timestamp',))['timestamp']
+        if step is None or len(timestamps) < 2:
+            return []
+        holes = np.flatnonzero(np.diff(timestamps) > step)
+        return [(int(timestamps[i]) + step, int(timestamps[i + 1]) - step) for i in holes]
+
+    def _columns(self, symbol: str, interval: str) -> Optional[Dict[str, np.ndarray]]:
+        rows = self.size(symbol, interval)
+        if rows == 0:
+            return None
+        cached = self._maps.get((symbol, interval))
+        if cached is not None and cached[0] == rows:
+            return cached[1]
+        columns = {
+            column: np.memmap(
+                self._column_path(symbol, interval, column),
+                dtype=dtype,
+                mode='r',
+                shape=(rows,),
+            )
+            for column, (dtype, _) in CANDLE_COLUMNS.items()
+        }
+        self._maps[(symbol, interval)] = (rows, columns)
+        return columns
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        columns: Iterable[str] = ('timestamp', 'close'),
+    ) -> Dict[str, np.ndarray]:
+        """Return read-only views of candles with start_ms <= timestamp < end_ms"""
+        stored = self._columns(symbol, interval)
+        if stored is None:
+            return {column: np.empty(0, dtype=CANDLE_COLUMNS[column][0]) for column in columns}
+        timestamps = stored['timestamp']
+        first = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side='left'))
+        last = len(timestamps) if end_ms is None else int(np.searchsorted(timestamps, end_ms, side='left'))
+        return {column: stored[column][first:last] for column in columns}
+
+    def tail(
+        self,
+        symbol: str,
+        interval: str,
+        count: int,
+        columns: Iterable[str] = ('timestamp', 'close'),
+    ) -> Dict[str, np.ndarray]:
+        """Return read-only views of the newest `count` candles"""
+        stored = self._columns(symbol, interval)
+        if stored is None:
+            return {column: np.empty(0, dtype=CANDLE_COLUMNS[column][0]) for column in columns}
+        return {column: stored[column][-count:] for column in columns}
+
+    def read_klines(self, symbol: str, interval: str, count: int) -> list:
+        """Return the newest `count` candles as REST-style kline rows"""
+        stored = self.tail(symbol, interval, count, columns=CANDLE_COLUMNS)
+        rows = []
+        for i in range(len(stored['timestamp'])):
+            rows.append([
+                int(stored['timestamp'][i]),
+                float(stored['open'][i]),
+                float(stored['high'][i]),
+                float(stored['low'][i]),
+                float(stored['close'][i]),
+                float(stored['volume'][i]),
+                int(stored['close_time'][i]),
+                float(stored['quote_asset_volume'][i]),
+                int(stored['number_of_trades'][i]),
+                float(stored['taker_buy_base'][i]),
+                float(stored['taker_buy_quote'][i]),
+                0,
+            ])
+        return rows
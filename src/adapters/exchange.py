@@ -1,21 +1,283 @@
 # Python imports
+import math
+import time
 import pandas as pd
-from binance.client import Client
 from decimal import Decimal
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+# App imports
+from src.adapters import exchange_errors
+from src.adapters.candle_store import CandleStore
+from src.adapters.candles import (
+    DEFAULT_CANDLE_FIELDS,
+    Candles,
+    klines_to_candles,
+)
+from src.adapters.exchange_metadata import (
+    ExchangeMetadataCache,
+    SymbolInfo,
+)
+from src.adapters.kline_cache import (
+    INTERVAL_MS,
+    OPEN_TIME_INDEX,
+    CLOSE_TIME_INDEX,
+    KlineCache,
+)
+from src.adapters.metrics import (
+    EXCHANGE_REQUESTS,
+    EXCHANGE_USED_WEIGHT,
+    metrics,
+)
+from src.adapters.rate_limiter import (
+    USED_WEIGHT_HEADER,
+    RequestWeightLimiter,
+    request_priority,
+    request_weight,
+)
+
+if TYPE_CHECKING:
+    from binance.client import Client
+
+ORDER_TYPE_MARKET = 'MARKET'
+# Binance caps a single klines request at 1000 rows
+MAX_KLINES_LIMIT = 1000
+# How long a streamed candle may lag the clock before falling back to REST
+STREAM_FRESHNESS_MS = 5000
+
+KLINE_COLUMNS = [
+    'timestamp',
+    'open',
+    'high',
+    'low',
+    'close',
+    'volume',
+    'close_time',
+    'quote_asset_volume',
+    'number_of_trades',
+    'taker_buy_base',
+    'taker_buy_quote',
+    'ignore',
+]
+
+
+def klines_to_dataframe(klines: list) -> pd.DataFrame:
+    """Build the historical data frame used by the strategy from raw kline rows"""
+    with metrics.span('dataframe'):
+        df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
+        df['open'] = df['open'].astype(float)
+        df['high'] = df['high'].astype(float)
+        df['low'] = df['low'].astype(float)
+        df['close'] = df['close'].astype(float)
+        df['volume'] = df['volume'].astype(float)
+    return df
+
+
+class BaseExchange:
+    """Client-independent parts of the exchange adapters.
+
+    Holds the kline cache bookkeeping, the candle store and the exchange
+    metadata index, so the blocking and the asyncio adapters only differ in
+    how they perform requests.
+    """
 
-class Exchange:
     def __init__(
         self,
         api_key: str,
         api_secret: str,
         api_url: str,
+        kline_cache: Optional[KlineCache] = None,
+        candle_store: Optional[CandleStore] = None,
+        metadata_ttl: float = 3600,
+        metadata_loader=None,
+        rate_limiter: Optional[RequestWeightLimiter] = None,
     ):
         self.api_key = api_key
         self.api_secret = api_secret
         self.api_url = api_url
+        self.kline_cache = kline_cache
+        self.candle_store = candle_store
+        # Shared request weight budget; one limiter should serve every adapter on an IP
+        self.rate_limiter = rate_limiter
+        self.metadata = ExchangeMetadataCache(
+            loader=metadata_loader,
+            ttl=metadata_ttl,
+        )
+
+    def _uses_kline_cache(self, interval: str, lookback: int) -> bool:
+        return (
+            self.kline_cache is not None
+            and KlineCache.is_supported(interval)
+            and lookback <= self.kline_cache.max_candles
+        )
 
-    def get_client(self) -> Client:
+    def _get_local_klines(self, symbol: str, interval: str, lookback: int, now_ms: int) -> Optional[list]:
+        """Serve klines from a live stream if possible, warming the cache from disk otherwise"""
+        if self.kline_cache.is_streaming(symbol, interval):
+            klines = self._get_streamed_klines(symbol, interval, lookback, now_ms)
+            if klines is not None:
+                return klines
+        if self.candle_store is not None and self.kline_cache.size(symbol, interval) == 0:
+            # Warm the cache from disk so only the gap since the last run is fetched
+            klines = self.candle_store.read_klines(symbol, interval, self.kline_cache.max_candles)
+            self.kline_cache.replace(symbol, interval, self._contiguous_tail(interval, klines))
+        return None
+
+    @staticmethod
+    def _contiguous_tail(interval: str, klines: list) -> list:
+        """Klines after the newest hole, as the cache must hold consecutive candles"""
+        step = INTERVAL_MS[interval]
+        for i in range(len(klines) - 1, 0, -1):
+            if int(klines[i][OPEN_TIME_INDEX]) - int(klines[i - 1][OPEN_TIME_INDEX]) > step:
+                return klines[i:]
+        return klines
+
+    def _get_missing_candles(self, symbol: str, interval: str, lookback: int, now_ms: int) -> Optional[int]:
+        """Number of candles to fetch incrementally, or None when a full refresh is needed"""
+        last_close_time = self.kline_cache.last_close_time(symbol, interval)
+        cached_size = self.kline_cache.size(symbol, interval)
+        # Candles missing since the newest cached one, plus the open one
+        missing = max((now_ms - last_close_time) // INTERVAL_MS[interval] + 2, 2) if last_close_time else None
+        if (
+            missing is None
+            or cached_size < lookback - 1
+            or missing >= lookback
+            or missing > MAX_KLINES_LIMIT
+        ):
+            return None
+        return missing
+
+    def _merge_klines(
+        self,
+        symbol: str,
+        interval: str,
+        lookback: int,
+        klines: list,
+        missing: int,
+        now_ms: int,
+    ) -> Optional[list]:
+        """Append an incremental fetch to the cache, or None when it calls for a full refresh"""
+        if not klines:
+            return None
+        # A full page that does not reach the present means there is a gap
+        # larger than what we asked for; resync from scratch.
+        if len(klines) == missing and int(klines[-1][CLOSE_TIME_INDEX]) < now_ms:
+            return None
+        # Every row but the last is followed by a newer candle, so it is closed
+        self.kline_cache.extend(symbol, interval, klines[:-1])
+        self.store_klines(symbol, interval, klines[:-1])
+        closed = self.kline_cache.get(symbol, interval)
+        return (closed + klines[-1:])[-lookback:]
+
+    def _reseed_klines(self, symbol: str, interval: str, klines: list):
+        """Reseed the cache with the closed candles of a full window"""
+        self.kline_cache.replace(symbol, interval, klines[:-1])
+        self.store_klines(symbol, interval, klines[:-1])
+
+    def _get_streamed_klines(self, symbol: str, interval: str, lookback: int, now_ms: int) -> Optional[list]:
+        """Serve klines kept current by a stream, or None if the buffer is stale"""
+        closed = self.kline_cache.get(symbol, interval)
+        live = self.kline_cache.get_live(symbol, interval)
+        klines = closed + [live] if live else closed
+        if len(klines) < lookback:
+            return None
+        if int(klines[-1][CLOSE_TIME_INDEX]) + STREAM_FRESHNESS_MS < now_ms:
+            return None
+        return klines[-lookback:]
+
+    def _record_response(self, path: str, headers, status: int = 200):
+        """Count a finished request and feed its used-weight header to the metrics and the limiter"""
+        metrics.inc(EXCHANGE_REQUESTS, endpoint=path, status=status)
+        used = headers.get(USED_WEIGHT_HEADER) if headers else None
+        if used is not None:
+            metrics.set(EXCHANGE_USED_WEIGHT, int(used))
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(headers, status)
+
+    def store_klines(self, symbol: str, interval: str, klines: list):
+        """Persist closed klines to the candle store, if one is configured"""
+        if self.candle_store is not None and klines:
+            self.candle_store.append(symbol, interval, klines)
+
+    def _store_gap(self, symbol: str, interval: str, klines: list) -> Optional[Tuple[int, int]]:
+        """Open-time range the candle store misses before `klines`, or None when they follow its newest candle"""
+        if self.candle_store is None or not klines or interval not in INTERVAL_MS:
+            return None
+        last_timestamp = self.candle_store.last_timestamp(symbol, interval)
+        first = int(klines[0][OPEN_TIME_INDEX])
+        if last_timestamp is None or first <= last_timestamp + INTERVAL_MS[interval]:
+            return None
+        return last_timestamp + INTERVAL_MS[interval], first - 1
+
+    def evict_historical_data(self, keep_symbols: list):
+        """Drop cached klines for every symbol not in `keep_symbols`"""
+        if self.kline_cache is not None:
+            self.kline_cache.retain(keep_symbols)
+
+    def quantize_quantity(self, symbol: str, quantity: float, price: Optional[float] = None) -> Decimal:
+        """Round a quantity down to the symbol's lot step and check its minimums.
+
+        The notional minimum is only checked when the price is given.
+        """
+        symbol_info = self.metadata.get(symbol)
+        if symbol_info is None:
+            return Decimal(quantity).quantize(Decimal('0.01'), rounding='ROUND_DOWN')
+        quantized = symbol_info.quantize_quantity(quantity)
+        if quantized <= 0 or quantized < symbol_info.min_qty:
+            raise ValueError(
+                f"Quantity {quantity} for {symbol} is below the minimum of {symbol_info.min_qty}"
+            )
+        if price is not None and quantized * Decimal(str(price)) < symbol_info.min_notional:
+            raise ValueError(
+                f"Order of {quantized} {symbol} at {price} is below the minimum notional of {symbol_info.min_notional}"
+            )
+        return quantized
+
+
+class Exchange(BaseExchange):
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        api_url: str,
+        kline_cache: Optional[KlineCache] = None,
+        candle_store: Optional[CandleStore] = None,
+        metadata_ttl: float = 3600,
+        rate_limiter: Optional[RequestWeightLimiter] = None,
+    ):
+        super().__init__(
+            api_key=api_key,
+            api_secret=api_secret,
+            api_url=api_url,
+            kline_cache=kline_cache,
+            candle_store=candle_store,
+            metadata_ttl=metadata_ttl,
+            metadata_loader=lambda: self._call('exchangeInfo', self.client.get_exchange_info),
+            rate_limiter=rate_limiter,
+        )
+        self._client: Optional['Client'] = None
+
+    @property
+    def client(self) -> 'Client':
+        """Binance client, created on the first request rather than at startup"""
+        if self._client is None:
+            self.get_client()
+        return self._client
+
+    @client.setter
+    def client(self, client: 'Client'):
+        self._client = client
+
+    def get_client(self) -> 'Client':
         """Return a Binance client instance"""
+        # Deferred: python-binance takes most of a second to import and pings the API on creation
+        from binance.client import Client
         client=  Client(
             api_key=self.api_key,
             api_secret=self.api_secret,
@@ -26,62 +288,173 @@ class Exchange:
         self.client = client
         return client
 
+    def _call(self, path: str, method, weight: Optional[int] = None, **params):
+        """Call a client method for a REST endpoint within the request weight budget"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(
+                weight if weight is not None else request_weight(path, params),
+                request_priority(path),
+            )
+        try:
+            with metrics.span('exchange_request', endpoint=path):
+                result = method(**params)
+        except exchange_errors.BinanceAPIException as e:
+            self._record_response(path, getattr(e.response, 'headers', None), e.status_code)
+            raise
+        self._record_response(path, getattr(getattr(self.client, 'response', None), 'headers', None))
+        return result
+
+    def store_klines(self, symbol: str, interval: str, klines: list):
+        """Persist closed klines, first backfilling the candles the store missed since its newest one"""
+        gap = self._store_gap(symbol, interval, klines)
+        if gap is not None:
+            super().store_klines(symbol, interval, self.get_klines_range(symbol, interval, *gap))
+        super().store_klines(symbol, interval, klines)
+
     def get_historical_data(self, symbol: str, interval: str = '1h', lookback: int = 100) -> pd.DataFrame:
         """Fetch historical klines (time series) and return DataFrame"""
-        columns = [
-            'timestamp',
-            'open',
-            'high',
-            'low',
-            'close',
-            'volume',
-            'close_time',
-            'quote_asset_volume',
-            'number_of_trades',
-            'taker_buy_base',
-            'taker_buy_quote',
-            'ignore',
-        ]
-        klines = self.client.get_klines(
+        klines = self.get_klines(
+            symbol=symbol,
+            interval=interval,
+            lookback=lookback,
+        )
+        return klines_to_dataframe(klines)
+
+    def get_candles(
+        self,
+        symbol: str,
+        interval: str = '1h',
+        lookback: int = 100,
+        fields: tuple = DEFAULT_CANDLE_FIELDS,
+        dtype: str = 'float64',
+    ) -> Candles:
+        """Fetch historical klines decoded into compact NumPy columns"""
+        klines = self.get_klines(
+            symbol=symbol,
+            interval=interval,
+            lookback=lookback,
+        )
+        return klines_to_candles(klines, fields=fields, dtype=dtype)
+
+    def get_klines(self, symbol: str, interval: str = '1h', lookback: int = 100) -> list:
+        """Return the latest `lookback` raw klines, served from the cache when possible"""
+        if not self._uses_kline_cache(interval, lookback):
+            return self._call(
+                'klines',
+                self.client.get_klines,
+                symbol=symbol,
+                interval=interval,
+                limit=lookback,
+            )
+        now_ms = int(time.time() * 1000)
+        klines = self._get_local_klines(symbol, interval, lookback, now_ms)
+        if klines is not None:
+            return klines
+        missing = self._get_missing_candles(symbol, interval, lookback, now_ms)
+        if missing is None:
+            return self._refresh_klines(symbol, interval, lookback)
+        klines = self._call(
+            'klines',
+            self.client.get_klines,
+            symbol=symbol,
+            interval=interval,
+            startTime=self.kline_cache.last_close_time(symbol, interval) + 1,
+            limit=missing,
+        )
+        merged = self._merge_klines(symbol, interval, lookback, klines, missing, now_ms)
+        if merged is None:
+            return self._refresh_klines(symbol, interval, lookback)
+        return merged
+
+    def _refresh_klines(self, symbol: str, interval: str, lookback: int) -> list:
+        """Fetch a full window and reseed the cache with its closed candles"""
+        klines = self._call(
+            'klines',
+            self.client.get_klines,
             symbol=symbol,
             interval=interval,
             limit=lookback,
         )
-        df = pd.DataFrame(klines, columns=columns)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
-        df['open'] = df['open'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
-        return df
+        self._reseed_klines(symbol, interval, klines)
+        return klines
+
+    def get_klines_range(self, symbol: str, interval: str, start_ms: int, end_ms: Optional[int] = None) -> list:
+        """Fetch every raw kline between two timestamps, paginating as needed"""
+        end = end_ms if end_ms is not None else int(time.time() * 1000)
+        pages = max(math.ceil((end - start_ms) / INTERVAL_MS.get(interval, 60_000) / MAX_KLINES_LIMIT), 1)
+        return self._call(
+            'klines',
+            self.client.get_historical_klines,
+            weight=pages * request_weight('klines'),
+            symbol=symbol,
+            interval=interval,
+            start_str=start_ms,
+            end_str=end_ms,
+        )
 
-    def create_order(self, symbol: str, side: str, quantity: float):
-        """Create a test order"""
-        self.client.create_test_order(
+    def create_order(self, symbol: str, side: str, quantity: float, price: Optional[float] = None):
+        """Create a test order; `price` enables the minimum notional check"""
+        self._call(
+            'order/test',
+            self.client.create_test_order,
             symbol=symbol,
             side=side,
-            type=Client.ORDER_TYPE_MARKET,
-            quantity=Decimal(quantity).quantize(Decimal('0.01'), rounding='ROUND_DOWN'),
+            type=ORDER_TYPE_MARKET,
+            quantity=format(self.quantize_quantity(symbol, quantity, price=price), 'f'),
         )
 
     def get_balance(self, asset: str) -> float:
-        balance = self.client.get_asset_balance(
+        balance = self._call(
+            'account',
+            self.client.get_asset_balance,
             asset=asset,
         )
         return float(balance['free']) if balance else 0.0
 
     def get_symbol_ticker(self, symbol: str) -> float:
         """Get the current price of a specific asset"""
-        price = self.client.get_symbol_ticker(symbol=symbol)
+        price = self._call('ticker/price', self.client.get_symbol_ticker, symbol=symbol)
         price = price.get('price')
         if not price:
             raise ValueError(f"Price not found for {symbol}")
         return float(price) if price else 0.0
 
+    def get_all_prices(self) -> dict:
+        """Get the latest price of every symbol in a single request"""
+        return {
+            ticker['symbol']: float(ticker['price'])
+            for ticker in self._call('ticker/price', self.client.get_all_tickers)
+        }
+
+    def get_balances(self) -> dict:
+        """Get the free balance of every asset in a single request"""
+        account = self._call('account', self.client.get_account)
+        return {
+            balance['asset']: float(balance['free'])
+            for balance in account.get('balances', [])
+        }
+
+    def get_book_spreads(self) -> dict:
+        """Get the relative bid-ask spread of every symbol in a single request; an empty book is infinitely wide"""
+        spreads = {}
+        for ticker in self._call('ticker/bookTicker', self.client.get_orderbook_tickers):
+            bid = float(ticker['bidPrice'])
+            ask = float(ticker['askPrice'])
+            spreads[ticker['symbol']] = 2 * (ask - bid) / (ask + bid) if bid > 0 and ask > 0 else float('inf')
+        return spreads
+
     def get_available_symbols(self) -> list:
         """Get all available symbols"""
-        exchange_info = self.client.get_exchange_info()
-        symbols = [s['symbol'] for s in exchange_info['symbols']]
-        return symbols
+        return list(self.metadata.symbols())
+
+    def get_symbols(self) -> Dict[str, SymbolInfo]:
+        """Get the cached trading rules of every listed symbol; a refresh returns a new index"""
+        return self.metadata.symbols()
+
+    def has_symbol(self, symbol: str) -> bool:
+        """Check whether a symbol is listed, using the cached exchange metadata"""
+        return symbol in self.metadata
+
+    def get_symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        """Get the cached trading rules (lot step, tick size, min notional) of a symbol"""
+        return self.metadata.get(symbol)
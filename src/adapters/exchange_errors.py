@@ -0,0 +1,19 @@
+# Lazy access to the python-binance exception types.
+#
+# Importing anything from `binance` loads the whole client (and dateparser),
+# which costs most of a second. Code that only needs to catch exchange errors
+# writes `except exchange_errors.BinanceAPIException`: the attribute is only
+# resolved when an exception reaches the handler, so importing the module is
+# free and binance is loaded by the adapter that actually talks to Binance.
+
+_EXCEPTIONS = (
+    'BinanceAPIException',
+    'BinanceRequestException',
+)
+
+
+def __getattr__(name: str):
+    if name in _EXCEPTIONS:
+        from binance import exceptions
+        return getattr(exceptions, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
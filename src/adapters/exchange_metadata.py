@@ -0,0 +1,145 @@
+# Python imports
+import threading
+import time
+from dataclasses import dataclass
+from decimal import (
+    Decimal,
+    ROUND_DOWN,
+)
+from typing import (
+    Callable,
+    Dict,
+    Optional,
+)
+
+# App imports
+from src.conf.logger import Trace
+
+logger = Trace(__name__).logger
+
+TRADING_STATUS = 'TRADING'
+# Seconds to wait before retrying a failed metadata refresh
+REFRESH_RETRY_DELAY = 60
+
+
+@dataclass(frozen=True)
+class SymbolInfo:
+    """Trading rules of a single symbol, taken from exchangeInfo filters"""
+
+    symbol: str
+    base_asset: str
+    quote_asset: str
+    status: str
+    step_size: Decimal
+    min_qty: Decimal
+    tick_size: Decimal
+    min_notional: Decimal
+
+    @property
+    def is_trading(self) -> bool:
+        return self.status == TRADING_STATUS
+
+    def quantize_quantity(self, quantity: float) -> Decimal:
+        """Round a quantity down to the symbol's LOT_SIZE step"""
+        quantity = Decimal(str(quantity))
+        if not self.step_size:
+            return quantity
+        return (quantity / self.step_size).to_integral_value(rounding=ROUND_DOWN) * self.step_size
+
+    def quantize_price(self, price: float) -> Decimal:
+        """Round a price down to the symbol's PRICE_FILTER tick"""
+        price = Decimal(str(price))
+        if not self.tick_size:
+            return price
+        return (price / self.tick_size).to_integral_value(rounding=ROUND_DOWN) * self.tick_size
+
+    def as_dict(self):
+        return {
+            'symbol': self.symbol,
+            'base_asset': self.base_asset,
+            'quote_asset': self.quote_asset,
+            'status': self.status,
+            'step_size': str(self.step_size),
+            'min_qty': str(self.min_qty),
+            'tick_size': str(self.tick_size),
+            'min_notional': str(self.min_notional),
+        }
+
+    @classmethod
+    def from_exchange_info(cls, payload: dict) -> 'SymbolInfo':
+        filters = {f['filterType']: f for f in payload.get('filters', [])}
+        lot_size = filters.get('LOT_SIZE', {})
+        price_filter = filters.get('PRICE_FILTER', {})
+        notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+        return cls(
+            symbol=payload['symbol'],
+            base_asset=payload.get('baseAsset', ''),
+            quote_asset=payload.get('quoteAsset', ''),
+            status=payload.get('status', TRADING_STATUS),
+            step_size=Decimal(lot_size.get('stepSize', '0')).normalize(),
+            min_qty=Decimal(lot_size.get('minQty', '0')),
+            tick_size=Decimal(price_filter.get('tickSize', '0')).normalize(),
+            min_notional=Decimal(notional.get('minNotional', '0')),
+        )
+
+
+class ExchangeMetadataCache:
+    """TTL-refreshed index of exchange symbols and their trading rules.
+
+    The exchangeInfo payload is one of the heaviest endpoints, so it is
+    fetched at most once per TTL and indexed by symbol. If a refresh fails
+    while a previous snapshot exists, the stale snapshot keeps being served.
+    """
+
+    def __init__(self, loader: Optional[Callable[[], dict]] = None, ttl: float = 3600):
+        self.loader = loader
+        self.ttl = ttl
+        self._symbols: Dict[str, SymbolInfo] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_expired(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    def load(self, exchange_info: dict) -> Dict[str, SymbolInfo]:
+        """Replace the index with the symbols of an exchangeInfo payload"""
+        symbols = {
+            payload['symbol']: SymbolInfo.from_exchange_info(payload)
+            for payload in exchange_info.get('symbols', [])
+        }
+        with self._lock:
+            self._symbols = symbols
+            self._loaded_at = time.monotonic()
+        return symbols
+
+    def refresh(self) -> Dict[str, SymbolInfo]:
+        if self.loader is None:
+            raise RuntimeError("Exchange metadata has no loader; call load() with an exchangeInfo payload")
+        return self.load(self.loader())
+
+    def refresh_failed(self, error: Exception):
+        """Keep serving the previous snapshot after a failed refresh, if there is one"""
+        if not self._symbols:
+            raise error
+        logger.warning(f"Exchange metadata refresh failed, serving stale data: {error}")
+        # Retry after a short backoff instead of on every lookup
+        self._loaded_at = time.monotonic() - self.ttl + min(self.ttl, REFRESH_RETRY_DELAY)
+
+    def symbols(self) -> Dict[str, SymbolInfo]:
+        """Return the symbol index, refreshing it when the TTL has expired"""
+        if self.is_expired():
+            try:
+                return self.refresh()
+            except Exception as e:
+                self.refresh_failed(e)
+        return self._symbols
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        return self.symbols().get(symbol)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.symbols()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
@@ -0,0 +1,291 @@
+# Python imports
+import copy
+import zlib
+import numpy as np
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+# App imports
+from src.adapters.exchange import Exchange
+from src.adapters.kline_cache import INTERVAL_MS
+from src.adapters.redis import RedisAdapter
+
+QUOTE_ASSET = 'USDT'
+# Candle open time of the first synthetic candle (2020-09-13)
+EPOCH_MS = 1_600_000_000_000
+DEFAULT_SPREAD = 0.0005
+
+
+class FakeBinanceClient:
+    """In-process stand-in for `binance.client.Client` serving synthetic market data.
+
+    Every symbol follows its own seeded random walk, so the same call always
+    returns the same klines. The clock is frozen at `now_ms` unless moved
+    with `advance`. Only the client methods used by `Exchange` are provided.
+    """
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        now_ms: Optional[int] = None,
+        balances: Optional[Dict[str, float]] = None,
+        cross_quotes: Iterable[str] = (),
+        seed: int = 0,
+    ):
+        self.symbols = list(symbols)
+        self.now_ms = now_ms or EPOCH_MS + 2 * 365 * 24 * 60 * 60 * 1000
+        self.balances = dict(balances or {})
+        # Also list {asset}{quote} pairs for these assets, priced through USDT
+        self.cross_quotes = list(cross_quotes)
+        self.seed = seed
+        self.orders: List[dict] = []
+        # Relative bid-ask spread per symbol served by the book ticker
+        self.spreads: Dict[str, float] = {}
+        self.requests = 0
+        self.response = None
+        self._rows: Dict[tuple, list] = {}
+
+    def advance(self, ms: int):
+        self.now_ms += ms
+
+    def _close(self, symbol: str, open_ms: np.ndarray) -> np.ndarray:
+        """Deterministic random-walk close of a symbol at the given candle open times"""
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+        base = 10 ** rng.uniform(-1, 4)
+        drift = rng.normal(0, 1)
+        phases = rng.uniform(0, 2 * np.pi, 3)
+        t = open_ms / 3_600_000
+        walk = (
+            0.04 * np.sin(t / 17 + phases[0])
+            + 0.02 * np.sin(t / 5.3 + phases[1])
+            + 0.01 * np.sin(t / 1.1 + phases[2])
+            + 0.001 * drift * np.sin(t / 97)
+        )
+        return base * np.exp(walk)
+
+    def _klines(self, symbol: str, interval: str, opens: np.ndarray) -> list:
+        if symbol not in self.symbols:
+            raise ValueError(f"Invalid symbol: {symbol}")
+        step = INTERVAL_MS[interval]
+        key = (symbol, interval, int(opens[0]) if len(opens) else 0, len(opens))
+        if key in self._rows:
+            return copy.copy(self._rows[key])
+        close = self._close(symbol, opens + step)
+        open_ = self._close(symbol, opens)
+        high = np.maximum(open_, close) * 1.001
+        low = np.minimum(open_, close) * 0.999
+        rows = [
+            [
+                int(o), f"{op:.8f}", f"{hi:.8f}", f"{lo:.8f}", f"{cl:.8f}", "1000.00000000",
+                int(o) + step - 1, f"{1000 * cl:.8f}", 100, "500.00000000", f"{500 * cl:.8f}", "0",
+            ]
+            for o, op, hi, lo, cl in zip(opens, open_, high, low, close)
+        ]
+        self._rows[key] = rows
+        return copy.copy(rows)
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500, startTime: Optional[int] = None, **params) -> list:
+        self.requests += 1
+        step = INTERVAL_MS[interval]
+        current = self.now_ms - self.now_ms % step
+        if startTime is None:
+            first = current - (limit - 1) * step
+        else:
+            first = startTime + (-startTime) % step
+        last = min(current, first + (limit - 1) * step)
+        return self._klines(symbol, interval, np.arange(first, last + 1, step, dtype=np.int64))
+
+    def get_historical_klines(self, symbol: str, interval: str, start_str: int, end_str: Optional[int] = None, **params) -> list:
+        step = INTERVAL_MS[interval]
+        current = self.now_ms - self.now_ms % step
+        last = current if end_str is None else min(current, int(end_str))
+        first = int(start_str) + (-int(start_str)) % step
+        return self._klines(symbol, interval, np.arange(first, last + 1, step, dtype=np.int64))
+
+    def _price(self, symbol: str) -> float:
+        if symbol in self.symbols:
+            return float(self._close(symbol, np.array([self.now_ms]))[0])
+        for quote in self.cross_quotes:
+            if symbol.endswith(quote):
+                return self._price(f"{symbol[:-len(quote)]}{QUOTE_ASSET}") / self._price(f"{quote}{QUOTE_ASSET}")
+        raise ValueError(f"Invalid symbol: {symbol}")
+
+    def _listed_symbols(self) -> List[str]:
+        listed = list(self.symbols)
+        for quote in self.cross_quotes:
+            listed.extend(
+                f"{symbol[:-len(QUOTE_ASSET)]}{quote}"
+                for symbol in self.symbols
+                if symbol[:-len(QUOTE_ASSET)] != quote
+            )
+        return listed
+
+    def get_symbol_ticker(self, symbol: str) -> dict:
+        self.requests += 1
+        return {'symbol': symbol, 'price': f"{self._price(symbol):.8f}"}
+
+    def get_all_tickers(self) -> list:
+        self.requests += 1
+        return [{'symbol': symbol, 'price': f"{self._price(symbol):.8f}"} for symbol in self._listed_symbols()]
+
+    def get_orderbook_tickers(self) -> list:
+        self.requests += 1
+        tickers = []
+        for symbol in self._listed_symbols():
+            price = self._price(symbol)
+            half_spread = self.spreads.get(symbol, DEFAULT_SPREAD) / 2
+            tickers.append({
+                'symbol': symbol,
+                'bidPrice': f"{price * (1 - half_spread):.8f}",
+                'askPrice': f"{price * (1 + half_spread):.8f}",
+            })
+        return tickers
+
+    def get_asset_balance(self, asset: str) -> dict:
+        self.requests += 1
+        return {'asset': asset, 'free': f"{self.balances.get(asset, 0.0):.8f}", 'locked': '0.00000000'}
+
+    def get_account(self) -> dict:
+        self.requests += 1
+        return {
+            'balances': [
+                {'asset': asset, 'free': f"{free:.8f}", 'locked': '0.00000000'}
+                for asset, free in self.balances.items()
+            ],
+        }
+
+    def get_exchange_info(self) -> dict:
+        self.requests += 1
+        symbols = []
+        for symbol in self._listed_symbols():
+            quote = next((q for q in [QUOTE_ASSET, *self.cross_quotes] if symbol.endswith(q)), QUOTE_ASSET)
+            symbols.append({
+                'symbol': symbol,
+                'status': 'TRADING',
+                'baseAsset': symbol[:-len(quote)],
+                'quoteAsset': quote,
+                'filters': [
+                    {'filterType': 'LOT_SIZE', 'stepSize': '0.00001000', 'minQty': '0.00001000'},
+                    {'filterType': 'PRICE_FILTER', 'tickSize': '0.00000001'},
+                    {'filterType': 'NOTIONAL', 'minNotional': '5.00000000'},
+                ],
+            })
+        return {'symbols': symbols}
+
+    def create_test_order(self, **params) -> dict:
+        self.requests += 1
+        self.orders.append(params)
+        return {}
+
+
+class FakeExchange(Exchange):
+    """`Exchange` driven by a `FakeBinanceClient`, so the adapter code runs unchanged offline"""
+
+    def __init__(self, fake_client: FakeBinanceClient, **kwargs):
+        kwargs.setdefault('api_key', None)
+        kwargs.setdefault('api_secret', None)
+        kwargs.setdefault('api_url', None)
+        super().__init__(**kwargs)
+        self.client = fake_client
+
+    def get_client(self) -> FakeBinanceClient:
+        return self.client
+
+
+class FakeRedisClient:
+    """In-memory stand-in for `redis.Redis` (decoded responses) with the commands the adapters use"""
+
+    def __init__(self):
+        self.data: Dict[str, object] = {}
+
+    def hset(self, key: str, field: Optional[str] = None, value=None, mapping: Optional[dict] = None) -> int:
+        state = self.data.setdefault(key, {})
+        values = dict(mapping or {})
+        if field is not None:
+            values[field] = value
+        added = len(set(values) - set(state))
+        state.update({k: str(v) for k, v in values.items()})
+        return added
+
+    def hsetnx(self, key: str, field: str, value) -> int:
+        state = self.data.setdefault(key, {})
+        if field in state:
+            return 0
+        state[field] = str(value)
+        return 1
+
+    def hgetall(self, key: str) -> dict:
+        return dict(self.data.get(key, {}))
+
+    def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def lpush(self, key: str, *values) -> int:
+        items = self.data.setdefault(key, [])
+        for value in values:
+            items.insert(0, str(value))
+        return len(items)
+
+    def lrange(self, key: str, start: int, end: int) -> list:
+        items = self.data.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def pipeline(self, transaction: bool = True) -> 'FakeRedisPipeline':
+        return FakeRedisPipeline(self)
+
+
+class FakeRedisPipeline:
+    """Queues commands and runs them in order on `execute`"""
+
+    def __init__(self, client: FakeRedisClient):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name: str):
+        command = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    def execute(self) -> list:
+        commands, self.commands = self.commands, []
+        return [command(*args, **kwargs) for command, args, kwargs in commands]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.commands = []
+
+
+class FakeRedisAdapter(RedisAdapter):
+    """`RedisAdapter` on a `FakeRedisClient`, so the adapter code runs unchanged without a server"""
+
+    def __init__(self):
+        self.redis = FakeRedisClient()
+
+
+class FakeTelegramAdapter:
+    """Collects notifications instead of sending them"""
+
+    def __init__(self):
+        self.messages: List[str] = []
+        self.notifications = None
+
+    async def send_message(self, message: str):
+        self.messages.append(message)
+
+    async def notify(self, message: str):
+        self.messages.append(message)
+
+    def start(self):
+        pass
+
+    async def flush(self, timeout: Optional[float] = None):
+        pass
@@ -0,0 +1,161 @@
+# Python imports
+import threading
+from collections import deque
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# Kline row layout as returned by the Binance REST API
+OPEN_TIME_INDEX = 0
+CLOSE_INDEX = 4
+CLOSE_TIME_INDEX = 6
+
+INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 3 * 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '30m': 30 * 60_000,
+    '1h': 60 * 60_000,
+    '2h': 2 * 60 * 60_000,
+    '4h': 4 * 60 * 60_000,
+    '6h': 6 * 60 * 60_000,
+    '8h': 8 * 60 * 60_000,
+    '12h': 12 * 60 * 60_000,
+    '1d': 24 * 60 * 60_000,
+    '3d': 3 * 24 * 60 * 60_000,
+    '1w': 7 * 24 * 60 * 60_000,
+}
+
+
+class KlineCache:
+    """Rolling buffer of closed klines per (symbol, interval).
+
+    Only candles known to be closed are stored. The last row of any REST
+    response may still be open, so it is never cached and is refetched on
+    the next call. An incremental indicator engine given as `indicators` is
+    kept in step with the buffers, one constant-time update per new candle.
+    """
+
+    def __init__(self, max_candles: int = 1000, indicators=None):
+        self.max_candles = max_candles
+        self.indicators = indicators
+        self._buffers: Dict[Tuple[str, str], deque] = {}
+        # Still-open candle and stream status, maintained by a kline stream
+        self._live: Dict[Tuple[str, str], list] = {}
+        self._streaming: set = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_supported(interval: str) -> bool:
+        return interval in INTERVAL_MS
+
+    def get(self, symbol: str, interval: str) -> List[list]:
+        """Return a copy of the cached closed klines, oldest first"""
+        with self._lock:
+            buffer = self._buffers.get((symbol, interval))
+            return list(buffer) if buffer else []
+
+    def size(self, symbol: str, interval: str) -> int:
+        with self._lock:
+            buffer = self._buffers.get((symbol, interval))
+            return len(buffer) if buffer else 0
+
+    def last_close_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Return the close time (ms) of the newest cached closed kline"""
+        with self._lock:
+            buffer = self._buffers.get((symbol, interval))
+            if not buffer:
+                return None
+            return int(buffer[-1][CLOSE_TIME_INDEX])
+
+    @staticmethod
+    def _candles(klines: Iterable[list]) -> List[Tuple[int, float]]:
+        return [(int(kline[OPEN_TIME_INDEX]), float(kline[CLOSE_INDEX])) for kline in klines]
+
+    def replace(self, symbol: str, interval: str, klines: Iterable[list]):
+        """Replace the buffer with the given closed klines"""
+        with self._lock:
+            buffer = self._buffers[(symbol, interval)] = deque(klines, maxlen=self.max_candles)
+            if self.indicators is not None:
+                self.indicators.reset(symbol, interval, self._candles(buffer))
+
+    def seed(self, symbol: str, interval: str, klines: Iterable[list]) -> bool:
+        """Fill the buffer with the given closed klines unless it already holds some"""
+        with self._lock:
+            if self._buffers.get((symbol, interval)):
+                return False
+            buffer = self._buffers[(symbol, interval)] = deque(klines, maxlen=self.max_candles)
+            if self.indicators is not None:
+                self.indicators.reset(symbol, interval, self._candles(buffer))
+            return True
+
+    def items(self) -> List[Tuple[Tuple[str, str], List[list]]]:
+        """Copy of every closed-kline buffer, keyed by (symbol, interval)"""
+        with self._lock:
+            return [(key, list(buffer)) for key, buffer in self._buffers.items()]
+
+    def extend(self, symbol: str, interval: str, klines: Iterable[list]):
+        """Append closed klines newer than the newest cached one"""
+        with self._lock:
+            buffer = self._buffers.setdefault(
+                (symbol, interval),
+                deque(maxlen=self.max_candles),
+            )
+            last_open_time = int(buffer[-1][OPEN_TIME_INDEX]) if buffer else None
+            appended = []
+            for kline in klines:
+                if last_open_time is not None and int(kline[OPEN_TIME_INDEX]) <= last_open_time:
+                    continue
+                buffer.append(kline)
+                appended.append(kline)
+                last_open_time = int(kline[OPEN_TIME_INDEX])
+            if appended and self.indicators is not None:
+                self.indicators.extend(symbol, interval, self._candles(appended))
+
+    def set_live(self, symbol: str, interval: str, kline: Optional[list]):
+        """Store the still-open candle of a key, or clear it with None"""
+        with self._lock:
+            if kline is None:
+                self._live.pop((symbol, interval), None)
+            else:
+                self._live[(symbol, interval)] = kline
+
+    def get_live(self, symbol: str, interval: str) -> Optional[list]:
+        with self._lock:
+            return self._live.get((symbol, interval))
+
+    def set_streaming(self, symbol: str, interval: str, streaming: bool):
+        """Mark whether a live stream is currently keeping a key up to date"""
+        with self._lock:
+            if streaming:
+                self._streaming.add((symbol, interval))
+            else:
+                self._streaming.discard((symbol, interval))
+                self._live.pop((symbol, interval), None)
+
+    def is_streaming(self, symbol: str, interval: str) -> bool:
+        with self._lock:
+            return (symbol, interval) in self._streaming
+
+    def retain(self, symbols: Iterable[str]):
+        """Evict every buffer whose symbol is not in the given symbols"""
+        keep = set(symbols)
+        with self._lock:
+            for key in [key for key in self._buffers if key[0] not in keep]:
+                del self._buffers[key]
+            for key in [key for key in self._live if key[0] not in keep]:
+                del self._live[key]
+            if self.indicators is not None:
+                self.indicators.retain(keep)
+
+    def clear(self):
+        with self._lock:
+            self._buffers.clear()
+            self._live.clear()
+            if self.indicators is not None:
+                self.indicators.clear()
@@ -0,0 +1,200 @@
+# Python imports
+import json
+import os
+import struct
+import time
+import zlib
+import numpy as np
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+# App imports
+from src.conf.logger import Trace
+from src.adapters.metrics import metrics
+from src.adapters.candle_store import CANDLE_COLUMNS
+from src.adapters.kline_cache import (
+    CLOSE_TIME_INDEX,
+    KlineCache,
+)
+
+logger = Trace(__name__).logger
+
+SNAPSHOT_MAGIC = b'KSNP'
+# Bumped whenever the layout changes; snapshots of another version are ignored
+SNAPSHOT_VERSION = 1
+# Magic, version and header length
+SNAPSHOT_PREAMBLE = struct.Struct('<4sHI')
+KLINE_ROW_LENGTH = 12
+
+Buffers = Dict[Tuple[str, str], List[list]]
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def encode_snapshot(buffers: Buffers, created_ms: Optional[int] = None) -> bytes:
+    """Serialize closed-kline buffers into a compressed, versioned snapshot.
+
+    Every column is stored as 64-bit integers (floats by their bit pattern)
+    and delta-encoded along the buffer before compression. Consecutive
+    timestamps then become a run of identical interval lengths and
+    neighbouring prices share most of their bits, so zlib shrinks them well
+    while the values are restored exactly.
+    """
+    keys = [(symbol, interval, klines) for (symbol, interval), klines in buffers.items() if klines]
+    header = {
+        'created_ms': created_ms if created_ms is not None else int(time.time() * 1000),
+        'columns': list(CANDLE_COLUMNS),
+        'keys': [{'symbol': symbol, 'interval': interval, 'rows': len(klines)} for symbol, interval, klines in keys],
+    }
+    body = []
+    for _, _, klines in keys:
+        for dtype, index in CANDLE_COLUMNS.values():
+            values = np.array([kline[index] for kline in klines], dtype=np.float64).astype(dtype)
+            bits = values.view('<i8')
+            body.append(np.diff(bits, prepend=np.int64(0)).tobytes())
+    encoded_header = json.dumps(header, separators=(',', ':')).encode()
+    return (
+        SNAPSHOT_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(encoded_header))
+        + encoded_header
+        + zlib.compress(b''.join(body))
+    )
+
+
+def decode_snapshot(data: bytes) -> Tuple[dict, Buffers]:
+    """Return the header and the buffers of a snapshot, as REST-style kline rows"""
+    if len(data) < SNAPSHOT_PREAMBLE.size:
+        raise SnapshotError("Snapshot is truncated")
+    magic, version, header_length = SNAPSHOT_PREAMBLE.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("Not a kline snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    offset = SNAPSHOT_PREAMBLE.size
+    header = json.loads(data[offset:offset + header_length])
+    if header['columns'] != list(CANDLE_COLUMNS):
+        raise SnapshotError("Snapshot columns do not match")
+    body = np.frombuffer(zlib.decompress(data[offset + header_length:]), dtype='<i8')
+    if len(body) != sum(key['rows'] for key in header['keys']) * len(CANDLE_COLUMNS):
+        raise SnapshotError("Snapshot body does not match its header")
+    buffers = {}
+    position = 0
+    for key in header['keys']:
+        rows = key['rows']
+        klines = [[0] * KLINE_ROW_LENGTH for _ in range(rows)]
+        for dtype, index in CANDLE_COLUMNS.values():
+            bits = np.cumsum(body[position:position + rows], dtype=np.int64)
+            position += rows
+            for kline, value in zip(klines, bits.view(dtype).tolist()):
+                kline[index] = value
+        buffers[(key['symbol'], key['interval'])] = klines
+    return header, buffers
+
+
+class FileSnapshotStore:
+    """Snapshot kept in a local file, replaced atomically on every save"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def save(self, data: bytes):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'wb') as handle:
+            handle.write(data)
+        os.replace(temporary, self.path)
+
+    def load(self) -> Optional[bytes]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'rb') as handle:
+            return handle.read()
+
+
+class RedisSnapshotStore:
+    """Snapshot kept under one Redis key, so it survives the process moving to another host"""
+
+    def __init__(self, redis_client, key: str):
+        # Needs a client that returns bytes, i.e. created with decode_responses=False
+        self.redis = redis_client
+        self.key = key
+
+    def save(self, data: bytes):
+        self.redis.set(self.key, data)
+
+    def load(self) -> Optional[bytes]:
+        return self.redis.get(self.key)
+
+
+class KlineSnapshotter:
+    """Persists the kline cache's closed candles so a restart only backfills the gap.
+
+    The open candle and stream state are not kept: the first request after a
+    restore fetches the candles closed since the snapshot plus the open one,
+    exactly as it would after a short pause. Indicator state is not kept
+    either: seeding the cache rebuilds the streaming indicators from the
+    restored candles.
+    """
+
+    def __init__(
+        self,
+        kline_cache: KlineCache,
+        store,
+        interval: float = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.kline_cache = kline_cache
+        self.store = store
+        # Minimum seconds between two saves by `save_due`
+        self.interval = interval
+        self.clock = clock
+        self._saved_at: Optional[float] = None
+
+    def save(self) -> int:
+        """Write a snapshot of every buffer; returns its size in bytes"""
+        buffers = dict(self.kline_cache.items())
+        # An empty cache, e.g. after a failed start, must not overwrite a useful snapshot
+        if not buffers:
+            return 0
+        with metrics.span('snapshot', operation='save'):
+            data = encode_snapshot(buffers)
+            self.store.save(data)
+        self._saved_at = self.clock()
+        return len(data)
+
+    def save_due(self) -> Optional[int]:
+        """Save unless the previous snapshot is younger than the interval"""
+        if self._saved_at is not None and self.clock() - self._saved_at < self.interval:
+            return None
+        return self.save()
+
+    def restore(self) -> int:
+        """Seed the empty cache buffers from the stored snapshot; returns how many were restored"""
+        with metrics.span('snapshot', operation='restore'):
+            try:
+                data = self.store.load()
+                if not data:
+                    return 0
+                _, buffers = decode_snapshot(data)
+            except Exception as e:
+                logger.warning(f"Ignoring kline snapshot: {e}")
+                return 0
+            restored = 0
+            for (symbol, interval), klines in buffers.items():
+                if self.kline_cache.seed(symbol, interval, klines):
+                    restored += 1
+        newest = max((int(klines[-1][CLOSE_TIME_INDEX]) for klines in buffers.values()), default=None)
+        age = (time.time() * 1000 - newest) / 1000 if newest is not None else 0
+        logger.info(
+            f"Restored {restored}/{len(buffers)} kline buffers from a snapshot; "
+            f"newest candle closed {age:.0f}s ago."
+        )
+        return restored
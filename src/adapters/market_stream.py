@@ -0,0 +1,197 @@
+# Python imports
+import asyncio
+import json
+import websockets
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+# App imports
+from src.conf.logger import Trace
+from src.adapters.exchange import Exchange
+from src.adapters.kline_cache import (
+    OPEN_TIME_INDEX,
+    KlineCache,
+)
+
+logger = Trace(__name__).logger
+
+CandleCloseCallback = Callable[[str, str, list], Awaitable[None]]
+
+
+def kline_event_to_row(kline: dict) -> list:
+    """Convert a websocket kline payload into the REST kline row layout"""
+    return [
+        kline['t'],
+        kline['o'],
+        kline['h'],
+        kline['l'],
+        kline['c'],
+        kline['v'],
+        kline['T'],
+        kline['q'],
+        kline['n'],
+        kline['V'],
+        kline['Q'],
+        kline.get('B', '0'),
+    ]
+
+
+class KlineStream:
+    """Keeps the kline cache current from Binance kline websocket streams.
+
+    Closed candles are appended to the cache and reported through
+    `on_candle_close`; the still-open candle is kept as the cache's live row
+    so `Exchange.get_historical_data` can be served without REST calls. On
+    every (re)connect, and whenever a gap is detected, the affected buffers
+    are backfilled through the exchange's REST klines endpoint.
+    """
+
+    def __init__(
+        self,
+        exchange: Exchange,
+        kline_cache: KlineCache,
+        ws_url: str,
+        on_candle_close: Optional[CandleCloseCallback] = None,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 60.0,
+    ):
+        self.exchange = exchange
+        self.kline_cache = kline_cache
+        self.ws_url = ws_url.rstrip('/')
+        self.on_candle_close = on_candle_close
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.subscriptions: Dict[Tuple[str, str], int] = {}
+        self._stopped = False
+        self._resubscribed = False
+        self._connection = None
+
+    def subscribe(self, symbols: Iterable[str], interval: str, lookback: int):
+        """Track `symbols` on `interval`, keeping at least `lookback` candles"""
+        for symbol in symbols:
+            key = (symbol, interval)
+            self.subscriptions[key] = max(lookback, self.subscriptions.get(key, 0))
+
+    async def resubscribe(self, symbols: Iterable[str], lookbacks: Dict[str, int]) -> bool:
+        """Replace the subscriptions with `symbols` on every interval of `lookbacks`.
+
+        When the streams change, the open connection is closed so `run`
+        reconnects to the new streams right away and backfills them. Returns
+        whether the subscriptions changed.
+        """
+        subscriptions = {
+            (symbol, interval): lookback
+            for symbol in symbols
+            for interval, lookback in lookbacks.items()
+        }
+        if subscriptions.keys() == self.subscriptions.keys():
+            self.subscriptions.update(subscriptions)
+            return False
+        for symbol, interval in self.subscriptions.keys() - subscriptions.keys():
+            self.kline_cache.set_streaming(symbol, interval, False)
+        logger.info(f"Kline stream subscriptions changed ({len(subscriptions)} subscriptions). Reconnecting...")
+        self.subscriptions = subscriptions
+        if self._connection is not None:
+            self._resubscribed = True
+            await self._connection.close()
+        return True
+
+    def stream_url(self) -> str:
+        streams = '/'.join(
+            f"{symbol.lower()}@kline_{interval}" for symbol, interval in self.subscriptions
+        )
+        return f"{self.ws_url}/stream?streams={streams}"
+
+    async def run(self):
+        """Consume the streams until `stop` is called, reconnecting on failure"""
+        delay = self.reconnect_delay
+        while not self._stopped:
+            try:
+                async with websockets.connect(self.stream_url()) as connection:
+                    self._connection = connection
+                    logger.info(f"Kline stream connected ({len(self.subscriptions)} subscriptions).")
+                    await self.resync()
+                    delay = self.reconnect_delay
+                    async for message in connection:
+                        await self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._stopped:
+                    break
+                logger.warning(f"Kline stream disconnected: {e}. Reconnecting in {delay}s...")
+            finally:
+                self._connection = None
+                self._mark_streaming(False)
+            if self._stopped:
+                break
+            if self._resubscribed:
+                self._resubscribed = False
+                continue
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def stop(self):
+        self._stopped = True
+        if self._connection is not None:
+            await self._connection.close()
+
+    async def resync(self):
+        """Backfill every subscribed buffer over REST, then serve it from the stream.
+
+        A key that fails to backfill, e.g. a symbol that is not listed, is
+        skipped and keeps being served over REST, so it cannot hold back the others.
+        """
+        for symbol, interval in list(self.subscriptions):
+            try:
+                await self.resync_key(symbol, interval)
+            except Exception as e:
+                logger.warning(f"Failed to resync {symbol} {interval}, skipping it: {e}")
+
+    async def resync_key(self, symbol: str, interval: str):
+        self.kline_cache.set_streaming(symbol, interval, False)
+        await asyncio.to_thread(
+            self.exchange.get_klines,
+            symbol=symbol,
+            interval=interval,
+            lookback=self.subscriptions[(symbol, interval)],
+        )
+        self.kline_cache.set_streaming(symbol, interval, True)
+
+    async def handle_message(self, message: str):
+        payload = json.loads(message)
+        event = payload.get('data', payload)
+        if event.get('e') != 'kline':
+            return
+        kline = event['k']
+        symbol = kline['s']
+        interval = kline['i']
+        if (symbol, interval) not in self.subscriptions:
+            return
+        row = kline_event_to_row(kline)
+        if not kline['x']:
+            self.kline_cache.set_live(symbol, interval, row)
+            return
+        last_close_time = self.kline_cache.last_close_time(symbol, interval)
+        # Candles replayed after a reconnect are already cached
+        if last_close_time is not None and int(row[OPEN_TIME_INDEX]) <= last_close_time:
+            return
+        if last_close_time is not None and int(row[OPEN_TIME_INDEX]) > last_close_time + 1:
+            logger.warning(f"Gap detected in {symbol} {interval} stream. Resyncing...")
+            await self.resync_key(symbol, interval)
+        self.kline_cache.extend(symbol, interval, [row])
+        # Storing may backfill the candle store over REST, which can wait on the rate limiter
+        await asyncio.to_thread(self.exchange.store_klines, symbol, interval, [row])
+        self.kline_cache.set_live(symbol, interval, None)
+        if self.on_candle_close is not None:
+            await self.on_candle_close(symbol, interval, row)
+
+    def _mark_streaming(self, streaming: bool):
+        for symbol, interval in self.subscriptions:
+            self.kline_cache.set_streaming(symbol, interval, streaming)
@@ -0,0 +1,258 @@
+# Python imports
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# App imports
+from src.conf.logger import Trace
+
+logger = Trace(__name__).logger
+
+NAMESPACE = 'trading_bot'
+# Latency buckets in seconds, from a cached kline lookup to a full market scan
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+STAGE_SECONDS = 'stage_duration_seconds'
+STAGE_ERRORS = 'stage_errors_total'
+EXCHANGE_REQUESTS = 'exchange_requests_total'
+EXCHANGE_USED_WEIGHT = 'exchange_used_weight'
+STARTUP_SECONDS = 'startup_seconds'
+
+METRIC_HELP = {
+    STAGE_SECONDS: 'Duration of each bot stage',
+    STAGE_ERRORS: 'Stage runs that raised an exception',
+    EXCHANGE_REQUESTS: 'Exchange REST requests by endpoint and HTTP status',
+    EXCHANGE_USED_WEIGHT: 'Request weight used in the current minute, as reported by the exchange',
+    STARTUP_SECONDS: 'Seconds the process took to become ready and to warm up',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+# Returns (metric name, labels, value) samples exposed as gauges on every scrape
+Collector = Callable[[], Iterable[Tuple[str, dict, float]]]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as exposed by Prometheus"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+class StageTotals:
+    """Runs of one stage within the current tick"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+
+class MetricsRegistry:
+    """In-process counters, gauges and latency histograms of the bot.
+
+    `span` times a stage into a histogram labelled by stage, and also into
+    per-tick totals that `tick_summary` reports and `begin_tick` resets. The
+    registry is rendered in the Prometheus text format by `render`.
+    """
+
+    def __init__(self, namespace: str = NAMESPACE, clock: Callable[[], float] = time.perf_counter):
+        self.namespace = namespace
+        self.clock = clock
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._collectors: List[Collector] = []
+        self._tick: Dict[str, StageTotals] = {}
+        self._tick_started = clock()
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def add_collector(self, collector: Collector):
+        """Register a callable whose samples are read as gauges on every scrape"""
+        self._collectors.append(collector)
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        """Time the block as a run of `stage`; failures are counted separately"""
+        started = self.clock()
+        try:
+            yield
+        except BaseException:
+            self.inc(STAGE_ERRORS, stage=stage)
+            raise
+        finally:
+            duration = self.clock() - started
+            self.observe(STAGE_SECONDS, duration, stage=stage, **labels)
+            with self._lock:
+                self._tick.setdefault(stage, StageTotals()).add(duration)
+
+    def begin_tick(self):
+        with self._lock:
+            self._tick = {}
+            self._tick_started = self.clock()
+
+    def tick_summary(self) -> str:
+        """One-line breakdown of where the current tick's time went, slowest stage first"""
+        with self._lock:
+            elapsed = self.clock() - self._tick_started
+            stages = sorted(self._tick.items(), key=lambda item: item[1].total, reverse=True)
+        parts = [
+            f"{stage} {totals.total:.3f}s/{totals.count}x (max {totals.max:.3f}s)"
+            for stage, totals in stages
+        ]
+        return f"Tick took {elapsed:.3f}s: " + (', '.join(parts) or 'no stages recorded')
+
+    def render(self) -> str:
+        """Expose every metric in the Prometheus text format"""
+        collected = []
+        for collector in self._collectors:
+            try:
+                collected.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+        lines = []
+        with self._lock:
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            for name, labels, value in collected:
+                gauges.setdefault(name, {})[_labels(labels)] = value
+            for name, series in sorted(self._counters.items()):
+                self._render_header(lines, name, 'counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{self.namespace}_{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, series in sorted(gauges.items()):
+                self._render_header(lines, name, 'gauge')
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{self.namespace}_{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                self._render_header(lines, name, 'histogram')
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        bucket_labels = labels + (('le', _format_value(bound)),)
+                        lines.append(f"{self.namespace}_{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{self.namespace}_{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{self.namespace}_{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{self.namespace}_{name}_count{_format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def _render_header(self, lines: list, name: str, kind: str):
+        if name in METRIC_HELP:
+            lines.append(f"# HELP {self.namespace}_{name} {METRIC_HELP[name]}")
+        lines.append(f"# TYPE {self.namespace}_{name} {kind}")
+
+
+class MetricsServer:
+    """Serves a registry on `/metrics` from a background thread"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 9100):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._server is not None:
+            return
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+
+# Process-wide registry shared by every instrumented module
+metrics = MetricsRegistry()
@@ -0,0 +1,188 @@
+# Python imports
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Dict,
+    Mapping,
+    Optional,
+)
+
+# App imports
+from src.conf.logger import Trace
+
+logger = Trace(__name__).logger
+
+# Request priorities, most urgent first
+PRIORITY_ORDER = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET_DATA = 2
+PRIORITY_SCAN = 3
+
+# Share of the per-minute budget each priority may use. Lower priorities stop
+# earlier, which keeps headroom for orders and balance checks.
+PRIORITY_BUDGET_SHARE = {
+    PRIORITY_ORDER: 1.0,
+    PRIORITY_ACCOUNT: 0.95,
+    PRIORITY_MARKET_DATA: 0.85,
+    PRIORITY_SCAN: 0.7,
+}
+
+# Binance spot REQUEST_WEIGHT limit per minute and IP
+DEFAULT_WEIGHT_LIMIT = 6000
+USED_WEIGHT_HEADER = 'X-MBX-USED-WEIGHT-1M'
+RETRY_AFTER_HEADER = 'Retry-After'
+WINDOW_SECONDS = 60
+# How often a request waiting behind a more urgent one re-checks the budget
+WAITER_POLL_INTERVAL = 0.05
+
+# Weight of each REST endpoint (path relative to /api/v3)
+ENDPOINT_WEIGHTS = {
+    'klines': 2,
+    'ticker/price': 2,
+    'ticker/bookTicker': 2,
+    'account': 20,
+    'exchangeInfo': 20,
+    'order': 1,
+    'order/test': 1,
+}
+ENDPOINT_PRIORITIES = {
+    'order': PRIORITY_ORDER,
+    'order/test': PRIORITY_ORDER,
+    'account': PRIORITY_ACCOUNT,
+}
+
+_request_priority: ContextVar[Optional[int]] = ContextVar('request_priority', default=None)
+
+
+def request_weight(path: str, params: Optional[Mapping] = None) -> int:
+    if path in ('ticker/price', 'ticker/bookTicker') and not (params or {}).get('symbol'):
+        # All-symbol price and book tickers
+        return 4
+    return ENDPOINT_WEIGHTS.get(path, 1)
+
+
+def request_priority(path: str) -> int:
+    """Endpoint priority, lowered for market data requested inside `priority(...)`"""
+    default = ENDPOINT_PRIORITIES.get(path, PRIORITY_MARKET_DATA)
+    override = _request_priority.get()
+    if default == PRIORITY_MARKET_DATA and override is not None:
+        return override
+    return default
+
+
+@contextmanager
+def priority(value: int):
+    """Run the market data requests of the block with the given priority"""
+    token = _request_priority.set(value)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+class RequestWeightLimiter:
+    """Shared per-minute request weight budget for every exchange adapter.
+
+    Usage is tracked locally per wall-clock minute (as Binance does) and
+    corrected with the used-weight header of every response. A request is
+    admitted when it fits in its priority's share of the budget and no more
+    urgent request is waiting; otherwise it waits, for at most the rest of
+    the window. 429/418 replies block every request until their Retry-After
+    has passed.
+    """
+
+    def __init__(self, limit: int = DEFAULT_WEIGHT_LIMIT, clock=time.time):
+        self.limit = limit
+        self.clock = clock
+        self.throttled = 0
+        self._window = self._current_window()
+        self._used = 0
+        self._blocked_until = 0.0
+        self._waiters: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+
+    def _current_window(self) -> int:
+        return int(self.clock() // WINDOW_SECONDS)
+
+    def _roll_window(self):
+        window = self._current_window()
+        if window != self._window:
+            self._window = window
+            self._used = 0
+
+    @property
+    def used_weight(self) -> int:
+        with self._lock:
+            self._roll_window()
+            return self._used
+
+    def _try_acquire(self, weight: int, priority: int) -> float:
+        """Take the weight and return 0, or return how long to wait before retrying"""
+        now = self.clock()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        self._roll_window()
+        if any(count for level, count in self._waiters.items() if level < priority):
+            return WAITER_POLL_INTERVAL
+        budget = self.limit * PRIORITY_BUDGET_SHARE.get(priority, PRIORITY_BUDGET_SHARE[PRIORITY_SCAN])
+        if self._used + weight > budget:
+            return (self._window + 1) * WINDOW_SECONDS - now
+        self._used += weight
+        return 0.0
+
+    def _add_waiter(self, priority: int, delta: int):
+        self._waiters[priority] = self._waiters.get(priority, 0) + delta
+
+    def acquire(self, weight: int, priority: int = PRIORITY_MARKET_DATA):
+        """Block the calling thread until the request fits in the budget"""
+        with self._condition:
+            delay = self._try_acquire(weight, priority)
+            if not delay:
+                return
+            self.throttled += 1
+            self._add_waiter(priority, 1)
+            try:
+                while delay:
+                    self._condition.wait(min(delay, WINDOW_SECONDS))
+                    delay = self._try_acquire(weight, priority)
+            finally:
+                self._add_waiter(priority, -1)
+                self._condition.notify_all()
+
+    async def acquire_async(self, weight: int, priority: int = PRIORITY_MARKET_DATA):
+        """Wait on the event loop until the request fits in the budget"""
+        with self._lock:
+            delay = self._try_acquire(weight, priority)
+            if not delay:
+                return
+            self.throttled += 1
+            self._add_waiter(priority, 1)
+        try:
+            while delay:
+                await asyncio.sleep(min(delay, WINDOW_SECONDS))
+                with self._lock:
+                    delay = self._try_acquire(weight, priority)
+        finally:
+            with self._condition:
+                self._add_waiter(priority, -1)
+                self._condition.notify_all()
+
+    def update(self, headers: Optional[Mapping], status: Optional[int] = None):
+        """Reconcile with a response's used-weight header and honour 429/418 replies"""
+        if not headers:
+            return
+        with self._condition:
+            used = headers.get(USED_WEIGHT_HEADER)
+            if used is not None:
+                self._roll_window()
+                # Concurrent responses can arrive out of order; usage only grows within a window
+                self._used = max(self._used, int(used))
+            if status in (418, 429):
+                retry_after = float(headers.get(RETRY_AFTER_HEADER) or WINDOW_SECONDS)
+                self._blocked_until = max(self._blocked_until, self.clock() + retry_after)
+                logger.warning(f"Exchange rate limit hit (HTTP {status}). Pausing requests for {retry_after}s.")
+            self._condition.notify_all()
@@ -1,10 +1,52 @@
 # Python imports
+import asyncio
 import json
+import math
 from datetime import (
     datetime,
     timezone,
 )
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+)
 import redis
+import redis.asyncio
+
+# Field name -> type of a hash stored through the adapter, e.g. {'entry_price': float}
+StateSchema = Dict[str, Callable]
+
+
+def encode_value(value) -> str:
+    """Encode a hash field value so it round-trips through its schema type"""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def decode_value(value: str, field_type: Callable):
+    if field_type is bool:
+        return value == '1'
+    if field_type in (dict, list):
+        return json.loads(value)
+    return field_type(value)
+
+
+def parse_untyped_value(value: str):
+    """Best-effort decoding of fields without a schema: numbers become floats"""
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    # Keep words such as "NaN" or "inf" (valid asset names) as strings
+    return number if math.isfinite(number) else value
+
 
 class RedisAdapter:
     def __init__(
@@ -21,14 +63,50 @@ class RedisAdapter:
             decode_responses=decode_responses,
         )
 
-    def set_state(self, key: str, mapping: dict):
-        self.redis.hset(key, mapping=mapping)
+    @staticmethod
+    def encode_state(mapping: dict) -> dict:
+        return {k: encode_value(v) for k, v in mapping.items()}
 
-    def get_state(self, key: str):
-        state = self.redis.hgetall(key)
+    @staticmethod
+    def decode_state(state: dict, schema: Optional[StateSchema] = None) -> Optional[dict]:
+        """Decode a raw hash, casting the fields listed in the schema to their types"""
         if not state:
             return None
-        return {k: float(v) if v.replace('.', '', 1).isdigit() else v for k, v in state.items()}
+        schema = schema or {}
+        return {
+            k: decode_value(v, schema[k]) if k in schema else parse_untyped_value(v)
+            for k, v in state.items()
+        }
+
+    def set_state(self, key: str, mapping: dict):
+        self.redis.hset(key, mapping=self.encode_state(mapping))
+
+    def get_state(self, key: str, schema: Optional[StateSchema] = None):
+        return self.decode_state(self.redis.hgetall(key), schema)
+
+    def get_states(self, keys: Iterable[str], schema: Optional[StateSchema] = None) -> dict:
+        """Read several hashes in a single round-trip"""
+        keys = list(keys)
+        pipeline = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipeline.hgetall(key)
+        return {
+            key: self.decode_state(state, schema)
+            for key, state in zip(keys, pipeline.execute())
+        }
+
+    def get_or_init_state(
+        self,
+        key: str,
+        defaults: dict,
+        schema: Optional[StateSchema] = None,
+    ) -> dict:
+        """Fill in missing fields with defaults and read the hash, atomically and in one round-trip"""
+        pipeline = self.redis.pipeline(transaction=True)
+        for field, value in self.encode_state(defaults).items():
+            pipeline.hsetnx(key, field, value)
+        pipeline.hgetall(key)
+        return self.decode_state(pipeline.execute()[-1], schema)
 
     def clear_state(self, key: str):
         self.redis.delete(key)
@@ -36,6 +114,24 @@ class RedisAdapter:
     def push_record(self, key: str, record: dict):
         self.redis.lpush(key, json.dumps(record))
 
+    def push_record_and_set_state(
+        self,
+        records_key: str,
+        record: dict,
+        state_key: str,
+        mapping: dict,
+    ):
+        """Append a record and replace a state hash in one MULTI/EXEC transaction.
+
+        Either both writes are applied or neither is, so a crash between them
+        cannot leave a recorded trade without the matching state.
+        """
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.lpush(records_key, json.dumps(record))
+        pipeline.delete(state_key)
+        pipeline.hset(state_key, mapping=self.encode_state(mapping))
+        pipeline.execute()
+
     def get_records(self, key: str, limit: int = 50):
         raw_records = self.redis.lrange(key, 0, limit - 1)
         return [json.loads(record) for record in raw_records]
@@ -78,4 +174,112 @@ class RedisAdapter:
         return [json.loads(trade) for trade in raw_trades]
 
     def clear_trade_history(self):
-        self.redis.delete("bot:trades")
\ No newline at end of file
+        self.redis.delete("bot:trades")
+
+
+class AsyncRedisAdapter:
+    """asyncio counterpart of RedisAdapter for the state and record operations.
+
+    Connections come from a single pool shared by every coroutine. Pools are
+    bound to the event loop that created them, so a new one is built when
+    the adapter is used from a different loop (e.g. successive asyncio.run
+    calls in poll mode). A ready client, such as an in-process fake, can be
+    injected through `client`.
+    """
+
+    def __init__(
+        self,
+        host="localhost",
+        port=6379,
+        db=0,
+        decode_responses=True,
+        max_connections: int = 10,
+        client: Optional[redis.asyncio.Redis] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.decode_responses = decode_responses
+        self.max_connections = max_connections
+        self._injected_client = client
+        self._client: Optional[redis.asyncio.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def redis(self) -> redis.asyncio.Redis:
+        if self._injected_client is not None:
+            return self._injected_client
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            pool = redis.asyncio.ConnectionPool(
+                host=self.host,
+                port=int(self.port),
+                db=int(self.db),
+                decode_responses=self.decode_responses,
+                max_connections=self.max_connections,
+            )
+            self._client = redis.asyncio.Redis(connection_pool=pool)
+            self._loop = loop
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+    async def set_state(self, key: str, mapping: dict):
+        await self.redis.hset(key, mapping=RedisAdapter.encode_state(mapping))
+
+    async def get_state(self, key: str, schema: Optional[StateSchema] = None):
+        return RedisAdapter.decode_state(await self.redis.hgetall(key), schema)
+
+    async def get_states(self, keys: Iterable[str], schema: Optional[StateSchema] = None) -> dict:
+        """Read several hashes in a single round-trip"""
+        keys = list(keys)
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for key in keys:
+                pipeline.hgetall(key)
+            states = await pipeline.execute()
+        return {
+            key: RedisAdapter.decode_state(state, schema)
+            for key, state in zip(keys, states)
+        }
+
+    async def get_or_init_state(
+        self,
+        key: str,
+        defaults: dict,
+        schema: Optional[StateSchema] = None,
+    ) -> dict:
+        """Fill in missing fields with defaults and read the hash, atomically and in one round-trip"""
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            for field, value in RedisAdapter.encode_state(defaults).items():
+                pipeline.hsetnx(key, field, value)
+            pipeline.hgetall(key)
+            results = await pipeline.execute()
+        return RedisAdapter.decode_state(results[-1], schema)
+
+    async def clear_state(self, key: str):
+        await self.redis.delete(key)
+
+    async def push_record(self, key: str, record: dict):
+        await self.redis.lpush(key, json.dumps(record))
+
+    async def push_record_and_set_state(
+        self,
+        records_key: str,
+        record: dict,
+        state_key: str,
+        mapping: dict,
+    ):
+        """Append a record and replace a state hash in one MULTI/EXEC transaction"""
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            pipeline.lpush(records_key, json.dumps(record))
+            pipeline.delete(state_key)
+            pipeline.hset(state_key, mapping=RedisAdapter.encode_state(mapping))
+            await pipeline.execute()
+
+    async def get_records(self, key: str, limit: int = 50):
+        raw_records = await self.redis.lrange(key, 0, limit - 1)
+        return [json.loads(record) for record in raw_records]
@@ -0,0 +1,180 @@
+# Python imports
+import asyncio
+import time
+import traceback
+from dataclasses import dataclass
+from typing import (
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+)
+
+# App imports
+from src.conf.logger import Trace
+from src.adapters.kline_cache import INTERVAL_MS
+
+logger = Trace(__name__).logger
+
+# What to do when a tick comes due while the previous run is still going
+SKIP_OVERRUNS = 'skip'
+MERGE_OVERRUNS = 'merge'
+
+Job = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class ScheduledJobMetrics:
+    """Timing counters of a scheduled job"""
+    ticks: int = 0
+    runs: int = 0
+    skipped: int = 0
+    merged: int = 0
+    failures: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    last_duration: float = 0.0
+
+    def as_dict(self):
+        return {
+            'ticks': self.ticks,
+            'runs': self.runs,
+            'skipped': self.skipped,
+            'merged': self.merged,
+            'failures': self.failures,
+            'last_lag': self.last_lag,
+            'max_lag': self.max_lag,
+            'last_duration': self.last_duration,
+        }
+
+
+class ScheduledJob:
+    def __init__(
+        self,
+        name: str,
+        job: Job,
+        interval: str,
+        offset: float,
+        overrun: str,
+    ):
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        if overrun not in (SKIP_OVERRUNS, MERGE_OVERRUNS):
+            raise ValueError(f"Unknown overrun policy: {overrun}")
+        self.name = name
+        self.job = job
+        self.interval = interval
+        self.offset = offset
+        self.overrun = overrun
+        self.metrics = ScheduledJobMetrics()
+        self._running: Optional[asyncio.Task] = None
+        self._rerun = False
+
+    @property
+    def period(self) -> float:
+        return INTERVAL_MS[self.interval] / 1000
+
+    def next_fire_time(self, now: float) -> float:
+        """Epoch seconds of the next candle close plus offset strictly after `now`"""
+        boundary = (now - self.offset) // self.period * self.period
+        return boundary + self.period + self.offset
+
+
+class CandleScheduler:
+    """Runs coroutine jobs on one long-lived event loop, aligned to candle closes.
+
+    Each job fires `offset` seconds after every close of its candle interval
+    (wall-clock aligned, like Binance candles). Runs never overlap: a tick
+    that comes due while the previous run is still going is either dropped
+    (`skip`) or folded into a single catch-up run started as soon as the
+    current one finishes (`merge`). Job errors are logged and do not stop
+    the schedule.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        # Both are replaced together by a virtual clock in tests
+        self.clock = clock
+        self.sleep = sleep
+        self.jobs: List[ScheduledJob] = []
+        self._stopped: Optional[asyncio.Event] = None
+
+    def schedule(
+        self,
+        job: Job,
+        interval: str = '5m',
+        offset: float = 5.0,
+        overrun: str = SKIP_OVERRUNS,
+        name: Optional[str] = None,
+    ) -> ScheduledJob:
+        scheduled = ScheduledJob(
+            name=name or getattr(job, '__name__', 'job'),
+            job=job,
+            interval=interval,
+            offset=offset,
+            overrun=overrun,
+        )
+        self.jobs.append(scheduled)
+        return scheduled
+
+    def metrics(self) -> dict:
+        return {job.name: job.metrics.as_dict() for job in self.jobs}
+
+    async def run(self):
+        """Run every scheduled job until `stop` is called"""
+        self._stopped = asyncio.Event()
+        loops = [asyncio.create_task(self._run_job(job)) for job in self.jobs]
+        try:
+            await self._stopped.wait()
+        finally:
+            for task in loops:
+                task.cancel()
+            await asyncio.gather(*loops, return_exceptions=True)
+            running = [job._running for job in self.jobs if job._running is not None]
+            await asyncio.gather(*running, return_exceptions=True)
+
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def _run_job(self, job: ScheduledJob):
+        fire_at = 0.0
+        while True:
+            # Sleeps may wake marginally early; never fire the same tick twice
+            fire_at = job.next_fire_time(max(self.clock(), fire_at))
+            await self.sleep(max(fire_at - self.clock(), 0))
+            job.metrics.ticks += 1
+            job.metrics.last_lag = max(self.clock() - fire_at, 0.0)
+            job.metrics.max_lag = max(job.metrics.max_lag, job.metrics.last_lag)
+            if job._running is not None and not job._running.done():
+                if job.overrun == MERGE_OVERRUNS:
+                    job._rerun = True
+                    job.metrics.merged += 1
+                    logger.info(f"Job {job.name} still running. Merging tick into a catch-up run.")
+                else:
+                    job.metrics.skipped += 1
+                    logger.info(f"Job {job.name} still running. Skipping tick.")
+                continue
+            job._running = asyncio.create_task(self._execute(job))
+
+    async def _execute(self, job: ScheduledJob):
+        while True:
+            job._rerun = False
+            started = time.monotonic()
+            try:
+                await job.job()
+            except Exception:
+                job.metrics.failures += 1
+                logger.error(traceback.format_exc())
+            finally:
+                job.metrics.runs += 1
+                job.metrics.last_duration = time.monotonic() - started
+            logger.info(
+                f"Job {job.name} finished in {job.metrics.last_duration:.2f}s "
+                f"(lag {job.metrics.last_lag:.2f}s)."
+            )
+            if not job._rerun:
+                return
@@ -1,12 +1,193 @@
 # Python imports
+import asyncio
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Optional
+
 import telegram
+from telegram.error import (
+    NetworkError,
+    RetryAfter,
+    TelegramError,
+)
+
+# App imports
+from src.conf.logger import Trace
+from src.adapters.metrics import metrics
+
+logger = Trace(__name__).logger
+
+# Telegram rejects text messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+MESSAGE_SEPARATOR = "\n\n"
+
+
+class NotificationQueue:
+    """Bounded outbound message queue drained by a background task.
+
+    `enqueue` never waits on Telegram. Messages arriving within
+    `coalesce_delay` of each other are joined into a single message (up to
+    Telegram's length limit). Flood-control replies are honoured by sleeping
+    for the requested time, and network errors are retried with exponential
+    backoff. When the queue is full the oldest message is dropped.
+    """
+
+    def __init__(
+        self,
+        telegram_adapter: 'TelegramAdapter',
+        max_size: int = 100,
+        coalesce_delay: float = 1.0,
+        max_retries: int = 5,
+        retry_delay: float = 1.0,
+    ):
+        self.telegram_adapter = telegram_adapter
+        self.max_size = max_size
+        self.coalesce_delay = coalesce_delay
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.sent = 0
+        self.dropped = 0
+        self._pending: deque = deque()
+        self._sending = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        """Start the drain task on the running event loop, if it is not running already"""
+        if self._task is not None and not self._task.done():
+            return
+        # Events are bound to a loop, so a new one is needed after asyncio.run restarts
+        self._wakeup = asyncio.Event()
+        if self._pending:
+            self._wakeup.set()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def enqueue(self, message: str):
+        if len(self._pending) >= self.max_size:
+            self._pending.popleft()
+            self.dropped += 1
+            logger.warning("Notification queue full. Dropping the oldest message.")
+        self._pending.append(message)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self, timeout: Optional[float] = None):
+        """Wait until every queued message has been delivered or given up on"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._pending or self._sending:
+            if self._task is None or self._task.done():
+                logger.warning(f"Notification queue is not running. {len(self._pending)} messages pending.")
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning(f"Notification flush timed out. {len(self._pending)} messages pending.")
+                return
+            await asyncio.sleep(0.05)
+
+    async def stop(self, timeout: Optional[float] = None):
+        await self.flush(timeout=timeout)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            self._sending = True
+            try:
+                # Give a burst the chance to arrive so it goes out as one message
+                await asyncio.sleep(self.coalesce_delay)
+                while self._pending:
+                    await self._deliver(self._take_batch())
+            finally:
+                self._sending = False
+
+    def _take_batch(self) -> str:
+        batch = self._pending.popleft()[:MAX_MESSAGE_LENGTH]
+        while self._pending:
+            candidate = batch + MESSAGE_SEPARATOR + self._pending[0]
+            if len(candidate) > MAX_MESSAGE_LENGTH:
+                break
+            batch = candidate
+            self._pending.popleft()
+        return batch
+
+    async def _deliver(self, message: str):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.telegram_adapter.send_message(message)
+                self.sent += 1
+                return
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                delay = retry_after.total_seconds() if isinstance(retry_after, timedelta) else float(retry_after)
+                logger.warning(f"Telegram flood control. Retrying in {delay}s...")
+            except NetworkError as e:
+                delay = self.retry_delay * 2 ** attempt
+                logger.warning(f"Telegram network error: {e}. Retrying in {delay}s...")
+            except TelegramError as e:
+                logger.error(f"Telegram rejected notification: {e}. Dropping it.")
+                self.dropped += 1
+                return
+            except Exception as e:
+                # Never let a bad response stop the drain task
+                logger.error(f"Unexpected error sending notification: {e}. Dropping it.")
+                self.dropped += 1
+                return
+            await asyncio.sleep(delay)
+        logger.error(f"Notification not delivered after {self.max_retries} retries. Dropping it.")
+        self.dropped += 1
+
 
 class TelegramAdapter:
-    def __init__(self, api_token: str, chat_id: str):
+    def __init__(
+        self,
+        api_token: str,
+        chat_id: str,
+        base_url: Optional[str] = None,
+        queue_size: int = 0,
+        coalesce_delay: float = 1.0,
+    ):
         self.api_token = api_token
         self.chat_id = chat_id
-        self.bot = telegram.Bot(token=self.api_token)
+        if base_url:
+            self.bot = telegram.Bot(token=self.api_token, base_url=base_url)
+        else:
+            self.bot = telegram.Bot(token=self.api_token)
+        # Background delivery for `notify`; disabled when queue_size is 0
+        self.notifications: Optional[NotificationQueue] = None
+        if queue_size > 0:
+            self.notifications = NotificationQueue(
+                telegram_adapter=self,
+                max_size=queue_size,
+                coalesce_delay=coalesce_delay,
+            )
 
     async def send_message(self, message: str):
         """Send a message to the Telegram chat."""
-        await self.bot.send_message(chat_id=self.chat_id, text=message)
+        with metrics.span('telegram'):
+            await self.bot.send_message(chat_id=self.chat_id, text=message)
+
+    async def notify(self, message: str):
+        """Queue a message for background delivery, or send it directly without a queue."""
+        if self.notifications is None:
+            await self.send_message(message)
+            return
+        self.notifications.start()
+        self.notifications.enqueue(message)
+
+    def start(self):
+        if self.notifications is not None:
+            self.notifications.start()
+
+    async def flush(self, timeout: Optional[float] = None):
+        if self.notifications is not None:
+            await self.notifications.flush(timeout=timeout)
@@ -0,0 +1,238 @@
+# Python imports
+import json
+import socket
+import threading
+import time
+import uuid
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+# App imports
+from src.conf.logger import Trace
+
+if TYPE_CHECKING:
+    import redis
+
+logger = Trace(__name__).logger
+
+# Result field marking a job whose handler failed
+JOB_ERROR = 'error'
+# How long an idle worker blocks on the queue before sending a heartbeat again
+CLAIM_TIMEOUT = 1
+# How often a coordinator re-checks results when there is no job left to run itself
+GATHER_POLL_INTERVAL = 0.05
+
+JobHandler = Callable[[dict], dict]
+
+
+class RedisWorkQueue:
+    """Reliable job queue in Redis shared by coordinators and stateless workers.
+
+    Jobs are identified by idempotent ids chosen by the caller: enqueueing an
+    id that is already queued, running or finished is a no-op, so retried or
+    concurrent coordinators never duplicate work. A claimed job moves to a
+    processing list and holds a lease; leases that expire (dead or stuck
+    workers) are requeued by `requeue_expired`, and a job claimed more than
+    `max_attempts` times is failed. Results are kept for `result_ttl`
+    seconds. The client must be created with `decode_responses=True`.
+    """
+
+    def __init__(
+        self,
+        redis_client: 'redis.Redis',
+        name: str = 'scan',
+        lease: float = 30,
+        max_attempts: int = 3,
+        result_ttl: int = 600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.redis = redis_client
+        self.name = name
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self.clock = clock
+        self.pending_key = f"{name}:pending"
+        self.processing_key = f"{name}:processing"
+        self.leases_key = f"{name}:leases"
+        self.attempts_key = f"{name}:attempts"
+        self.workers_key = f"{name}:workers"
+
+    def job_key(self, job_id: str) -> str:
+        return f"{self.name}:job:{job_id}"
+
+    def result_key(self, job_id: str) -> str:
+        return f"{self.name}:result:{job_id}"
+
+    def enqueue(self, jobs: Dict[str, dict]) -> int:
+        """Queue jobs by id, skipping ids that are already known; return how many were queued"""
+        if not jobs:
+            return 0
+        with self.redis.pipeline() as pipe:
+            for job_id, payload in jobs.items():
+                pipe.set(self.job_key(job_id), json.dumps(payload), nx=True, ex=self.result_ttl)
+            created = [job_id for job_id, is_new in zip(jobs, pipe.execute()) if is_new]
+        if created:
+            self.redis.lpush(self.pending_key, *created)
+        return len(created)
+
+    def claim(self, timeout: Optional[float] = None) -> Optional[Tuple[str, dict]]:
+        """Take the next job and lease it; block up to `timeout` seconds, or not at all when None"""
+        while True:
+            if timeout is None:
+                job_id = self.redis.lmove(self.pending_key, self.processing_key, 'RIGHT', 'LEFT')
+            else:
+                job_id = self.redis.blmove(self.pending_key, self.processing_key, timeout, 'RIGHT', 'LEFT')
+            if job_id is None:
+                return None
+            with self.redis.pipeline() as pipe:
+                pipe.zadd(self.leases_key, {job_id: self.clock() + self.lease})
+                pipe.hincrby(self.attempts_key, job_id, 1)
+                pipe.get(self.job_key(job_id))
+                pipe.exists(self.result_key(job_id))
+                _, _, payload, finished = pipe.execute()
+            if payload is not None and not finished:
+                return job_id, json.loads(payload)
+            # Expired, or already finished by another worker after a requeue
+            self._release(job_id)
+
+    def complete(self, job_id: str, result: dict):
+        self._release(job_id, result)
+
+    def fail(self, job_id: str, message: str):
+        self._release(job_id, {JOB_ERROR: message})
+
+    def _release(self, job_id: str, result: Optional[dict] = None):
+        with self.redis.pipeline() as pipe:
+            if result is not None:
+                pipe.set(self.result_key(job_id), json.dumps(result), ex=self.result_ttl)
+            pipe.lrem(self.processing_key, 1, job_id)
+            pipe.zrem(self.leases_key, job_id)
+            pipe.hdel(self.attempts_key, job_id)
+            pipe.execute()
+
+    def requeue_expired(self) -> int:
+        """Hand the jobs of dead or stuck workers back to the queue; return how many were requeued"""
+        job_ids = self.redis.lrange(self.processing_key, 0, -1)
+        if not job_ids:
+            return 0
+        with self.redis.pipeline() as pipe:
+            for job_id in job_ids:
+                pipe.zscore(self.leases_key, job_id)
+                pipe.hget(self.attempts_key, job_id)
+            replies = pipe.execute()
+        now = self.clock()
+        requeued = 0
+        for job_id, lease, attempts in zip(job_ids, replies[::2], replies[1::2]):
+            if lease is None:
+                # Claimed an instant ago and not leased yet; start its lease now
+                self.redis.zadd(self.leases_key, {job_id: now + self.lease}, nx=True)
+                continue
+            if lease > now:
+                continue
+            if int(attempts or 0) >= self.max_attempts:
+                logger.warning(f"Job {job_id} abandoned after {attempts} attempts.")
+                self.fail(job_id, f"Job abandoned after {attempts} attempts")
+                continue
+            with self.redis.pipeline() as pipe:
+                pipe.lrem(self.processing_key, 1, job_id)
+                pipe.zrem(self.leases_key, job_id)
+                removed, _ = pipe.execute()
+            if removed:
+                # Requeue at the head so it runs next
+                self.redis.rpush(self.pending_key, job_id)
+                requeued += 1
+        if requeued:
+            logger.info(f"Requeued {requeued} jobs with expired leases.")
+        return requeued
+
+    def results(self, job_ids: Iterable[str]) -> Dict[str, dict]:
+        """Finished results of the given jobs, by id"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        values = self.redis.mget([self.result_key(job_id) for job_id in job_ids])
+        return {
+            job_id: json.loads(value)
+            for job_id, value in zip(job_ids, values)
+            if value is not None
+        }
+
+    def heartbeat(self, worker_id: str):
+        self.redis.zadd(self.workers_key, {worker_id: self.clock()})
+
+    def live_workers(self) -> int:
+        """Number of workers that sent a heartbeat within one lease"""
+        cutoff = self.clock() - self.lease
+        self.redis.zremrangebyscore(self.workers_key, '-inf', f"({cutoff}")
+        return self.redis.zcard(self.workers_key)
+
+    def run_job(self, job_id: str, payload: dict, handler: JobHandler):
+        try:
+            self.complete(job_id, handler(payload))
+        except Exception as e:
+            logger.warning(f"Job {job_id} failed: {e}")
+            self.fail(job_id, str(e))
+
+    def gather(
+        self,
+        job_ids: Iterable[str],
+        handler: JobHandler,
+        timeout: float,
+        job_timeout: Optional[float] = None,
+    ) -> Dict[str, dict]:
+        """Wait up to `timeout` seconds for the results of the given jobs.
+
+        While waiting, the caller requeues expired leases and runs queued
+        jobs itself, so a scan still completes, more slowly, without workers.
+        A job runs to completion once claimed, so the caller stops claiming
+        when less time is left than a job can take: `job_timeout`, or the
+        longest job it ran so far. Jobs not finished in time are missing from
+        the returned dict.
+        """
+        remaining = set(job_ids)
+        results = {}
+        deadline = time.monotonic() + timeout
+        longest_job = job_timeout or 0.0
+        while remaining and time.monotonic() < deadline:
+            finished = self.results(remaining)
+            results.update(finished)
+            remaining.difference_update(finished)
+            if not remaining:
+                break
+            self.requeue_expired()
+            job = None
+            if deadline - time.monotonic() >= longest_job:
+                job = self.claim()
+            if job is None:
+                time.sleep(max(0.0, min(GATHER_POLL_INTERVAL, deadline - time.monotonic())))
+                continue
+            started = time.monotonic()
+            self.run_job(*job, handler)
+            longest_job = max(longest_job, time.monotonic() - started)
+        return results
+
+    def serve(self, handler: JobHandler, worker_id: Optional[str] = None, stop: Optional[threading.Event] = None):
+        """Run queued jobs until `stop` is set"""
+        # Imported here so the job constants can be read without loading redis
+        import redis
+        worker_id = worker_id or f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+        stop = stop or threading.Event()
+        logger.info(f"Worker {worker_id} serving queue {self.name}.")
+        while not stop.is_set():
+            self.heartbeat(worker_id)
+            try:
+                job = self.claim(timeout=CLAIM_TIMEOUT)
+            except redis.RedisError as e:
+                logger.error(f"Work queue unavailable: {e}. Retrying...")
+                stop.wait(CLAIM_TIMEOUT)
+                continue
+            if job is not None:
+                self.run_job(*job, handler)
+        self.redis.zrem(self.workers_key, worker_id)
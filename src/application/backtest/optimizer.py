@@ -0,0 +1,145 @@
+# Python imports
+import itertools
+import os
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from multiprocessing import shared_memory
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+# App imports
+from src.conf.logger import Trace
+from src.domain.backtest.services import BacktestDomainServices
+from src.domain.backtest.value_objects import (
+    BacktestConfig,
+    PriceHistory,
+    SweepResult,
+)
+from src.domain.calculator.value_objects import StrategyParameters
+
+logger = Trace(__name__).logger
+
+# Metrics a sweep can be ranked by, and whether higher is better
+SWEEP_METRICS = {
+    'pnl_pct': True,
+    'final_value': True,
+    'max_drawdown_pct': False,
+    'return_over_drawdown': True,
+}
+
+# Price data attached by each worker process, see `_attach_price_history`
+_worker_history: Optional[PriceHistory] = None
+_worker_segments: List[shared_memory.SharedMemory] = []
+
+
+class SharedPriceHistory:
+    """Places a PriceHistory in shared memory so worker processes map it
+    instead of receiving a pickled copy with every task.
+    """
+
+    def __init__(self, history: PriceHistory):
+        self.history = history
+        self.segments: List[shared_memory.SharedMemory] = []
+        self.descriptor: Optional[dict] = None
+
+    def _share(self, array: np.ndarray) -> dict:
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        self.segments.append(segment)
+        return {'name': segment.name, 'shape': array.shape, 'dtype': array.dtype.str}
+
+    def __enter__(self) -> dict:
+        self.descriptor = {
+            'symbols': self.history.symbols,
+            'timestamps': self._share(np.ascontiguousarray(self.history.timestamps)),
+            'closes': self._share(np.ascontiguousarray(self.history.closes)),
+        }
+        return self.descriptor
+
+    def __exit__(self, *exc):
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+        self.segments = []
+
+
+def _attach_price_history(descriptor: dict):
+    """Worker initializer: map the shared arrays without copying them"""
+    global _worker_history
+
+    def attach(spec: dict) -> np.ndarray:
+        try:
+            # The parent owns the segments; keep workers from unlinking them
+            segment = shared_memory.SharedMemory(name=spec['name'], track=False)
+        except TypeError:
+            segment = shared_memory.SharedMemory(name=spec['name'])
+        _worker_segments.append(segment)
+        return np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=segment.buf)
+
+    _worker_history = PriceHistory(
+        symbols=descriptor['symbols'],
+        timestamps=attach(descriptor['timestamps']),
+        closes=attach(descriptor['closes']),
+    )
+
+
+def _evaluate(config: BacktestConfig) -> SweepResult:
+    result = BacktestDomainServices().run(_worker_history, config)
+    summary = result.as_dict()
+    summary.pop('config')
+    drawdown = summary['max_drawdown_pct']
+    summary['return_over_drawdown'] = summary['pnl_pct'] / drawdown if drawdown else summary['pnl_pct']
+    return SweepResult(parameters=config.parameters, summary=summary)
+
+
+class ParameterSweepApplicationServices:
+    """Evaluates strategy parameter sets over one price history on a process pool"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+
+    @staticmethod
+    def build_grid(grid: Dict[str, list], samples: Optional[int] = None, seed: int = 0) -> List[StrategyParameters]:
+        """Every combination of the grid values, or a random sample of them.
+
+        Parameters missing from the grid keep their StrategyParameters default.
+        """
+        unknown = set(grid) - set(StrategyParameters().as_dict())
+        if unknown:
+            raise ValueError(f"Unknown strategy parameters: {', '.join(sorted(unknown))}")
+        names = list(grid)
+        combinations = list(itertools.product(*(grid[name] for name in names)))
+        if samples is not None and samples < len(combinations):
+            combinations = random.Random(seed).sample(combinations, samples)
+        return [StrategyParameters(**dict(zip(names, values))) for values in combinations]
+
+    def sweep(
+        self,
+        history: PriceHistory,
+        base_config: BacktestConfig,
+        parameter_sets: List[StrategyParameters],
+        metric: str = 'pnl_pct',
+    ) -> List[SweepResult]:
+        """Backtest every parameter set and rank the results by `metric`"""
+        if metric not in SWEEP_METRICS:
+            raise ValueError(f"Unknown metric {metric}. Choose one of: {', '.join(SWEEP_METRICS)}")
+        configs = [replace(base_config, parameters=parameters) for parameters in parameter_sets]
+        logger.info(f"Sweeping {len(configs)} parameter sets on {self.workers} workers...")
+        with SharedPriceHistory(history) as descriptor:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_attach_price_history,
+                initargs=(descriptor,),
+            ) as executor:
+                chunksize = max(1, len(configs) // (self.workers * 4))
+                results = list(executor.map(_evaluate, configs, chunksize=chunksize))
+        return sorted(
+            results,
+            key=lambda result: result.summary[metric],
+            reverse=SWEEP_METRICS[metric],
+        )
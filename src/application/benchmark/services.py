@@ -0,0 +1,326 @@
+# Python imports
+import asyncio
+import logging
+import os
+import platform
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+# App imports
+import main
+from src.adapters.fakes import (
+    FakeBinanceClient,
+    FakeExchange,
+    FakeRedisAdapter,
+    FakeTelegramAdapter,
+)
+from src.domain.benchmark.services import BenchmarkDomainServices
+from src.domain.benchmark.value_objects import (
+    BenchmarkComparison,
+    BenchmarkReport,
+    BenchmarkResult,
+)
+from src.domain.calculator.services import IndicatorCalculatorDomainServices
+from src.domain.calculator.value_objects import StrategyParameters
+from src.domain.trading.services import (
+    STRATEGY_CANDLE_FIELDS,
+    TradingDomainServices,
+)
+from src.domain.trading.value_objects import PortfolioConfig
+from src.application.bootstrap import TradingBotApp
+from src.application.calculator.services import IndicatorCalculatorApplicationServices
+from src.application.trading.services import TradingApplicationServices
+
+BENCHMARK_CASES = (
+    'get_historical_data',
+    'get_candles',
+    'trend_indicators',
+    'bollinger_bands_indicators',
+    'analyze_markets',
+    'cycle',
+    'startup',
+)
+DEFAULT_SCAN_SIZES = (10, 100, 500)
+# Candle window of the live short-term decision (see main.py)
+SHORT_TERM_INTERVAL = '5m'
+SHORT_TERM_LOOKBACK = 288
+HELD_ASSET = 'SYM0'
+HELD_BALANCE = 10.0
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# Code a fresh interpreter runs per startup stage: becoming ready, and building every portfolio
+STARTUP_STAGES = {
+    'import': 'import main',
+    'portfolios': 'import main; main.app.portfolios',
+}
+
+
+class BenchmarkApplicationServices:
+    """Benchmarks of the trading hot paths on an in-process fake exchange and Redis.
+
+    The real adapters, domain and application services run unchanged; only
+    the Binance client and the Redis connection are replaced by fakes that
+    serve deterministic synthetic data.
+    """
+
+    def __init__(
+        self,
+        benchmark_domain_services: BenchmarkDomainServices,
+        repeat: int = 20,
+        warmup: int = 2,
+        seed: int = 0,
+        scan_workers: int = 1,
+        scan_vectorized: bool = False,
+    ):
+        self.benchmark_domain_services = benchmark_domain_services
+        self.repeat = repeat
+        self.warmup = warmup
+        self.seed = seed
+        self.scan_workers = scan_workers
+        self.scan_vectorized = scan_vectorized
+
+    @staticmethod
+    def synthetic_watchlist(symbols: int) -> List[str]:
+        return [f"SYM{i}USDT" for i in range(symbols)]
+
+    @staticmethod
+    def synthetic_balances(watchlist: List[str]) -> Dict[str, float]:
+        # Rotations into a `{target}{held}` pair size the order from the target's holding
+        return {symbol[:-len('USDT')]: HELD_BALANCE for symbol in watchlist}
+
+    def build_trading_services(self, symbols: int) -> TradingApplicationServices:
+        """Trading services wired to a fake exchange listing `symbols` synthetic pairs"""
+        watchlist = self.synthetic_watchlist(symbols)
+        fake_client = FakeBinanceClient(
+            symbols=watchlist,
+            balances=self.synthetic_balances(watchlist),
+            cross_quotes=[HELD_ASSET],
+            seed=self.seed,
+        )
+        return TradingApplicationServices(
+            calculator_indicator_app_services=IndicatorCalculatorApplicationServices(
+                indicator_calculator_domain_services=IndicatorCalculatorDomainServices(
+                    parameters=StrategyParameters(),
+                ),
+            ),
+            trading_domain_services=TradingDomainServices(
+                exchange_client=FakeExchange(fake_client),
+                redis_client=FakeRedisAdapter(),
+                telegram_adapter=FakeTelegramAdapter(),
+                initial_asset=HELD_ASSET,
+            ),
+            scan_workers=self.scan_workers,
+            scan_vectorized=self.scan_vectorized,
+        )
+
+    def _measure(self, name: str, run: Callable, ops: int = 1, params: Optional[dict] = None, setup=None) -> BenchmarkResult:
+        return self.benchmark_domain_services.measure(
+            name,
+            run,
+            repeat=self.repeat,
+            warmup=self.warmup,
+            ops=ops,
+            params=params,
+            setup=setup,
+        )
+
+    def bench_get_historical_data(self, lookback: int) -> BenchmarkResult:
+        """Raw kline rows to the strategy DataFrame through `Exchange.get_historical_data`"""
+        exchange = self.build_trading_services(1).trading_domain_services.exchange_client
+        return self._measure(
+            'get_historical_data',
+            lambda: exchange.get_historical_data(symbol='SYM0USDT', interval=SHORT_TERM_INTERVAL, lookback=lookback),
+            params={'lookback': lookback},
+        )
+
+    def bench_get_candles(self, lookback: int) -> BenchmarkResult:
+        """Raw kline rows to compact close-price `Candles` through `Exchange.get_candles`"""
+        exchange = self.build_trading_services(1).trading_domain_services.exchange_client
+        return self._measure(
+            'get_candles',
+            lambda: exchange.get_candles(
+                symbol='SYM0USDT',
+                interval=SHORT_TERM_INTERVAL,
+                lookback=lookback,
+                fields=STRATEGY_CANDLE_FIELDS,
+            ),
+            params={'lookback': lookback},
+        )
+
+    def _closes(self, lookback: int) -> pd.Series:
+        exchange = self.build_trading_services(1).trading_domain_services.exchange_client
+        return exchange.get_historical_data(symbol='SYM0USDT', interval=SHORT_TERM_INTERVAL, lookback=lookback)['close']
+
+    def bench_trend_indicators(self, lookback: int) -> BenchmarkResult:
+        calculator = self.build_trading_services(1).calculator_indicator_app_services
+        closes = self._closes(lookback)
+        return self._measure(
+            'trend_indicators',
+            lambda: calculator.apply_trend_indicators(close_prices=closes),
+            params={'lookback': lookback},
+        )
+
+    def bench_bollinger_bands_indicators(self, lookback: int) -> BenchmarkResult:
+        calculator = self.build_trading_services(1).calculator_indicator_app_services
+        closes = self._closes(lookback)
+        return self._measure(
+            'bollinger_bands_indicators',
+            lambda: calculator.apply_bollinger_bands_indicators(close_prices=closes),
+            params={'lookback': lookback},
+        )
+
+    def bench_analyze_markets(self, symbols: int) -> BenchmarkResult:
+        trading_app_services = self.build_trading_services(symbols)
+        watchlist = self.synthetic_watchlist(symbols)
+        return self._measure(
+            'analyze_markets',
+            lambda: trading_app_services.analyze_markets(watchlist=watchlist),
+            ops=symbols,
+            params={'symbols': symbols, 'workers': self.scan_workers, 'vectorized': self.scan_vectorized},
+        )
+
+    def build_app(self, symbols: int) -> TradingBotApp:
+        """The bot's app running one portfolio on the fake exchange, Redis and Telegram"""
+        watchlist = self.synthetic_watchlist(symbols)
+        fake_client = FakeBinanceClient(
+            symbols=watchlist,
+            balances=self.synthetic_balances(watchlist),
+            cross_quotes=[HELD_ASSET],
+            seed=self.seed,
+        )
+        app = TradingBotApp(
+            exchange=FakeExchange(fake_client),
+            redis_client=FakeRedisAdapter(),
+            async_redis_client=None,
+            async_exchange=None,
+            scan_queue=None,
+            telegram=FakeTelegramAdapter(),
+            kline_snapshot=None,
+            metrics_server=None,
+            watchlist=watchlist,
+            portfolio_configs=[
+                PortfolioConfig(
+                    name='benchmark',
+                    state_key='benchmark:state',
+                    trades_key='benchmark:trades',
+                    initial_asset=HELD_ASSET,
+                    parameters=StrategyParameters(),
+                ),
+            ],
+        )
+        # The scan options of the run, in place of the settings
+        for portfolio in app.portfolios:
+            portfolio.trading_app_services.scan_workers = self.scan_workers
+            portfolio.trading_app_services.scan_vectorized = self.scan_vectorized
+        return app
+
+    def bench_cycle(self, symbols: int) -> BenchmarkResult:
+        """One tick of `main.run_portfolios`, forced down the sell path so it scans and trades"""
+        app = self.build_app(symbols)
+        trading_app_services = app.portfolios[0].trading_app_services
+        fake_client = app.exchange.client
+        loop = asyncio.new_event_loop()
+
+        def setup():
+            # An entry price well above the market puts the position past its stop loss
+            entry_price = trading_app_services.get_asset_price(HELD_ASSET) * 1.1
+            trading_app_services.set_current_asset(HELD_ASSET, entry_price=entry_price)
+            fake_client.balances = self.synthetic_balances(app.watchlist)
+
+        def cycle():
+            try:
+                loop.run_until_complete(main.run_portfolios())
+            except SystemExit:
+                # A single portfolio exits the bot once it parks in USDT, which ends the tick all the same
+                pass
+
+        bot_app = main.app
+        main.app = app
+        # The bot logs every step of the tick to stdout, where the report goes
+        logging.disable(logging.INFO)
+        try:
+            return self._measure(
+                'cycle',
+                cycle,
+                ops=1,
+                params={'symbols': symbols, 'workers': self.scan_workers, 'vectorized': self.scan_vectorized},
+                setup=setup,
+            )
+        finally:
+            logging.disable(logging.NOTSET)
+            main.app = bot_app
+            loop.close()
+
+    def bench_startup(self, stage: str) -> BenchmarkResult:
+        """Start of a fresh bot process, interpreter included; building portfolios does not touch the network"""
+        env = {
+            **os.environ,
+            # The Telegram client rejects an empty token when it is built
+            'TELEGRAM_API_TOKEN': os.environ.get('TELEGRAM_API_TOKEN') or '0:benchmark',
+            'PYTHONDONTWRITEBYTECODE': '1',
+        }
+        command = [sys.executable, '-c', STARTUP_STAGES[stage]]
+        return self._measure(
+            'startup',
+            lambda: subprocess.run(command, cwd=PROJECT_ROOT, env=env, check=True, capture_output=True),
+            ops=1,
+            params={'stage': stage},
+        )
+
+    def run(
+        self,
+        cases: tuple = BENCHMARK_CASES,
+        scan_sizes: tuple = DEFAULT_SCAN_SIZES,
+        lookbacks: tuple = (SHORT_TERM_LOOKBACK, 1000),
+    ) -> BenchmarkReport:
+        results = []
+        if 'get_historical_data' in cases:
+            results.extend(self.bench_get_historical_data(lookback) for lookback in lookbacks)
+        if 'get_candles' in cases:
+            results.extend(self.bench_get_candles(lookback) for lookback in lookbacks)
+        if 'trend_indicators' in cases:
+            results.extend(self.bench_trend_indicators(lookback) for lookback in lookbacks)
+        if 'bollinger_bands_indicators' in cases:
+            results.extend(self.bench_bollinger_bands_indicators(lookback) for lookback in lookbacks)
+        if 'analyze_markets' in cases:
+            results.extend(self.bench_analyze_markets(symbols) for symbols in scan_sizes)
+        if 'cycle' in cases:
+            results.extend(self.bench_cycle(symbols) for symbols in scan_sizes)
+        if 'startup' in cases:
+            results.extend(self.bench_startup(stage) for stage in STARTUP_STAGES)
+        return BenchmarkReport(results=results, environment=self.environment())
+
+    def environment(self) -> Dict[str, object]:
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'commit': commit,
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'processor': platform.machine(),
+            'repeat': self.repeat,
+            'seed': self.seed,
+        }
+
+    def compare(self, base: dict, head: dict, threshold: float = 0.1) -> List[BenchmarkComparison]:
+        return self.benchmark_domain_services.compare(
+            BenchmarkReport.from_dict(base),
+            BenchmarkReport.from_dict(head),
+            threshold=threshold,
+        )
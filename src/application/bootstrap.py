@@ -0,0 +1,625 @@
+# Python imports
+import importlib
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import (
+    asdict,
+    dataclass,
+)
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+# App imports
+from src.conf.logger import Trace
+from src.adapters.metrics import (
+    STARTUP_SECONDS,
+    metrics,
+)
+from src.conf.settings import (
+    API_KEY,
+    API_SECRET,
+    API_URL,
+    EXCHANGE_METADATA_TTL,
+    EXCHANGE_ASYNC,
+    EXCHANGE_MAX_CONNECTIONS,
+    EXCHANGE_WEIGHT_LIMIT,
+    REDIS_HOST,
+    REDIS_PORT,
+    REDIS_DB,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_BOT_STATE_KEY,
+    REDIS_BOT_TRADES_KEY,
+    INITIAL_ASSET,
+    PORTFOLIOS,
+    ACCOUNTS,
+    ASSET_WATCHLIST,
+    TELEGRAM_API_TOKEN,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_API_URL,
+    TELEGRAM_QUEUE_SIZE,
+    TELEGRAM_COALESCE_DELAY,
+    MARKET_DATA_MODE,
+    KLINE_CACHE_ENABLED,
+    KLINE_CACHE_SIZE,
+    CANDLE_STORE_PATH,
+    KLINE_SNAPSHOT_PATH,
+    KLINE_SNAPSHOT_KEY,
+    KLINE_SNAPSHOT_INTERVAL,
+    MARKET_SCAN_WORKERS,
+    MARKET_SCAN_SYMBOL_TIMEOUT,
+    MARKET_SCAN_DEADLINE,
+    MARKET_SCAN_VECTORIZED,
+    MARKET_SCAN_QUEUE,
+    MARKET_SCAN_LEASE,
+    MARKET_SCAN_MAX_ATTEMPTS,
+    BOT_ROLE,
+    METRICS_HOST,
+    METRICS_PORT,
+    STARTUP_BUDGET,
+    TAKE_PROFIT_PCT,
+    STOP_LOSS_PCT,
+    RSI_BUY_THRESHOLD,
+    RSI_SELL_THRESHOLD,
+    RSI_WINDOW,
+    EMA_WINDOW,
+    BB_WINDOW,
+    BB_WINDOW_DEV,
+    INDICATOR_TAIL,
+    STREAMING_INDICATORS,
+    ROUTE_HUBS,
+    TRADING_FEE_RATE,
+    ROUTE_MAX_SPREAD,
+)
+from src.domain.calculator.value_objects import StrategyParameters
+from src.domain.trading.value_objects import PortfolioConfig
+
+if TYPE_CHECKING:
+    from src.adapters.exchange import Exchange
+    from src.application.calculator.services import IndicatorCalculatorApplicationServices
+    from src.application.trading.services import TradingApplicationServices
+
+logger = Trace(__name__).logger
+
+STREAM_MODE = 'stream'
+WORKER_ROLE = 'worker'
+IMPORT_STAGE = 'import'
+INIT_STAGE = 'init'
+
+# Modules only needed once the bot trades, loaded by `warm_up` instead of on import
+WARM_UP_MODULES = (
+    'pandas',
+    'src.adapters.candles',
+    'src.application.trading.services',
+)
+
+
+@dataclass
+class StartupStage:
+    name: str
+    kind: str
+    # Wall time including nested stages, and excluding them
+    seconds: float
+    own_seconds: float
+    depth: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class StartupProfiler:
+    """Wall time spent importing modules and building components while the bot starts.
+
+    Stages nest: a component built while building another one is recorded inside it,
+    so each stage's own time excludes its children and the own times add up.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.stages: List[StartupStage] = []
+        self.checkpoints: Dict[str, float] = {}
+        # Stages open in each thread, as warm-up runs next to the event loop
+        self._open = threading.local()
+
+    @contextmanager
+    def stage(self, name: str, kind: str = INIT_STAGE):
+        if not hasattr(self._open, 'stack'):
+            self._open.stack = []
+        stack = self._open.stack
+        started = self.clock()
+        children = [0.0]
+        stack.append(children)
+        try:
+            yield
+        finally:
+            stack.pop()
+            seconds = self.clock() - started
+            if stack:
+                stack[-1][0] += seconds
+            self.stages.append(StartupStage(
+                name=name,
+                kind=kind,
+                seconds=seconds,
+                own_seconds=seconds - children[0],
+                depth=len(stack),
+            ))
+
+    def checkpoint(self, name: str) -> float:
+        """CPU seconds since the process started, which covers the interpreter and every import before the profiler existed"""
+        self.checkpoints[name] = time.process_time()
+        return self.checkpoints[name]
+
+    def totals(self) -> Dict[str, float]:
+        totals = {IMPORT_STAGE: 0.0, INIT_STAGE: 0.0}
+        for stage in self.stages:
+            totals[stage.kind] = totals.get(stage.kind, 0.0) + stage.own_seconds
+        return totals
+
+    def report(self, limit: int = 5) -> str:
+        """One-line breakdown of the startup, slowest stages first"""
+        totals = self.totals()
+        checkpoints = ', '.join(f"{name} at {seconds:.3f}s CPU" for name, seconds in self.checkpoints.items())
+        slowest = sorted(self.stages, key=lambda stage: stage.own_seconds, reverse=True)[:limit]
+        parts = [f"{stage.kind} {stage.name} {stage.own_seconds:.3f}s" for stage in slowest]
+        return (
+            f"Startup: {checkpoints or 'no checkpoints'}; "
+            f"imports {totals[IMPORT_STAGE]:.3f}s, init {totals[INIT_STAGE]:.3f}s: "
+            + (', '.join(parts) or 'nothing loaded')
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            'checkpoints': dict(self.checkpoints),
+            'totals': self.totals(),
+            'stages': [stage.as_dict() for stage in self.stages],
+        }
+
+
+class component:
+    """Adapter or service of the bot, built on first access and timed into the startup report.
+
+    Building one can build the components it depends on. A value passed to
+    `TradingBotApp` under the component's name is used instead, e.g. a fake.
+    """
+
+    def __init__(self, build: Callable):
+        self.build = build
+        self.__doc__ = build.__doc__
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, app: Optional['TradingBotApp'], owner=None):
+        if app is None:
+            return self
+        try:
+            return app.__dict__[self.name]
+        except KeyError:
+            pass
+        # The warm-up thread and the event loop may ask for the same component
+        with app._lock:
+            if self.name not in app.__dict__:
+                with app.startup.stage(self.name):
+                    app.__dict__[self.name] = self.build(app)
+            return app.__dict__[self.name]
+
+
+class Portfolio:
+    """Services of one independently traded portfolio"""
+
+    def __init__(
+        self,
+        config: PortfolioConfig,
+        standalone: bool,
+        trading_app_services: 'TradingApplicationServices',
+        indicator_calculator_app_services: 'IndicatorCalculatorApplicationServices',
+        watchlist: List[str],
+    ):
+        self.config = config
+        # A standalone bot exits once it is parked in USDT, as it always has
+        self.standalone = standalone
+        self.trading_app_services = trading_app_services
+        self.indicator_calculator_app_services = indicator_calculator_app_services
+        self.watchlist = watchlist
+
+
+class TradingBotApp:
+    """Builds the bot's adapters and services from the settings, each on first use.
+
+    Creating the app imports and connects nothing, so the process is ready to
+    schedule almost immediately and a worker or a one-off command only pays for
+    the components it touches. `warm_up` builds the rest ahead of the first tick.
+    """
+
+    def __init__(self, startup: Optional[StartupProfiler] = None, **components):
+        self.startup = startup or StartupProfiler()
+        self._lock = threading.RLock()
+        for name, value in components.items():
+            if not isinstance(getattr(type(self), name, None), component):
+                raise TypeError(f"Unknown component: {name}")
+            self.__dict__[name] = value
+
+    def load(self, module: str):
+        """Import a module, timing it when it was not loaded yet"""
+        if module in sys.modules:
+            return sys.modules[module]
+        with self.startup.stage(module, kind=IMPORT_STAGE):
+            return importlib.import_module(module)
+
+    def created(self, name: str) -> bool:
+        return name in self.__dict__
+
+    @component
+    def redis_client(self):
+        return self.load('src.adapters.redis').RedisAdapter(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            decode_responses=True,
+        )
+
+    @component
+    def async_redis_client(self):
+        return self.load('src.adapters.redis').AsyncRedisAdapter(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            decode_responses=True,
+            max_connections=REDIS_MAX_CONNECTIONS,
+        )
+
+    @component
+    def scan_queue(self):
+        """Market scans spread over worker processes"""
+        if not MARKET_SCAN_QUEUE:
+            return None
+        return self.load('src.adapters.work_queue').RedisWorkQueue(
+            self.redis_client.redis,
+            name=MARKET_SCAN_QUEUE,
+            lease=MARKET_SCAN_LEASE,
+            max_attempts=MARKET_SCAN_MAX_ATTEMPTS,
+        )
+
+    @component
+    def rate_limiter(self):
+        """Per-IP request weight budget shared by both exchange adapters"""
+        if not EXCHANGE_WEIGHT_LIMIT:
+            return None
+        return self.load('src.adapters.rate_limiter').RequestWeightLimiter(limit=EXCHANGE_WEIGHT_LIMIT)
+
+    @component
+    def exchange(self):
+        # The Binance client itself is only created by the first request
+        kline_cache = None
+        # Streaming keeps its candle buffers in the kline cache, so it always needs one
+        if KLINE_CACHE_ENABLED or MARKET_DATA_MODE == STREAM_MODE:
+            kline_cache = self.load('src.adapters.kline_cache').KlineCache(
+                max_candles=KLINE_CACHE_SIZE,
+                indicators=self.indicator_engine,
+            )
+        candle_store = None
+        if CANDLE_STORE_PATH:
+            candle_store = self.load('src.adapters.candle_store').CandleStore(path=CANDLE_STORE_PATH)
+        return self.load('src.adapters.exchange').Exchange(
+            api_key=API_KEY,
+            api_secret=API_SECRET,
+            api_url=API_URL,
+            kline_cache=kline_cache,
+            candle_store=candle_store,
+            metadata_ttl=EXCHANGE_METADATA_TTL,
+            rate_limiter=self.rate_limiter,
+        )
+
+    @component
+    def account_exchanges(self) -> Dict[str, 'Exchange']:
+        """Exchange adapter per (sub-)account a portfolio trades on, sharing the market data of `exchange`"""
+        credentials = json.loads(ACCOUNTS) if ACCOUNTS else {}
+        exchanges = {}
+        for account in dict.fromkeys(config.account for config in self.portfolio_configs if config.account):
+            if account not in credentials:
+                raise ValueError(f"No credentials for account {account} in ACCOUNTS")
+            exchange = self.load('src.adapters.exchange').Exchange(
+                api_key=credentials[account].get('api_key'),
+                api_secret=credentials[account].get('api_secret'),
+                api_url=API_URL,
+                kline_cache=self.exchange.kline_cache,
+                candle_store=self.exchange.candle_store,
+                metadata_ttl=EXCHANGE_METADATA_TTL,
+                rate_limiter=self.rate_limiter,
+            )
+            # Listings and filters are the same for every account
+            exchange.metadata = self.exchange.metadata
+            exchanges[account] = exchange
+        return exchanges
+
+    @component
+    def indicator_engine(self):
+        """Indicators of the default strategy updated as candles are cached, instead of per window"""
+        if not STREAMING_INDICATORS:
+            return None
+        return self.load('src.domain.calculator.streaming').StreamingIndicatorEngine(
+            parameters=self.default_parameters,
+            capacity=KLINE_CACHE_SIZE,
+        )
+
+    @component
+    def kline_snapshot(self):
+        """Closed candle buffers persisted across restarts"""
+        kline_cache = self.exchange.kline_cache
+        if kline_cache is None or not (KLINE_SNAPSHOT_PATH or KLINE_SNAPSHOT_KEY):
+            return None
+        snapshots = self.load('src.adapters.kline_snapshot')
+        if KLINE_SNAPSHOT_PATH:
+            store = snapshots.FileSnapshotStore(KLINE_SNAPSHOT_PATH)
+        else:
+            # Snapshots are binary, so they need a connection that does not decode replies
+            store = snapshots.RedisSnapshotStore(
+                self.load('src.adapters.redis').RedisAdapter(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    decode_responses=False,
+                ).redis,
+                key=KLINE_SNAPSHOT_KEY,
+            )
+        return snapshots.KlineSnapshotter(kline_cache, store, interval=KLINE_SNAPSHOT_INTERVAL)
+
+    @component
+    def async_exchange(self):
+        """Asyncio exchange sharing the same candle buffers, used for concurrent market scans"""
+        if not EXCHANGE_ASYNC:
+            return None
+        return self.load('src.adapters.async_exchange').AsyncExchange(
+            api_key=API_KEY,
+            api_secret=API_SECRET,
+            api_url=API_URL,
+            kline_cache=self.exchange.kline_cache,
+            candle_store=self.exchange.candle_store,
+            metadata_ttl=EXCHANGE_METADATA_TTL,
+            max_connections=EXCHANGE_MAX_CONNECTIONS,
+            rate_limiter=self.rate_limiter,
+        )
+
+    @component
+    def telegram(self):
+        return self.load('src.adapters.telegram').TelegramAdapter(
+            api_token=TELEGRAM_API_TOKEN,
+            chat_id=TELEGRAM_CHAT_ID,
+            base_url=TELEGRAM_API_URL,
+            queue_size=TELEGRAM_QUEUE_SIZE,
+            coalesce_delay=TELEGRAM_COALESCE_DELAY,
+        )
+
+    @component
+    def metrics_server(self):
+        """Local Prometheus-style endpoint"""
+        if not METRICS_PORT:
+            return None
+        return self.load('src.adapters.metrics').MetricsServer(metrics, host=METRICS_HOST, port=METRICS_PORT)
+
+    @component
+    def market_data(self):
+        """Market data and indicators fetched once per tick for all portfolios"""
+        return self.load('src.domain.trading.services').SharedMarketData()
+
+    @component
+    def conversion_router(self):
+        """Conversion routes shared by every portfolio, as they only depend on the listings"""
+        if not ROUTE_HUBS:
+            return None
+        return self.load('src.domain.trading.routing').ConversionRouter(
+            hubs=ROUTE_HUBS,
+            fee_rate=TRADING_FEE_RATE,
+            max_spread=ROUTE_MAX_SPREAD,
+        )
+
+    @component
+    def watchlist(self) -> List[str]:
+        return ASSET_WATCHLIST
+
+    @component
+    def default_parameters(self) -> StrategyParameters:
+        """Strategy used by every portfolio unless its config overrides it"""
+        return StrategyParameters(
+            take_profit_pct=TAKE_PROFIT_PCT,
+            stop_loss_pct=STOP_LOSS_PCT,
+            rsi_buy_threshold=RSI_BUY_THRESHOLD,
+            rsi_sell_threshold=RSI_SELL_THRESHOLD,
+            rsi_window=RSI_WINDOW,
+            ema_window=EMA_WINDOW,
+            bb_window=BB_WINDOW,
+            bb_window_dev=BB_WINDOW_DEV,
+        )
+
+    @component
+    def portfolio_configs(self) -> List[PortfolioConfig]:
+        if PORTFOLIOS:
+            return [
+                PortfolioConfig.from_dict(
+                    entry,
+                    state_key_prefix=REDIS_BOT_STATE_KEY,
+                    trades_key_prefix=REDIS_BOT_TRADES_KEY,
+                    initial_asset=INITIAL_ASSET,
+                    parameters=self.default_parameters,
+                )
+                for entry in json.loads(PORTFOLIOS)
+            ]
+        return [
+            PortfolioConfig(
+                name="default",
+                state_key=REDIS_BOT_STATE_KEY,
+                trades_key=REDIS_BOT_TRADES_KEY,
+                initial_asset=INITIAL_ASSET,
+                parameters=self.default_parameters,
+            ),
+        ]
+
+    @component
+    def portfolios(self) -> List[Portfolio]:
+        configs = self.portfolio_configs
+        self.check_accounts(configs)
+        return [self.create_portfolio(config, standalone=len(configs) == 1) for config in configs]
+
+    @component
+    def worker_services(self) -> 'TradingApplicationServices':
+        """Services analyzing queued market scans; jobs come from many ticks, so nothing is memoized across them"""
+        trading_services = self.load('src.domain.trading.services')
+        return self.load('src.application.trading.services').TradingApplicationServices(
+            calculator_indicator_app_services=self.create_calculator_services(self.default_parameters),
+            trading_domain_services=trading_services.TradingDomainServices(
+                exchange_client=self.exchange,
+                redis_client=self.redis_client,
+                telegram_adapter=self.telegram,
+                scan_queue=self.scan_queue,
+            ),
+        )
+
+    def create_calculator_services(self, parameters: StrategyParameters) -> 'IndicatorCalculatorApplicationServices':
+        calculator_services = self.load('src.domain.calculator.services')
+        return self.load('src.application.calculator.services').IndicatorCalculatorApplicationServices(
+            indicator_calculator_domain_services=calculator_services.IndicatorCalculatorDomainServices(
+                parameters=parameters,
+                tail=INDICATOR_TAIL,
+                streaming_indicators=self.indicator_engine,
+            ),
+        )
+
+    def reachable_assets(self, config: PortfolioConfig) -> Set[str]:
+        """Assets a portfolio can end up holding, USDT aside as it is never sized from the balance"""
+        assets = {config.initial_asset}
+        assets.update(symbol[:-len('USDT')] for symbol in self.portfolio_watchlist(config) if symbol.endswith('USDT'))
+        if self.conversion_router is not None:
+            # Routes pass through the hub assets
+            assets.update(self.conversion_router.hubs)
+        return assets - {'USDT'}
+
+    def check_accounts(self, configs: List[PortfolioConfig]):
+        """Reject portfolios sharing an account that can hold the same asset.
+
+        Orders are sized from the account balance of the held asset, so two such
+        portfolios would sell each other's holdings.
+        """
+        held: Dict[Optional[str], Dict[str, str]] = {}
+        for config in configs:
+            owners = held.setdefault(config.account, {})
+            for asset in sorted(self.reachable_assets(config)):
+                if asset in owners:
+                    raise ValueError(
+                        f"Portfolios {owners[asset]} and {config.name} can both hold {asset} "
+                        f"on account {config.account or 'API_KEY'}; give them separate accounts"
+                    )
+                owners[asset] = config.name
+
+    def exchange_for(self, account: Optional[str]) -> 'Exchange':
+        return self.exchange if account is None else self.account_exchanges[account]
+
+    def portfolio_watchlist(self, config: PortfolioConfig) -> List[str]:
+        return self.watchlist if config.watchlist is None else config.watchlist
+
+    def market_watchlist(self) -> List[str]:
+        """Symbols any portfolio may rotate into"""
+        return list(dict.fromkeys(symbol for portfolio in self.portfolios for symbol in portfolio.watchlist))
+
+    def create_portfolio(self, config: PortfolioConfig, standalone: bool) -> Portfolio:
+        with self.startup.stage(f"portfolio {config.name}"):
+            indicator_calculator_app_services = self.create_calculator_services(config.parameters)
+            trading_domain_services = self.load('src.domain.trading.services').TradingDomainServices(
+                exchange_client=self.exchange_for(config.account),
+                redis_client=self.redis_client,
+                telegram_adapter=self.telegram,
+                async_redis_client=self.async_redis_client,
+                async_exchange_client=self.async_exchange,
+                market_data=self.market_data,
+                state_key=config.state_key,
+                trades_key=config.trades_key,
+                initial_asset=config.initial_asset,
+                name=None if standalone else config.name,
+                scan_queue=self.scan_queue,
+                router=self.conversion_router,
+            )
+            trading_app_services = self.load('src.application.trading.services').TradingApplicationServices(
+                calculator_indicator_app_services=indicator_calculator_app_services,
+                trading_domain_services=trading_domain_services,
+                scan_workers=MARKET_SCAN_WORKERS,
+                scan_symbol_timeout=MARKET_SCAN_SYMBOL_TIMEOUT,
+                scan_deadline=MARKET_SCAN_DEADLINE,
+                scan_vectorized=MARKET_SCAN_VECTORIZED,
+            )
+        return Portfolio(
+            config=config,
+            standalone=standalone,
+            trading_app_services=trading_app_services,
+            indicator_calculator_app_services=indicator_calculator_app_services,
+            watchlist=self.portfolio_watchlist(config),
+        )
+
+    def warm_up(self):
+        """Build everything the first tick needs, so it does not pay for the startup.
+
+        Meant to run in a thread while the scheduler waits for the first candle close.
+        """
+        try:
+            with self.startup.stage('warm_up'):
+                for module in WARM_UP_MODULES:
+                    self.load(module)
+                if BOT_ROLE == WORKER_ROLE:
+                    self.worker_services
+                else:
+                    # Before the first tick, which then only fetches the candles closed since
+                    if self.kline_snapshot is not None:
+                        self.kline_snapshot.restore()
+                    self.portfolios
+                # The Binance client pings the exchange when it is created
+                if getattr(self.exchange, 'get_client', None) is not None:
+                    with self.startup.stage('exchange_client'):
+                        self.exchange.client
+                if BOT_ROLE != WORKER_ROLE and self.conversion_router is not None:
+                    with self.startup.stage('conversion_routes'):
+                        self.portfolios[0].trading_app_services.prepare_conversion_routes([
+                            *self.market_watchlist(),
+                            *(f"{config.initial_asset}USDT" for config in self.portfolio_configs),
+                        ])
+        finally:
+            self.report_startup('warm')
+
+    def report_startup(self, checkpoint: str, budget: Optional[float] = STARTUP_BUDGET) -> float:
+        """Log the startup breakdown at a checkpoint; becoming ready slower than `budget` is a regression"""
+        seconds = self.startup.checkpoint(checkpoint)
+        metrics.set(STARTUP_SECONDS, seconds, checkpoint=checkpoint)
+        logger.info(self.startup.report())
+        if checkpoint == 'ready' and budget and seconds > budget:
+            logger.warning(f"Startup took {seconds:.3f}s CPU, over the {budget:.3f}s budget.")
+        return seconds
+
+    def save_snapshot(self, due_only: bool = True):
+        """Snapshot the candle buffers, by default only once the snapshot interval has passed"""
+        if not self.created('kline_snapshot') or self.kline_snapshot is None:
+            return
+        try:
+            if due_only:
+                self.kline_snapshot.save_due()
+            else:
+                self.kline_snapshot.save()
+        except Exception as e:
+            logger.warning(f"Failed to save the kline snapshot: {e}")
+
+    async def aclose(self):
+        """Release the components that were created"""
+        self.save_snapshot(due_only=False)
+        if self.created('metrics_server') and self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.created('telegram'):
+            await self.telegram.flush(timeout=30)
+        if self.created('async_redis_client'):
+            await self.async_redis_client.close()
+        if self.created('async_exchange') and self.async_exchange is not None:
+            await self.async_exchange.close()
@@ -1,17 +1,28 @@
 # Python imports
-import pandas as pd
-from typing import Optional
+import numpy as np
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+)
 
 # App imports
+from src.adapters.metrics import metrics
 from src.domain.trading.value_objects import (
     AssetAnalysis,
     MarketAnalysis,
 )
 from src.domain.calculator.value_objects import (
-    BollingerBandsCalculatorIndicators,
-    ConservativeCalculatorIndicators,
+    BatchCalculatorIndicators,
+    StrategyParameters,
+)
+from src.domain.calculator.services import (
+    BollingerBandsIndicators,
+    IndicatorCalculatorDomainServices,
+    TrendIndicators,
 )
-from src.domain.calculator.services import IndicatorCalculatorDomainServices
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class IndicatorCalculatorApplicationServices:
     def __init__(self, indicator_calculator_domain_services: IndicatorCalculatorDomainServices):
@@ -20,36 +31,66 @@ class IndicatorCalculatorApplicationServices:
     def evaluate_trading_decision(
         self,
         entry_price: float,
-        close_prices: pd.Series,
-        trend_indicators: ConservativeCalculatorIndicators,
-        trade_indicators: BollingerBandsCalculatorIndicators,
+        close_prices: 'pd.Series',
+        trend_indicators: TrendIndicators,
+        trade_indicators: BollingerBandsIndicators,
     ) -> str:
-        return self.icds.evaluate_trading_decision(
-            entry_price=entry_price,
-            close_prices=close_prices,
-            trend_indicators=trend_indicators,
-            trade_indicators=trade_indicators,
-        )
+        with metrics.span('decision'):
+            return self.icds.evaluate_trading_decision(
+                entry_price=entry_price,
+                close_prices=close_prices,
+                trend_indicators=trend_indicators,
+                trade_indicators=trade_indicators,
+            )
 
     def apply_trend_indicators(
         self,
-        close_prices: pd.Series,
-    ) -> ConservativeCalculatorIndicators:
-        return self.icds.apply_trend_indicators(close_prices)
+        close_prices: 'pd.Series',
+        series: bool = False,
+    ) -> TrendIndicators:
+        return self.icds.apply_trend_indicators(close_prices, series=series)
 
     def apply_bollinger_bands_indicators(
         self,
-        close_prices: pd.Series,
-    ) -> BollingerBandsCalculatorIndicators:
-        return self.icds.apply_bollinger_bands_indicators(close_prices)
+        close_prices: 'pd.Series',
+        series: bool = False,
+    ) -> BollingerBandsIndicators:
+        return self.icds.apply_bollinger_bands_indicators(close_prices, series=series)
+
+    def apply_streaming_indicators(
+        self,
+        symbol: str,
+        interval: str,
+        open_times: np.ndarray,
+        close_prices: 'pd.Series',
+    ) -> Optional[tuple]:
+        return self.icds.apply_streaming_indicators(symbol, interval, open_times, close_prices)
+
+    def apply_batch_indicators(
+        self,
+        close_matrix: np.ndarray,
+    ) -> BatchCalculatorIndicators:
+        return self.icds.apply_batch_indicators(close_matrix)
+
+    def get_batch_trend_signals(self, indicators: BatchCalculatorIndicators) -> np.ndarray:
+        return self.icds.get_batch_trend_signals(indicators)
+
+    def get_batch_bollinger_bands_signals(self, indicators: BatchCalculatorIndicators) -> np.ndarray:
+        return self.icds.get_batch_bollinger_bands_signals(indicators)
+
+    def get_indicator_windows(self) -> tuple:
+        return self.icds.indicator_windows
+
+    def get_parameters(self) -> StrategyParameters:
+        return self.icds.parameters
 
-    def get_trend_signal(self, close_price: float, indicators: ConservativeCalculatorIndicators) -> str:
+    def get_trend_signal(self, close_price: float, indicators: TrendIndicators) -> str:
         return self.icds.get_trend_signal(close_price, indicators)
 
     def get_bollinger_bands_signals(
         self,
         close_price: float,
-        indicators: BollingerBandsCalculatorIndicators,
+        indicators: BollingerBandsIndicators,
     ) -> str:
         return self.icds.get_bollinger_bands_signals(close_price, indicators)
 
@@ -1,67 +1,159 @@
 # Python imports
-import pandas as pd
+import asyncio
+import numpy as np
+import time
 import uuid
-from typing import Optional
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import (
+    TYPE_CHECKING,
+    List,
+    Optional,
+    Tuple,
+)
 
 # App imports
+from src.conf.logger import Trace
+from src.adapters.metrics import metrics
 from src.domain.trading.entities import TradingOrder, TradingOrderFactory
 from src.domain.trading.value_objects import (
     SELL_DIRECTION,
+    SCAN_ERROR,
+    SCAN_TIMEOUT,
+    SCAN_DEADLINE_EXCEEDED,
     MarketAnalysis,
+    MarketScanFailure,
     AssetAnalysis,
+    ConversionRoute,
     TradeIntent,
 )
 from src.domain.trading.services import TradingDomainServices
+from src.domain.calculator.services import IndicatorCalculatorDomainServices
+from src.domain.calculator.value_objects import StrategyParameters
 from src.application.calculator.services import IndicatorCalculatorApplicationServices
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = Trace(__name__).logger
+
+# Upper bound on how long the concurrent scan waits before re-checking timeouts
+SCAN_POLL_INTERVAL = 0.1
+# Candles used to analyze each watchlist symbol
+MARKET_SCAN_INTERVAL = '5m'
+MARKET_SCAN_LOOKBACK = 200
+# Seconds a distributed scan waits for its results when no scan deadline is set
+DISTRIBUTED_SCAN_TIMEOUT = 150
+
+def candle_open_times(hd) -> np.ndarray:
+    """Open times in milliseconds of historical data given as `Candles` or a kline frame"""
+    if hasattr(hd, 'array'):
+        return hd.array('timestamp')
+    return hd['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+
+
 class TradingApplicationServices:
 
     def __init__(self,
         calculator_indicator_app_services: IndicatorCalculatorApplicationServices,
         trading_domain_services: TradingDomainServices,
-
+        scan_workers: int = 1,
+        scan_symbol_timeout: Optional[float] = None,
+        scan_deadline: Optional[float] = None,
+        scan_vectorized: bool = False,
     ):
         self.calculator_indicator_app_services = calculator_indicator_app_services
         self.trading_domain_services = trading_domain_services
+        self.scan_workers = scan_workers
+        self.scan_symbol_timeout = scan_symbol_timeout
+        self.scan_deadline = scan_deadline
+        self.scan_vectorized = scan_vectorized
+        # Services running queued scan jobs of other strategies, by parameters
+        self._job_services = {}
 
     def analyze_market(
         self,
         symbol: str,
     ) -> AssetAnalysis:
+        with self.trading_domain_services.market_scan_priority():
+            hd = self.trading_domain_services.get_historical_data(
+                symbol=symbol,
+                interval=MARKET_SCAN_INTERVAL,
+                lookback=MARKET_SCAN_LOOKBACK,
+            )
+        return self.analyze_historical_data(symbol, hd)
+
+    def _share(self, key: tuple, compute):
+        """Compute a value once per tick across portfolios, when market data is shared"""
+        market_data = self.trading_domain_services.market_data
+        if market_data is None:
+            return compute()
+        return market_data.get_or_compute(key, compute)
+
+    def get_market_indicators(self, symbol: str, interval: str, lookback: int) -> tuple:
+        """Return (historical data, trend indicators, Bollinger Bands indicators) of a symbol"""
         hd = self.trading_domain_services.get_historical_data(
             symbol=symbol,
-            interval='5m',
-            lookback=200,
+            interval=interval,
+            lookback=lookback,
         )
-        trend_indicators = self.calculator_indicator_app_services.apply_trend_indicators(
-            close_prices=hd['close'],
+        return (hd, *self.apply_market_indicators(symbol, interval, lookback, hd))
+
+    def apply_market_indicators(self, symbol: str, interval: str, lookback: int, hd: 'pd.DataFrame') -> tuple:
+        """Trend and Bollinger Bands indicators of a symbol's history, shared by equal indicator windows"""
+        def compute():
+            with metrics.span('indicators', interval=interval):
+                # Read from the incremental engine when it holds this window
+                streamed = self.calculator_indicator_app_services.apply_streaming_indicators(
+                    symbol,
+                    interval,
+                    open_times=candle_open_times(hd),
+                    close_prices=hd['close'],
+                )
+                if streamed is not None:
+                    return streamed
+                return (
+                    self.calculator_indicator_app_services.apply_trend_indicators(close_prices=hd['close']),
+                    self.calculator_indicator_app_services.apply_bollinger_bands_indicators(close_prices=hd['close']),
+                )
+        windows = self.calculator_indicator_app_services.get_indicator_windows()
+        return self._share(('indicators', symbol, interval, lookback, windows), compute)
+
+    def analyze_historical_data(
+        self,
+        symbol: str,
+        hd: 'pd.DataFrame',
+    ) -> AssetAnalysis:
+        trend_indicators, bb_indicators = self.apply_market_indicators(
+            symbol,
+            MARKET_SCAN_INTERVAL,
+            MARKET_SCAN_LOOKBACK,
+            hd,
         )
+        close_price = hd['close'].iloc[-1]
         trend_signal = self.calculator_indicator_app_services.get_trend_signal(
-            close_price=hd['close'].iloc[-1],
+            close_price=close_price,
             indicators=trend_indicators,
         )
-        latest_rsi = trend_indicators.rsi.iloc[-1]
-        latest_ema = trend_indicators.ema.iloc[-1]
-        bb_indicators = self.calculator_indicator_app_services.apply_bollinger_bands_indicators(
-            close_prices=hd['close'],
-        )
-        latest_bb_lower = bb_indicators.lower.iloc[-1]
-        latest_bb_upper = bb_indicators.upper.iloc[-1]
-        latest_bb_mavg = bb_indicators.mavg.iloc[-1]
+        latest_trend = trend_indicators.latest()
+        latest_bb = bb_indicators.latest()
         trade_signal = self.calculator_indicator_app_services.get_bollinger_bands_signals(
-            close_price=hd['close'].iloc[-1],
+            close_price=close_price,
             indicators=bb_indicators,
         )
         asset_analysis = AssetAnalysis(
             asset=symbol[:-4],
             symbol=symbol,
-            price=float(hd['close'].iloc[-1]),
-            rsi=float(latest_rsi),
-            ema=float(latest_ema),
+            price=float(close_price),
+            rsi=latest_trend.rsi,
+            ema=latest_trend.ema,
             trend_signal=trend_signal,
-            lower_bb=float(latest_bb_lower),
-            upper_bb=float(latest_bb_upper),
-            mavg_bb=float(latest_bb_mavg),
+            lower_bb=latest_bb.lower,
+            upper_bb=latest_bb.upper,
+            mavg_bb=latest_bb.mavg,
             trade_signal=trade_signal,
         )
         return asset_analysis
@@ -70,35 +162,334 @@ class TradingApplicationServices:
         self,
         watchlist: list,
     ) -> MarketAnalysis:
-        results = []
-    
+        """Analyze every symbol in the watchlist, concurrently or on scan workers if configured"""
+        with metrics.span('market_scan'):
+            if self.trading_domain_services.scan_queue is not None:
+                results, failures = self._scan_distributed(watchlist)
+            elif self.scan_vectorized:
+                results, failures = self._analyze_markets_vectorized(watchlist)
+            else:
+                results, failures = self._scan(watchlist, self.analyze_market)
+        for failure in failures.values():
+            logger.warning(f"Error analyzing market {failure.symbol} ({failure.reason}): {failure.message}")
+        return MarketAnalysis(
+            markets=[results[symbol] for symbol in watchlist if symbol in results],
+            failures=[failures[symbol] for symbol in watchlist if symbol in failures],
+        )
+
+    def analyze_market_batch(
+        self,
+        symbols: list,
+        close_matrix: np.ndarray,
+    ) -> dict:
+        """Build an AssetAnalysis per row of a (symbols x candles) matrix of scan-window closes"""
+        indicators = self._share(
+            ('batch', MARKET_SCAN_INTERVAL, MARKET_SCAN_LOOKBACK, tuple(symbols),
+             self.calculator_indicator_app_services.get_indicator_windows()),
+            lambda: self._apply_batch_indicators(close_matrix),
+        )
+        trend_signals = self.calculator_indicator_app_services.get_batch_trend_signals(indicators)
+        trade_signals = self.calculator_indicator_app_services.get_batch_bollinger_bands_signals(indicators)
+        analyses = {}
+        for i, symbol in enumerate(symbols):
+            analyses[symbol] = AssetAnalysis(
+                asset=symbol[:-4],
+                symbol=symbol,
+                price=float(indicators.close[i]),
+                rsi=float(indicators.rsi[i]),
+                ema=float(indicators.ema[i]),
+                trend_signal=str(trend_signals[i]),
+                lower_bb=float(indicators.lower[i]),
+                upper_bb=float(indicators.upper[i]),
+                mavg_bb=float(indicators.mavg[i]),
+                trade_signal=str(trade_signals[i]),
+            )
+        return analyses
+
+    def _apply_batch_indicators(self, close_matrix: np.ndarray):
+        with metrics.span('indicators', interval=MARKET_SCAN_INTERVAL):
+            return self.calculator_indicator_app_services.apply_batch_indicators(close_matrix)
+
+    def _fetch_scan_closes(self, symbol: str) -> np.ndarray:
+        with self.trading_domain_services.market_scan_priority():
+            hd = self.trading_domain_services.get_historical_data(
+                symbol=symbol,
+                interval=MARKET_SCAN_INTERVAL,
+                lookback=MARKET_SCAN_LOOKBACK,
+            )
+        return hd['close'].to_numpy(dtype=np.float64)
+
+    def _analyze_markets_vectorized(self, watchlist: list) -> tuple:
+        """Fetch every symbol, then compute all indicators in one pass per history length"""
+        closes, failures = self._scan(watchlist, self._fetch_scan_closes)
+        # Recently listed symbols may return fewer candles; rows must be equal length
+        groups = {}
+        for symbol, close in closes.items():
+            groups.setdefault(len(close), []).append(symbol)
+        results = {}
+        for symbols in groups.values():
+            results.update(self.analyze_market_batch(
+                symbols=symbols,
+                close_matrix=np.vstack([closes[symbol] for symbol in symbols]),
+            ))
+        return results, failures
+
+    async def analyze_markets_async(
+        self,
+        watchlist: list,
+    ) -> MarketAnalysis:
+        """Analyze the watchlist with every symbol fetched concurrently on the event loop"""
+        if (
+            self.trading_domain_services.async_exchange_client is None
+            or self.trading_domain_services.scan_queue is not None
+        ):
+            return await asyncio.to_thread(self.analyze_markets, watchlist)
+        with metrics.span('market_scan'):
+            frames, failures = await self._scan_async(watchlist, self._fetch_scan_data_async)
+            results = {}
+            if self.scan_vectorized:
+                groups = {}
+                for symbol, hd in frames.items():
+                    groups.setdefault(len(hd), []).append(symbol)
+                for symbols in groups.values():
+                    results.update(self.analyze_market_batch(
+                        symbols=symbols,
+                        close_matrix=np.vstack([frames[symbol]['close'].to_numpy(dtype=np.float64) for symbol in symbols]),
+                    ))
+            else:
+                for symbol, hd in frames.items():
+                    try:
+                        results[symbol] = self.analyze_historical_data(symbol, hd)
+                    except Exception as e:
+                        failures[symbol] = MarketScanFailure(symbol=symbol, reason=SCAN_ERROR, message=str(e))
+        for failure in failures.values():
+            logger.warning(f"Error analyzing market {failure.symbol} ({failure.reason}): {failure.message}")
+        return MarketAnalysis(
+            markets=[results[symbol] for symbol in watchlist if symbol in results],
+            failures=[failures[symbol] for symbol in watchlist if symbol in failures],
+        )
+
+    async def _fetch_scan_data_async(self, symbol: str) -> 'pd.DataFrame':
+        with self.trading_domain_services.market_scan_priority():
+            return await self.trading_domain_services.get_historical_data_async(
+                symbol=symbol,
+                interval=MARKET_SCAN_INTERVAL,
+                lookback=MARKET_SCAN_LOOKBACK,
+            )
+
+    async def _scan_async(self, watchlist: list, task) -> tuple:
+        """Await `task` for every symbol at once, applying the scan timeouts"""
+        results = {}
+        failures = {}
+
+        async def run(symbol: str):
+            if self.scan_symbol_timeout is None:
+                return await task(symbol)
+            return await asyncio.wait_for(task(symbol), timeout=self.scan_symbol_timeout)
+
+        futures = {asyncio.ensure_future(run(symbol)): symbol for symbol in dict.fromkeys(watchlist)}
+        if not futures:
+            return results, failures
+        done, pending = await asyncio.wait(futures, timeout=self.scan_deadline or None)
+        for future in pending:
+            future.cancel()
+            failures[futures[future]] = MarketScanFailure(
+                symbol=futures[future],
+                reason=SCAN_DEADLINE_EXCEEDED,
+                message=f"Market scan deadline of {self.scan_deadline}s exceeded",
+            )
+        for future in done:
+            symbol = futures[future]
+            error = future.exception()
+            if error is None:
+                results[symbol] = future.result()
+            elif isinstance(error, asyncio.TimeoutError):
+                failures[symbol] = MarketScanFailure(
+                    symbol=symbol,
+                    reason=SCAN_TIMEOUT,
+                    message=f"Analysis took longer than {self.scan_symbol_timeout}s",
+                )
+            else:
+                failures[symbol] = MarketScanFailure(symbol=symbol, reason=SCAN_ERROR, message=str(error))
+        return results, failures
+
+    def _scan_distributed(self, watchlist: list) -> tuple:
+        """Queue one job per symbol for the scan workers and gather their analyses.
+
+        Job ids are per candle and strategy, so portfolios or coordinators
+        scanning the same symbols in the same candle share one analysis. This
+        process runs queued jobs too while it waits, which also picks up the
+        jobs of dead workers once their lease expires.
+        """
+        parameters = self.calculator_indicator_app_services.get_parameters().as_dict()
+        jobs = {}
+        for symbol in dict.fromkeys(watchlist):
+            job_id = self.trading_domain_services.market_scan_job_id(
+                symbol,
+                MARKET_SCAN_INTERVAL,
+                MARKET_SCAN_LOOKBACK,
+                parameters,
+            )
+            jobs[job_id] = {'symbol': symbol, 'parameters': parameters}
+        queued = self.trading_domain_services.submit_market_scans(jobs)
+        logger.info(
+            f"Queued {queued} of {len(jobs)} market scan jobs "
+            f"({self.trading_domain_services.count_scan_workers()} workers alive)."
+        )
+        finished, errors = self.trading_domain_services.gather_market_scans(
+            list(jobs),
+            self.run_market_scan_job,
+            self.scan_deadline or DISTRIBUTED_SCAN_TIMEOUT,
+            job_timeout=self.scan_symbol_timeout,
+        )
+        results = {}
+        failures = {}
+        for job_id, job in jobs.items():
+            symbol = job['symbol']
+            if job_id in finished:
+                results[symbol] = AssetAnalysis(**finished[job_id])
+            elif job_id in errors:
+                failures[symbol] = MarketScanFailure(symbol=symbol, reason=SCAN_ERROR, message=errors[job_id])
+            else:
+                failures[symbol] = MarketScanFailure(
+                    symbol=symbol,
+                    reason=SCAN_DEADLINE_EXCEEDED,
+                    message="Scan workers did not analyze the symbol before the deadline",
+                )
+        return results, failures
+
+    def run_market_scan_job(self, payload: dict) -> dict:
+        """Analyze one queued symbol with the strategy of the process that queued it"""
+        parameters = StrategyParameters(**payload['parameters'])
+        services = self
+        if parameters != self.calculator_indicator_app_services.get_parameters():
+            if parameters not in self._job_services:
+                self._job_services[parameters] = TradingApplicationServices(
+                    calculator_indicator_app_services=IndicatorCalculatorApplicationServices(
+                        indicator_calculator_domain_services=IndicatorCalculatorDomainServices(parameters=parameters),
+                    ),
+                    trading_domain_services=self.trading_domain_services,
+                )
+            services = self._job_services[parameters]
+        return services.analyze_market(payload['symbol']).as_dict()
+
+    def serve_market_scans(self, stop=None):
+        """Work as a scan worker, analyzing symbols queued by the trading processes"""
+        self.trading_domain_services.serve_market_scans(self.run_market_scan_job, stop=stop)
+
+    def _scan(self, watchlist: list, task) -> tuple:
+        if self.scan_workers > 1:
+            return self._scan_concurrently(watchlist, task)
+        return self._scan_serially(watchlist, task)
+
+    def _scan_serially(self, watchlist: list, task) -> tuple:
+        results = {}
+        failures = {}
+        deadline = time.monotonic() + self.scan_deadline if self.scan_deadline else None
         for symbol in watchlist:
+            if deadline is not None and time.monotonic() >= deadline:
+                failures[symbol] = MarketScanFailure(
+                    symbol=symbol,
+                    reason=SCAN_DEADLINE_EXCEEDED,
+                    message="Market scan deadline exceeded before the symbol was analyzed",
+                )
+                continue
             try:
-                asset_analysis = self.analyze_market(symbol)
-                results.append(asset_analysis)
+                results[symbol] = task(symbol)
             except Exception as e:
-                print(f"Error analyzing market {symbol}: {e}")
-        return MarketAnalysis(markets=results)
+                failures[symbol] = MarketScanFailure(symbol=symbol, reason=SCAN_ERROR, message=str(e))
+        return results, failures
+
+    def _scan_concurrently(self, watchlist: list, task) -> tuple:
+        """Run `task` for every symbol on a thread pool.
+
+        Symbols running longer than the per-symbol timeout, or still pending
+        when the scan deadline passes, are reported as failures and their
+        results are discarded. Worker threads are not interrupted; they finish
+        in the background while the scan returns.
+        """
+        results = {}
+        failures = {}
+        started = {}
+        deadline = time.monotonic() + self.scan_deadline if self.scan_deadline else None
+
+        def run(symbol: str):
+            started[symbol] = time.monotonic()
+            return task(symbol)
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.scan_workers,
+            thread_name_prefix="market-scan",
+        )
+        try:
+            futures = {executor.submit(run, symbol): symbol for symbol in dict.fromkeys(watchlist)}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=SCAN_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    symbol = futures[future]
+                    try:
+                        results[symbol] = future.result()
+                    except Exception as e:
+                        failures[symbol] = MarketScanFailure(symbol=symbol, reason=SCAN_ERROR, message=str(e))
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    for future in pending:
+                        future.cancel()
+                        failures[futures[future]] = MarketScanFailure(
+                            symbol=futures[future],
+                            reason=SCAN_DEADLINE_EXCEEDED,
+                            message=f"Market scan deadline of {self.scan_deadline}s exceeded",
+                        )
+                    break
+                if self.scan_symbol_timeout is None:
+                    continue
+                for future in list(pending):
+                    symbol = futures[future]
+                    if symbol in started and now - started[symbol] >= self.scan_symbol_timeout:
+                        pending.discard(future)
+                        failures[symbol] = MarketScanFailure(
+                            symbol=symbol,
+                            reason=SCAN_TIMEOUT,
+                            message=f"Analysis took longer than {self.scan_symbol_timeout}s",
+                        )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results, failures
 
     def get_asset_balance(self, asset: str) -> float:
         """Get the balance of a specific asset"""
         return self.trading_domain_services.get_asset_balance(asset)
 
-    def get_historical_data(self, symbol: str, interval: str = '1h', lookback: int = 100) -> pd.DataFrame:
+    def get_historical_data(self, symbol: str, interval: str = '1h', lookback: int = 100) -> 'pd.DataFrame':
         return self.trading_domain_services.get_historical_data(
             symbol=symbol,
             interval=interval,
             lookback=lookback,
         )
-    
+
+    def retain_market_data(self, symbols: list):
+        """Keep cached market data only for the given symbols"""
+        self.trading_domain_services.evict_historical_data(keep_symbols=symbols)
+
     async def place_order(
         self,
         order: TradingOrder,
+        next_asset: Optional[str] = None,
+        next_entry_price: Optional[float] = 0.0,
     ) -> TradingOrder:
-        """Place an order on the exchange"""
-        await self.trading_domain_services.place_order(order)
+        """Place an order on the exchange, optionally moving to `next_asset` atomically"""
+        await self.trading_domain_services.place_order(
+            order,
+            next_asset=next_asset,
+            next_entry_price=next_entry_price,
+        )
         return order
 
+    def market_snapshot(self):
+        """Context manager serving prices and balances from one bulk fetch"""
+        return self.trading_domain_services.market_snapshot()
+
     def get_current_asset(self) -> Optional[dict]:
         trading_state = self.trading_domain_services.get_trading_state()
 
@@ -108,6 +499,15 @@ class TradingApplicationServices:
     def set_current_asset(self, asset: str, entry_price: Optional[float] = None):
         self.trading_domain_services.set_trading_state(asset, entry_price=entry_price)
 
+    async def get_current_asset_async(self) -> Optional[dict]:
+        trading_state = await self.trading_domain_services.get_trading_state_async()
+
+        if trading_state:
+            return trading_state
+
+    async def set_current_asset_async(self, asset: str, entry_price: Optional[float] = None):
+        await self.trading_domain_services.set_trading_state_async(asset, entry_price=entry_price)
+
     def wipe_current_asset(self):
         self.trading_domain_services.wipe_trading_state()
 
@@ -124,6 +524,15 @@ class TradingApplicationServices:
         """Get the balance of a specific asset"""
         return self.trading_domain_services.get_asset_balance(asset)
 
+    def get_holding(self, asset: str) -> Tuple[float, float]:
+        """USD value and balance of an asset's holding, from one market snapshot.
+
+        Blocking; coroutines run it with `asyncio.to_thread`, as the exchange
+        calls may wait on the rate limiter.
+        """
+        with self.market_snapshot():
+            return self.trading_domain_services.get_holding_price(asset), self.get_asset_balance(asset)
+
     def get_equivalent_volume(
         self,
         origin_asset: str,
@@ -138,12 +547,11 @@ class TradingApplicationServices:
         self,
     ) -> TradingOrder:
         """Implement stop loss strategy"""
-        current_asset = self.get_current_asset()
+        current_asset = await self.get_current_asset_async()
         if current_asset == "USDT":
             raise ValueError("Stop loss cannot be applied to USDT.")
         asset = current_asset.get("current_asset")
-        current_holding_value = self.get_current_asset_holding_value()
-        current_balance = self.get_asset_balance(asset)
+        current_holding_value, current_balance = await asyncio.to_thread(self.get_holding, asset)
         entry_price = current_asset.get("entry_price")
         order = TradingOrderFactory.create_order(
             symbol=f"{asset}USDT",
@@ -152,10 +560,42 @@ class TradingApplicationServices:
             usd_amount=current_holding_value,
             profit=current_holding_value - (entry_price * current_balance),
         )
-        # Place the order
-        await self.place_order(order)
+        # Place the order and move to USDT in the same state transition
+        await self.place_order(order, next_asset="USDT", next_entry_price=order.usd_amount)
         return order
 
+    def prepare_conversion_routes(self, watchlist: List[str]):
+        """Precompute the conversion routes between the watchlist assets"""
+        self.trading_domain_services.prepare_routes([symbol[:-4] for symbol in watchlist])
+
+    def get_conversion_route(
+        self,
+        base_asset: str,
+        quote_asset: str,
+    ) -> ConversionRoute:
+        """Get the cheapest route converting the base asset into the quote asset"""
+        return self.trading_domain_services.get_conversion_route(
+            base_asset=base_asset,
+            quote_asset=quote_asset,
+        )
+
+    async def execute_route(
+        self,
+        route: ConversionRoute,
+        next_entry_price: Optional[float] = 0.0,
+    ) -> List[TradingOrder]:
+        """Convert the whole current holding along a route, moving to its target"""
+        current_asset = await self.get_current_asset_async()
+        entry_price = current_asset.get("entry_price")
+        current_holding_value, current_balance = await asyncio.to_thread(self.get_holding, route.origin)
+        return await self.trading_domain_services.execute_route(
+            route,
+            amount=current_balance,
+            usd_amount=current_holding_value,
+            profit=current_holding_value - (entry_price * current_balance),
+            next_entry_price=next_entry_price,
+        )
+
     def get_trade_intent(
         self,
         base_asset: str,
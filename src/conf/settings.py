@@ -5,6 +5,12 @@ import os
 API_KEY = os.environ.get('API_KEY')
 API_SECRET = os.environ.get('API_SECRET')
 API_URL = os.environ.get('API_URL', 'https://testnet.binance.vision/api')
+EXCHANGE_METADATA_TTL = float(os.environ.get('EXCHANGE_METADATA_TTL', 3600))
+# Fetch market data through the asyncio REST adapter instead of a thread per symbol
+EXCHANGE_ASYNC = os.environ.get('EXCHANGE_ASYNC', 'false').lower() == 'true'
+EXCHANGE_MAX_CONNECTIONS = int(os.environ.get('EXCHANGE_MAX_CONNECTIONS', 20))
+# Request weight budget per minute shared by every exchange call; 0 disables limiting
+EXCHANGE_WEIGHT_LIMIT = int(os.environ.get('EXCHANGE_WEIGHT_LIMIT', 6000))
 
 # Redis settings
 REDIS_HOST = os.environ.get('REDIS_HOST', 'localhost')
@@ -12,16 +18,93 @@ REDIS_PORT = os.environ.get('REDIS_PORT', 6379)
 REDIS_DB = os.environ.get('REDIS_DB', 0)
 REDIS_BOT_STATE_KEY = os.environ.get('REDIS_BOT_STATE_KEY', 'bot:state')
 REDIS_BOT_TRADES_KEY = os.environ.get('REDIS_BOT_TRADES_KEY', 'bot:trades')
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', 10))
 
 # App settings
 ASSET_WATCHLIST = os.environ.get('ASSET_WATCHLIST', 'ETHUSDT,BTCUSDT,SOLUSDT,TAOUSDT').split(',')
 INITIAL_ASSET = os.environ.get('INITIAL_ASSET', 'ETH')
+# JSON list of portfolios hosted by one process, e.g.
+# [{"name": "main"}, {"name": "alt", "initial_asset": "SOL", "account": "sub1", "watchlist": "SOLUSDT,TAOUSDT"}]
+# Unset fields fall back to the settings above; empty runs the single default portfolio.
+# Portfolios without an account trade on API_KEY; two portfolios on one account must not
+# be able to hold the same asset, as orders are sized from the account balance.
+PORTFOLIOS = os.environ.get('PORTFOLIOS', '')
+# JSON object of the exchange (sub-)accounts portfolios trade on, e.g.
+# {"sub1": {"api_key": "...", "api_secret": "..."}}
+ACCOUNTS = os.environ.get('ACCOUNTS', '')
 INTERVAL = os.environ.get('INTERVAL', '5m')
 LOOKBACK = os.environ.get('LOOKBACK', '100')
-RSI_BUY_THRESHOLD = os.environ.get('RSI_BUY_THRESHOLD', 30)
-RSI_SELL_THRESHOLD = os.environ.get('RSI_SELL_THRESHOLD', 70)
-STOP_LOSS_PCT = os.environ.get('STOP_LOSS_PCT', 0.95)
+
+# Strategy settings
+TAKE_PROFIT_PCT = float(os.environ.get('TAKE_PROFIT_PCT', 3))
+STOP_LOSS_PCT = float(os.environ.get('STOP_LOSS_PCT', 1))
+RSI_BUY_THRESHOLD = float(os.environ.get('RSI_BUY_THRESHOLD', 40))
+RSI_SELL_THRESHOLD = float(os.environ.get('RSI_SELL_THRESHOLD', 70))
+RSI_WINDOW = int(os.environ.get('RSI_WINDOW', 14))
+EMA_WINDOW = int(os.environ.get('EMA_WINDOW', 200))
+BB_WINDOW = int(os.environ.get('BB_WINDOW', 20))
+BB_WINDOW_DEV = float(os.environ.get('BB_WINDOW_DEV', 1.5))
+# Recent indicator values kept next to the latest one; 0 computes only the latest
+INDICATOR_TAIL = int(os.environ.get('INDICATOR_TAIL', 0))
+# Update the indicators incrementally as candles are cached instead of recomputing every window
+STREAMING_INDICATORS = os.environ.get('STREAMING_INDICATORS', 'true').lower() == 'true'
+
+# Market data settings
+MARKET_DATA_MODE = os.environ.get('MARKET_DATA_MODE', 'poll')
+BINANCE_WS_URL = os.environ.get('BINANCE_WS_URL', 'wss://stream.testnet.binance.vision')
+KLINE_CACHE_ENABLED = os.environ.get('KLINE_CACHE_ENABLED', 'true').lower() == 'true'
+KLINE_CACHE_SIZE = int(os.environ.get('KLINE_CACHE_SIZE', 1000))
+# 'compact' decodes klines into NumPy candle columns; 'dataframe' builds the full kline frame
+KLINE_DECODING = os.environ.get('KLINE_DECODING', 'compact')
+# Float precision of compact candles: 'float64' or 'float32'
+KLINE_DTYPE = os.environ.get('KLINE_DTYPE', 'float64')
+# Directory of the on-disk candle store; empty disables it
+CANDLE_STORE_PATH = os.environ.get('CANDLE_STORE_PATH', '')
+# Snapshot of the closed candle buffers restored on startup, so a restart only backfills the gap.
+# Kept in the file KLINE_SNAPSHOT_PATH, or else under the Redis key KLINE_SNAPSHOT_KEY; both empty disable it
+KLINE_SNAPSHOT_PATH = os.environ.get('KLINE_SNAPSHOT_PATH', '')
+KLINE_SNAPSHOT_KEY = os.environ.get('KLINE_SNAPSHOT_KEY', '')
+# Minimum seconds between two snapshots, taken after a tick
+KLINE_SNAPSHOT_INTERVAL = float(os.environ.get('KLINE_SNAPSHOT_INTERVAL', 300))
+MARKET_SCAN_WORKERS = int(os.environ.get('MARKET_SCAN_WORKERS', 1))
+MARKET_SCAN_SYMBOL_TIMEOUT = float(os.environ.get('MARKET_SCAN_SYMBOL_TIMEOUT', 30))
+MARKET_SCAN_DEADLINE = float(os.environ.get('MARKET_SCAN_DEADLINE', 150))
+MARKET_SCAN_VECTORIZED = os.environ.get('MARKET_SCAN_VECTORIZED', 'false').lower() == 'true'
+# Assets a rotation may convert through when the two assets share no pair; empty only trades direct pairs
+ROUTE_HUBS = [hub for hub in os.environ.get('ROUTE_HUBS', 'USDT,BTC,FDUSD').split(',') if hub]
+# Taker fee paid on every leg of a conversion route
+TRADING_FEE_RATE = float(os.environ.get('TRADING_FEE_RATE', 0.001))
+# Pairs whose relative bid-ask spread is wider than this are not routed through
+ROUTE_MAX_SPREAD = float(os.environ.get('ROUTE_MAX_SPREAD', 0.01))
+
+# Redis queue name spreading market scans over worker processes; empty scans in-process
+MARKET_SCAN_QUEUE = os.environ.get('MARKET_SCAN_QUEUE', '')
+# Seconds a worker may hold a scan job before it is handed to another worker
+MARKET_SCAN_LEASE = float(os.environ.get('MARKET_SCAN_LEASE', 30))
+MARKET_SCAN_MAX_ATTEMPTS = int(os.environ.get('MARKET_SCAN_MAX_ATTEMPTS', 3))
+# 'bot' trades the portfolios; 'worker' only analyzes symbols queued by bots
+BOT_ROLE = os.environ.get('BOT_ROLE', 'bot')
+
+# Scheduler settings (poll mode)
+SCHEDULER_INTERVAL = os.environ.get('SCHEDULER_INTERVAL', '5m')
+# Seconds after each candle close at which the evaluation runs
+SCHEDULER_OFFSET = float(os.environ.get('SCHEDULER_OFFSET', 5))
+# 'skip' drops ticks that overlap a running evaluation, 'merge' runs once more afterwards
+SCHEDULER_OVERRUN = os.environ.get('SCHEDULER_OVERRUN', 'skip')
+
+# Startup settings
+# Seconds from process start until the bot is ready to schedule; a slower start is logged as a regression
+STARTUP_BUDGET = float(os.environ.get('STARTUP_BUDGET', 1.0))
+
+# Metrics settings
+# Prometheus-style endpoint served at http://METRICS_HOST:METRICS_PORT/metrics; 0 disables it
+METRICS_HOST = os.environ.get('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.environ.get('METRICS_PORT', 9108))
 
 # Telegram settings
 TELEGRAM_API_TOKEN = os.environ.get('TELEGRAM_API_TOKEN')
-TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
\ No newline at end of file
+TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
+TELEGRAM_API_URL = os.environ.get('TELEGRAM_API_URL', '')
+# Outbound notifications are queued and sent in the background; 0 sends inline
+TELEGRAM_QUEUE_SIZE = int(os.environ.get('TELEGRAM_QUEUE_SIZE', 100))
+TELEGRAM_COALESCE_DELAY = float(os.environ.get('TELEGRAM_COALESCE_DELAY', 1.0))
\ No newline at end of file
@@ -0,0 +1,350 @@
+# Python imports
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import (
+    List,
+    Optional,
+)
+
+# App imports
+from src.domain.calculator.value_objects import StrategyParameters
+from src.domain.calculator.vectorized import (
+    rolling_bollinger_bands,
+    trailing_ema,
+    trailing_rsi,
+    windowed_ewm,
+)
+
+# Local imports
+from .value_objects import (
+    CASH_ASSET,
+    ONE_HOUR_MS,
+    BacktestConfig,
+    BacktestResult,
+    BacktestSignals,
+    BacktestTrade,
+    PriceHistory,
+)
+
+# Signals are encoded as small integers so they can be compared vectorized
+BUY_CODE = 1
+HOLD_CODE = 0
+SELL_CODE = -1
+
+# Candles searched at once when looking for the next sell decision
+SEARCH_CHUNK = 64
+
+
+class BacktestDomainServices:
+    """Replays the live decision rules over a PriceHistory.
+
+    Every indicator and signal is precomputed for every candle and symbol,
+    evaluated over the same trailing kline windows `main()` fetches. The
+    simulation then only walks from one sell decision to the next. Decisions
+    are taken at each 5m candle close; the still-open candle the live bot
+    sees is approximated by that close, and the still-open 1h candle by the
+    1h candle built so far.
+    """
+
+    def __init__(self):
+        pass
+
+    def get_trend_codes(
+        self,
+        close: np.ndarray,
+        rsi: np.ndarray,
+        ema: np.ndarray,
+        parameters: StrategyParameters,
+    ) -> np.ndarray:
+        """Vectorized `get_trend_signal`"""
+        return np.select(
+            [
+                (rsi < parameters.rsi_buy_threshold) & (close > ema),
+                (rsi > parameters.rsi_sell_threshold) & (close < ema),
+            ],
+            [BUY_CODE, SELL_CODE],
+            default=HOLD_CODE,
+        ).astype(np.int8)
+
+    def get_bollinger_bands_codes(self, close: np.ndarray, upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+        """Vectorized `get_bollinger_bands_signals`"""
+        return np.select(
+            [close < lower, close > upper],
+            [BUY_CODE, SELL_CODE],
+            default=HOLD_CODE,
+        ).astype(np.int8)
+
+    def get_sell_mask(
+        self,
+        change: np.ndarray,
+        trend: np.ndarray,
+        trade: np.ndarray,
+        parameters: StrategyParameters,
+    ) -> np.ndarray:
+        """Vectorized `evaluate_trading_decision` == SELL_SIGNAL"""
+        take_profit = parameters.take_profit_pct
+        stop_loss = -parameters.stop_loss_pct
+        both_buy = (trend == BUY_CODE) & (trade == BUY_CODE)
+        both_sell = (trend == SELL_CODE) & (trade == SELL_CODE)
+        return (
+            (change > take_profit)
+            | ((change < stop_loss) & ~both_buy)
+            | ((change >= stop_loss) & (change <= take_profit) & both_sell)
+        )
+
+    def get_window_signals(self, close: np.ndarray, lookback: int, parameters: StrategyParameters) -> tuple:
+        """(rsi, trend codes, trade codes) at every candle over a trailing 5m window"""
+        rsi = trailing_rsi(close, lookback, window=parameters.rsi_window)
+        ema = trailing_ema(close, lookback, window=parameters.ema_window)
+        upper, lower, _ = rolling_bollinger_bands(
+            close,
+            window=parameters.bb_window,
+            window_dev=parameters.bb_window_dev,
+        )
+        if lookback < parameters.bb_window:
+            upper = lower = np.full(close.shape[0], np.nan)
+        return (
+            rsi,
+            self.get_trend_codes(close, rsi, ema, parameters),
+            self.get_bollinger_bands_codes(close, upper, lower),
+        )
+
+    def get_hourly_window_signals(
+        self,
+        close: np.ndarray,
+        timestamps: np.ndarray,
+        lookback: int,
+        parameters: StrategyParameters,
+    ) -> tuple:
+        """(trend codes, trade codes) at every 5m candle over a trailing 1h window.
+
+        The window holds the `lookback - 1` closed hours before the current
+        one plus the current hour, whose close is the latest 5m close. Each
+        indicator is the last step of an EWM (or rolling window) over the
+        closed hours, advanced by that one partial value.
+        """
+        candles = close.shape[0]
+        hours = timestamps // ONE_HOUR_MS
+        hour_ids, first_index = np.unique(hours, return_index=True)
+        last_index = np.r_[first_index[1:] - 1, candles - 1]
+        hourly_close = close[last_index]
+        # Index of the previous (closed) hour for every 5m candle
+        previous = np.searchsorted(hour_ids, hours) - 1
+        valid = previous >= 0
+        previous = np.where(valid, previous, 0)
+        base = hourly_close[previous]
+        nan = np.full(candles, np.nan)
+
+        ema = nan
+        if lookback >= parameters.ema_window and lookback > 1:
+            alpha = 2 / (parameters.ema_window + 1)
+            closed = windowed_ewm(hourly_close, lookback - 1, alpha, seed=hourly_close)[previous]
+            ema = closed + alpha * (close - closed)
+
+        rsi = nan
+        if lookback >= parameters.rsi_window and lookback > 1:
+            alpha = 1 / parameters.rsi_window
+            changes = np.diff(hourly_close, prepend=hourly_close[0])
+            zeros = np.zeros_like(hourly_close)
+            gain = windowed_ewm(np.clip(changes, 0, None), lookback - 1, alpha, seed=zeros)[previous]
+            loss = windowed_ewm(np.clip(-changes, 0, None), lookback - 1, alpha, seed=zeros)[previous]
+            gain = gain + alpha * (np.clip(close - base, 0, None) - gain)
+            loss = loss + alpha * (np.clip(base - close, 0, None) - loss)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = np.where(loss == 0, 100.0, 100 - (100 / (1 + gain / loss)))
+            rsi = np.where(np.isnan(gain) | np.isnan(loss), np.nan, rsi)
+
+        upper = lower = nan
+        window = parameters.bb_window
+        if lookback >= window and hourly_close.shape[0] >= window - 1:
+            # Sums over the closed hours, shifted by the newest closed hour
+            # to keep the variance numerically stable.
+            windows = sliding_window_view(hourly_close, window - 1)
+            shifted = windows - windows[:, -1:]
+            shifted_sum = np.r_[np.full(window - 2, np.nan), shifted.sum(axis=1)][previous]
+            shifted_sum_sq = np.r_[np.full(window - 2, np.nan), (shifted * shifted).sum(axis=1)][previous]
+            partial = close - base
+            mean = (shifted_sum + partial) / window
+            variance = np.maximum((shifted_sum_sq + partial * partial) / window - mean * mean, 0)
+            mavg = base + mean
+            deviation = parameters.bb_window_dev * np.sqrt(variance)
+            upper, lower = mavg + deviation, mavg - deviation
+
+        rsi = np.where(valid, rsi, np.nan)
+        return (
+            self.get_trend_codes(close, rsi, ema, parameters),
+            self.get_bollinger_bands_codes(close, upper, lower),
+        )
+
+    def get_warmup(self, history: PriceHistory, config: BacktestConfig) -> int:
+        """First candle at which every trailing window is complete"""
+        hours = history.timestamps // ONE_HOUR_MS
+        first_full_hour = np.searchsorted(hours, hours[0] + config.long_term_lookback - 1)
+        return int(max(
+            config.short_term_lookback - 1,
+            config.scan_lookback - 1,
+            first_full_hour,
+        ))
+
+    def get_signals(self, history: PriceHistory, config: BacktestConfig) -> BacktestSignals:
+        """Signals of both timeframes and of the market scan at every candle and symbol"""
+        closes = np.asarray(history.closes, dtype=np.float64)
+        symbols, candles = closes.shape
+        parameters = config.parameters
+        signals = BacktestSignals(
+            short_trend=np.empty((symbols, candles), dtype=np.int8),
+            short_trade=np.empty((symbols, candles), dtype=np.int8),
+            long_trend=np.empty((symbols, candles), dtype=np.int8),
+            long_trade=np.empty((symbols, candles), dtype=np.int8),
+            scan_rsi=np.empty((symbols, candles)),
+            scan_eligible=np.empty((symbols, candles), dtype=bool),
+        )
+        for i in range(symbols):
+            close = closes[i]
+            _, signals.short_trend[i], signals.short_trade[i] = self.get_window_signals(
+                close,
+                config.short_term_lookback,
+                parameters,
+            )
+            signals.long_trend[i], signals.long_trade[i] = self.get_hourly_window_signals(
+                close,
+                history.timestamps,
+                config.long_term_lookback,
+                parameters,
+            )
+            rsi, trend, trade = self.get_window_signals(close, config.scan_lookback, parameters)
+            signals.scan_rsi[i] = rsi
+            # Same filter as get_best_market_opportunity, skipping symbols
+            # that have no data yet
+            signals.scan_eligible[i] = (trade != SELL_CODE) & (trend != SELL_CODE) & np.isfinite(rsi)
+        return signals
+
+    def get_best_symbol(self, signals: BacktestSignals, candle: int) -> Optional[int]:
+        """Vectorized `get_best_market_opportunity`: the eligible symbol with the lowest scan RSI"""
+        eligible = signals.scan_eligible[:, candle]
+        if not eligible.any():
+            return None
+        return int(np.argmin(np.where(eligible, signals.scan_rsi[:, candle], np.inf)))
+
+    def run(self, history: PriceHistory, config: BacktestConfig) -> BacktestResult:
+        started = time.perf_counter()
+        closes = np.asarray(history.closes, dtype=np.float64)
+        symbols, candles = closes.shape
+        assets = history.assets
+        parameters = config.parameters
+        if config.initial_asset not in assets:
+            raise ValueError(f"Initial asset {config.initial_asset} is not in the price history")
+
+        signals = self.get_signals(history, config)
+        start = self.get_warmup(history, config)
+        current = assets.index(config.initial_asset)
+        while start < candles and not np.isfinite(closes[current, start]):
+            start += 1
+        trades: List[BacktestTrade] = []
+        # (first candle, symbol index or None for cash, quantity) per holding period
+        holdings = []
+        t = start
+        if t < candles:
+            entry_price = closes[current, t]
+            quantity = config.initial_value / entry_price
+            holdings.append((t, current, quantity))
+        while t < candles:
+            sell_at = self._find_next_sell(
+                parameters,
+                closes[current],
+                entry_price,
+                signals.short_trend[current],
+                signals.short_trade[current],
+                signals.long_trend[current],
+                signals.long_trade[current],
+                t,
+            )
+            if sell_at is None:
+                break
+            t = sell_at
+            price = closes[current, t]
+            holding_value = quantity * price
+            profit = holding_value - entry_price * quantity
+            best = self.get_best_symbol(signals, t)
+            if best is None:
+                # Stop loss: move to cash, which ends the run like `main()` does
+                cash = holding_value * (1 - config.fee_rate)
+                trades.append(BacktestTrade(
+                    timestamp=int(history.timestamps[t]),
+                    origin=assets[current],
+                    target=CASH_ASSET,
+                    quantity=cash,
+                    price=1.0,
+                    usd_amount=holding_value,
+                    profit=profit,
+                ))
+                holdings.append((t, None, cash))
+                current = None
+                break
+            if best != current:
+                entry_price = closes[best, t]
+                quantity = holding_value * (1 - config.fee_rate) / entry_price
+                trades.append(BacktestTrade(
+                    timestamp=int(history.timestamps[t]),
+                    origin=assets[current],
+                    target=assets[best],
+                    quantity=quantity,
+                    price=entry_price,
+                    usd_amount=holding_value,
+                    profit=profit,
+                ))
+                current = best
+                holdings.append((t, current, quantity))
+            t += 1
+
+        equity_curve = self._build_equity_curve(closes, holdings, start, candles)
+        return BacktestResult(
+            config=config,
+            trades=trades,
+            timestamps=history.timestamps[start:],
+            equity_curve=equity_curve,
+            final_asset=assets[current] if current is not None else CASH_ASSET,
+            candles_processed=symbols * candles,
+            elapsed=time.perf_counter() - started,
+        )
+
+    def _find_next_sell(
+        self,
+        parameters: StrategyParameters,
+        close: np.ndarray,
+        entry_price: float,
+        short_trend: np.ndarray,
+        short_trade: np.ndarray,
+        long_trend: np.ndarray,
+        long_trade: np.ndarray,
+        start: int,
+    ) -> Optional[int]:
+        """First candle from `start` where both timeframes decide to sell"""
+        chunk = SEARCH_CHUNK
+        while start < close.shape[0]:
+            end = min(start + chunk, close.shape[0])
+            change = (close[start:end] - entry_price) / entry_price * 100
+            sell = (
+                self.get_sell_mask(change, short_trend[start:end], short_trade[start:end], parameters)
+                & self.get_sell_mask(change, long_trend[start:end], long_trade[start:end], parameters)
+            )
+            hits = np.flatnonzero(sell)
+            if hits.size:
+                return start + int(hits[0])
+            start = end
+            chunk *= 2
+        return None
+
+    def _build_equity_curve(self, closes: np.ndarray, holdings: list, start: int, candles: int) -> np.ndarray:
+        equity_curve = np.empty(max(candles - start, 0))
+        for i, (first, symbol, quantity) in enumerate(holdings):
+            last = holdings[i + 1][0] if i + 1 < len(holdings) else candles
+            # The trade happens at the close of `first`, so the new holding
+            # is valued from that candle onwards
+            segment = slice(first - start, last - start)
+            if symbol is None:
+                equity_curve[segment] = quantity
+            else:
+                equity_curve[segment] = quantity * closes[symbol, first:last]
+        return equity_curve
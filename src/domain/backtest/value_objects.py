@@ -0,0 +1,164 @@
+# Python imports
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import List
+import numpy as np
+
+# App imports
+from src.domain.calculator.value_objects import StrategyParameters
+
+CASH_ASSET = 'USDT'
+FIVE_MINUTES_MS = 5 * 60_000
+ONE_HOUR_MS = 60 * 60_000
+
+
+@dataclass
+class PriceHistory:
+    """5m close prices for several symbols on a shared candle grid"""
+
+    symbols: List[str]
+    # Candle open times in ms, one entry per column of `closes`
+    timestamps: np.ndarray
+    # (symbols x candles) close prices, NaN where a symbol has no data yet
+    closes: np.ndarray
+
+    @property
+    def assets(self) -> List[str]:
+        return [symbol[:-len(CASH_ASSET)] for symbol in self.symbols]
+
+    @property
+    def candles(self) -> int:
+        return int(self.closes.shape[1])
+
+    def as_dict(self):
+        return {
+            'symbols': self.symbols,
+            'candles': self.candles,
+            'start': int(self.timestamps[0]) if self.candles else None,
+            'end': int(self.timestamps[-1]) if self.candles else None,
+        }
+
+
+@dataclass
+class BacktestConfig:
+    initial_asset: str
+    initial_value: float = 1000.0
+    fee_rate: float = 0.001
+    short_term_lookback: int = 288
+    long_term_lookback: int = 168
+    scan_lookback: int = 200
+    parameters: StrategyParameters = field(default_factory=StrategyParameters)
+
+    def as_dict(self):
+        return {
+            'parameters': self.parameters.as_dict(),
+            'initial_asset': self.initial_asset,
+            'initial_value': self.initial_value,
+            'fee_rate': self.fee_rate,
+            'short_term_lookback': self.short_term_lookback,
+            'long_term_lookback': self.long_term_lookback,
+            'scan_lookback': self.scan_lookback,
+        }
+
+
+@dataclass
+class BacktestTrade:
+    timestamp: int
+    origin: str
+    target: str
+    quantity: float
+    price: float
+    usd_amount: float
+    profit: float
+
+    def as_dict(self):
+        return {
+            'timestamp': self.timestamp,
+            'origin': self.origin,
+            'target': self.target,
+            'quantity': self.quantity,
+            'price': self.price,
+            'usd_amount': self.usd_amount,
+            'profit': self.profit,
+        }
+
+
+@dataclass
+class BacktestSignals:
+    """Signal codes of every symbol at every candle, as (symbols x candles) arrays"""
+
+    short_trend: np.ndarray
+    short_trade: np.ndarray
+    long_trend: np.ndarray
+    long_trade: np.ndarray
+    # RSI over the market scan window, and whether the scan would consider the symbol
+    scan_rsi: np.ndarray
+    scan_eligible: np.ndarray
+
+
+@dataclass
+class BacktestResult:
+    config: BacktestConfig
+    trades: List[BacktestTrade]
+    timestamps: np.ndarray
+    # USD value of the holdings at every candle close
+    equity_curve: np.ndarray
+    final_asset: str
+    candles_processed: int
+    elapsed: float
+
+    @property
+    def initial_value(self) -> float:
+        return self.config.initial_value
+
+    @property
+    def final_value(self) -> float:
+        return float(self.equity_curve[-1]) if len(self.equity_curve) else self.initial_value
+
+    @property
+    def pnl(self) -> float:
+        return self.final_value - self.initial_value
+
+    @property
+    def pnl_pct(self) -> float:
+        return self.pnl / self.initial_value * 100
+
+    @property
+    def max_drawdown_pct(self) -> float:
+        if not len(self.equity_curve):
+            return 0.0
+        peaks = np.maximum.accumulate(self.equity_curve)
+        return float(((peaks - self.equity_curve) / peaks).max() * 100)
+
+    @property
+    def candles_per_second(self) -> float:
+        return self.candles_processed / self.elapsed if self.elapsed else float('inf')
+
+    def as_dict(self):
+        return {
+            'config': self.config.as_dict(),
+            'trades': len(self.trades),
+            'final_asset': self.final_asset,
+            'initial_value': self.initial_value,
+            'final_value': self.final_value,
+            'pnl': self.pnl,
+            'pnl_pct': self.pnl_pct,
+            'max_drawdown_pct': self.max_drawdown_pct,
+            'candles_processed': self.candles_processed,
+            'elapsed': self.elapsed,
+            'candles_per_second': self.candles_per_second,
+        }
+
+
+@dataclass
+class SweepResult:
+    parameters: StrategyParameters
+    summary: dict
+
+    def as_dict(self):
+        return {
+            'parameters': self.parameters.as_dict(),
+            **self.summary,
+        }
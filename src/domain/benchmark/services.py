@@ -0,0 +1,94 @@
+# Python imports
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import (
+    Callable,
+    List,
+    Optional,
+)
+
+# Local imports
+from .value_objects import (
+    BenchmarkComparison,
+    BenchmarkReport,
+    BenchmarkResult,
+)
+
+
+class BenchmarkDomainServices:
+
+    def measure(
+        self,
+        name: str,
+        run: Callable[[], object],
+        repeat: int = 20,
+        warmup: int = 2,
+        ops: int = 1,
+        params: Optional[dict] = None,
+        setup: Optional[Callable[[], object]] = None,
+    ) -> BenchmarkResult:
+        """Time `run` over several calls, then trace one more call for its peak memory.
+
+        `setup` runs untimed before every call. Timed calls run with the garbage
+        collector paused so a collection does not land on a random sample.
+        """
+        for _ in range(warmup):
+            if setup is not None:
+                setup()
+            run()
+        timings = []
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            gc.collect()
+            gc.disable()
+            try:
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            finally:
+                gc.enable()
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            run()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        timings.sort()
+        return BenchmarkResult(
+            name=name,
+            params=params or {},
+            repeat=repeat,
+            ops=ops,
+            mean=statistics.fmean(timings),
+            median=statistics.median(timings),
+            p95=timings[min(len(timings) - 1, int(0.95 * len(timings)))],
+            min=timings[0],
+            stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            peak_memory=peak_memory,
+        )
+
+    def compare(
+        self,
+        base: BenchmarkReport,
+        head: BenchmarkReport,
+        threshold: float = 0.1,
+    ) -> List[BenchmarkComparison]:
+        """Pair the cases present in both reports by key"""
+        base_results = {result.key: result for result in base.results}
+        return [
+            BenchmarkComparison(
+                key=result.key,
+                base_median=base_results[result.key].median,
+                head_median=result.median,
+                base_peak_memory=base_results[result.key].peak_memory,
+                head_peak_memory=result.peak_memory,
+                threshold=threshold,
+            )
+            for result in head.results
+            if result.key in base_results
+        ]
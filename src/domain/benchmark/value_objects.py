@@ -0,0 +1,123 @@
+# Python imports
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import List
+
+# Bumped whenever the report layout changes, so old reports are not compared blindly
+REPORT_VERSION = 1
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one benchmark case; latencies are in seconds per call"""
+
+    name: str
+    params: dict
+    repeat: int
+    # Units of work per call (symbols for a market scan, 1 otherwise)
+    ops: int
+    mean: float
+    median: float
+    p95: float
+    min: float
+    stdev: float
+    # Peak traced Python allocation during one call, in bytes
+    peak_memory: int
+
+    @property
+    def key(self) -> str:
+        """Identity used to match the case across reports"""
+        params = ','.join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]" if params else self.name
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.ops / self.median if self.median else float('inf')
+
+    def as_dict(self):
+        return {
+            'key': self.key,
+            'name': self.name,
+            'params': self.params,
+            'repeat': self.repeat,
+            'ops': self.ops,
+            'mean': self.mean,
+            'median': self.median,
+            'p95': self.p95,
+            'min': self.min,
+            'stdev': self.stdev,
+            'ops_per_second': self.ops_per_second,
+            'peak_memory': self.peak_memory,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BenchmarkResult':
+        return cls(
+            name=data['name'],
+            params=data['params'],
+            repeat=data['repeat'],
+            ops=data['ops'],
+            mean=data['mean'],
+            median=data['median'],
+            p95=data['p95'],
+            min=data['min'],
+            stdev=data['stdev'],
+            peak_memory=data['peak_memory'],
+        )
+
+
+@dataclass
+class BenchmarkReport:
+    results: List[BenchmarkResult]
+    # Interpreter, library versions and commit the report was produced with
+    environment: dict = field(default_factory=dict)
+    version: int = REPORT_VERSION
+
+    def as_dict(self):
+        return {
+            'version': self.version,
+            'environment': self.environment,
+            'results': [result.as_dict() for result in self.results],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BenchmarkReport':
+        if data.get('version') != REPORT_VERSION:
+            raise ValueError(f"Unsupported benchmark report version: {data.get('version')}")
+        return cls(
+            results=[BenchmarkResult.from_dict(result) for result in data['results']],
+            environment=data.get('environment', {}),
+            version=data['version'],
+        )
+
+
+@dataclass
+class BenchmarkComparison:
+    key: str
+    base_median: float
+    head_median: float
+    base_peak_memory: int
+    head_peak_memory: int
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        """Head latency relative to base; above 1 is slower"""
+        return self.head_median / self.base_median if self.base_median else float('inf')
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio > 1 + self.threshold
+
+    def as_dict(self):
+        return {
+            'key': self.key,
+            'base_median': self.base_median,
+            'head_median': self.head_median,
+            'ratio': self.ratio,
+            'base_peak_memory': self.base_peak_memory,
+            'head_peak_memory': self.head_peak_memory,
+            'regressed': self.regressed,
+        }
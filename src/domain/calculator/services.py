@@ -1,9 +1,10 @@
 # Python imports
-import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.trend import EMAIndicator
-from ta.volatility import BollingerBands
-from typing import Optional
+import numpy as np
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Union,
+)
 
 # App imports
 from src.domain.trading.value_objects import (
@@ -13,24 +14,52 @@ from src.domain.trading.value_objects import (
 
 # App imports
 from .value_objects import (
+    BatchCalculatorIndicators,
     BollingerBandsCalculatorIndicators,
     ConservativeCalculatorIndicators,
+    LatestBollingerBandsIndicators,
+    LatestTrendIndicators,
+    StrategyParameters,
     SELL_SIGNAL,
     BUY_SIGNAL,
     HOLD_SIGNAL,
 )
+from .streaming import (
+    StreamingIndicatorEngine,
+    StreamingIndicators,
+)
+from .vectorized import (
+    latest_bollinger_bands,
+    latest_ema,
+    latest_rsi,
+)
+
+# pandas and `ta` are only loaded when full indicator series are requested
+if TYPE_CHECKING:
+    import pandas as pd
+
+TrendIndicators = Union[LatestTrendIndicators, ConservativeCalculatorIndicators]
+BollingerBandsIndicators = Union[LatestBollingerBandsIndicators, BollingerBandsCalculatorIndicators]
 
 class IndicatorCalculatorDomainServices:
 
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        parameters: Optional[StrategyParameters] = None,
+        tail: int = 0,
+        streaming_indicators: Optional[StreamingIndicatorEngine] = None,
+    ):
+        self.parameters = parameters or StrategyParameters()
+        # Recent indicator values kept next to the latest one; 0 keeps only the latest
+        self.tail = tail
+        self.streaming_indicators = streaming_indicators
 
     def evaluate_trading_decision(
         self,
         entry_price: float,
-        close_prices: pd.Series,
-        trend_indicators: ConservativeCalculatorIndicators,
-        trade_indicators: BollingerBandsCalculatorIndicators,
+        close_prices: 'pd.Series',
+        trend_indicators: TrendIndicators,
+        trade_indicators: BollingerBandsIndicators,
     ) -> str:
         trend_signal = self.get_trend_signal(
             close_price=close_prices.iloc[-1],
@@ -42,11 +71,13 @@ class IndicatorCalculatorDomainServices:
         )
         current_price = close_prices.iloc[-1]
         change  = ((current_price - entry_price) / entry_price) * 100
-        # If entry price is 3% lower than the current price, take profit
-        if change > 3:
+        take_profit = self.parameters.take_profit_pct
+        stop_loss = -self.parameters.stop_loss_pct
+        # If the price rose above the take-profit band (3% by default), take profit
+        if change > take_profit:
             return SELL_SIGNAL
-        # If entry price is 1% higher than the current price, evaluate stop loss
-        elif change < -1:
+        # If the price fell below the stop-loss band (1% by default), evaluate stop loss
+        elif change < stop_loss:
             # if trend signal is sell and trade signal is sell, stop loss
             if trend_signal == SELL_SIGNAL and trade_signal == SELL_SIGNAL:
                 return SELL_SIGNAL
@@ -58,8 +89,8 @@ class IndicatorCalculatorDomainServices:
                 return SELL_SIGNAL
             else:
                 return SELL_SIGNAL
-        # If the price is within 3% of the entry price, evaluate holding
-        elif -1 <= change <= 3:
+        # If the price is within both bands, evaluate holding
+        elif stop_loss <= change <= take_profit:
             # if trend signal is buy and trade signal is buy, hold
             if trend_signal == BUY_SIGNAL and trade_signal == BUY_SIGNAL:
                 return HOLD_SIGNAL
@@ -72,31 +103,137 @@ class IndicatorCalculatorDomainServices:
             else:
                 return HOLD_SIGNAL
 
-    def apply_trend_indicators(self, close_prices: pd.Series) -> ConservativeCalculatorIndicators:
-        return ConservativeCalculatorIndicators(
-            rsi=RSIIndicator(close=close_prices, window=14).rsi(),
-            ema=EMAIndicator(close=close_prices, window=200).ema_indicator(),
+    @property
+    def indicator_windows(self) -> tuple:
+        """Parameters the indicator values depend on; thresholds only affect the signals"""
+        return (
+            self.parameters.rsi_window,
+            self.parameters.ema_window,
+            self.parameters.bb_window,
+            self.parameters.bb_window_dev,
+            self.tail,
+        )
+
+    def apply_trend_indicators(self, close_prices: 'pd.Series', series: bool = False) -> TrendIndicators:
+        """Latest RSI and EMA; the full series are only built when `series` is set or a tail is kept"""
+        if series or self.tail:
+            import pandas as pd
+            from ta.momentum import RSIIndicator
+            from ta.trend import EMAIndicator
+            indicators = ConservativeCalculatorIndicators(
+                rsi=RSIIndicator(close=pd.Series(close_prices), window=self.parameters.rsi_window).rsi(),
+                ema=EMAIndicator(close=pd.Series(close_prices), window=self.parameters.ema_window).ema_indicator(),
+            )
+            return indicators if series else indicators.latest(self.tail)
+        close_matrix = self._close_row(close_prices)
+        return LatestTrendIndicators(
+            rsi=float(latest_rsi(close_matrix, window=self.parameters.rsi_window)[0]),
+            ema=float(latest_ema(close_matrix, window=self.parameters.ema_window)[0]),
+        )
+
+    def apply_bollinger_bands_indicators(self, close_prices: 'pd.Series', series: bool = False) -> BollingerBandsIndicators:
+        """Latest Bollinger Bands; the full series are only built when `series` is set or a tail is kept"""
+        if series or self.tail:
+            import pandas as pd
+            from ta.volatility import BollingerBands
+            bb = BollingerBands(
+                close=pd.Series(close_prices),
+                window=self.parameters.bb_window,
+                window_dev=self.parameters.bb_window_dev,
+            )
+            indicators = BollingerBandsCalculatorIndicators(
+                upper=bb.bollinger_hband(),
+                lower=bb.bollinger_lband(),
+                mavg=bb.bollinger_mavg(),
+            )
+            return indicators if series else indicators.latest(self.tail)
+        upper, lower, mavg = latest_bollinger_bands(
+            self._close_row(close_prices),
+            window=self.parameters.bb_window,
+            window_dev=self.parameters.bb_window_dev,
+        )
+        return LatestBollingerBandsIndicators(
+            upper=float(upper[0]),
+            lower=float(lower[0]),
+            mavg=float(mavg[0]),
+        )
+
+    def apply_streaming_indicators(
+        self,
+        symbol: str,
+        interval: str,
+        open_times: np.ndarray,
+        close_prices: 'pd.Series',
+    ) -> Optional[StreamingIndicators]:
+        """Latest trend and Bollinger Bands indicators of a window from the streaming engine.
+
+        None when there is no engine for this strategy, a tail is kept, or the
+        engine does not hold the window; the caller then computes it in full.
+        """
+        engine = self.streaming_indicators
+        if engine is None or self.tail or not len(open_times) or not engine.supports(self.parameters):
+            return None
+        return engine.latest(
+            symbol,
+            interval,
+            lookback=len(open_times),
+            first_open_time=int(open_times[0]),
+            last_open_time=int(open_times[-1]),
+            last_close=float(np.asarray(close_prices)[-1]),
+        )
+
+    @staticmethod
+    def _close_row(close_prices: 'pd.Series') -> np.ndarray:
+        return np.asarray(close_prices, dtype=np.float64).reshape(1, -1)
+
+    def apply_batch_indicators(self, close_matrix: np.ndarray) -> BatchCalculatorIndicators:
+        """Latest RSI, EMA and Bollinger Bands for every row of a (symbols x candles) matrix"""
+        close_matrix = np.asarray(close_matrix, dtype=np.float64)
+        upper, lower, mavg = latest_bollinger_bands(
+            close_matrix,
+            window=self.parameters.bb_window,
+            window_dev=self.parameters.bb_window_dev,
+        )
+        return BatchCalculatorIndicators(
+            close=close_matrix[:, -1],
+            rsi=latest_rsi(close_matrix, window=self.parameters.rsi_window),
+            ema=latest_ema(close_matrix, window=self.parameters.ema_window),
+            upper=upper,
+            lower=lower,
+            mavg=mavg,
+        )
+
+    def get_batch_trend_signals(self, indicators: BatchCalculatorIndicators) -> np.ndarray:
+        """Vectorized `get_trend_signal` over every row of a batch"""
+        return np.select(
+            [
+                (indicators.rsi < self.parameters.rsi_buy_threshold) & (indicators.close > indicators.ema),
+                (indicators.rsi > self.parameters.rsi_sell_threshold) & (indicators.close < indicators.ema),
+            ],
+            [BUY_SIGNAL, SELL_SIGNAL],
+            default=HOLD_SIGNAL,
         )
 
-    def apply_bollinger_bands_indicators(self, close_prices: pd.Series) -> BollingerBandsCalculatorIndicators:
-        bb = BollingerBands(close=close_prices, window=20, window_dev=1.5)
-        indicators = BollingerBandsCalculatorIndicators(
-            upper=bb.bollinger_hband(),
-            lower=bb.bollinger_lband(),
-            mavg=bb.bollinger_mavg(),
+    def get_batch_bollinger_bands_signals(self, indicators: BatchCalculatorIndicators) -> np.ndarray:
+        """Vectorized `get_bollinger_bands_signals` over every row of a batch"""
+        return np.select(
+            [
+                indicators.close < indicators.lower,
+                indicators.close > indicators.upper,
+            ],
+            [BUY_SIGNAL, SELL_SIGNAL],
+            default=HOLD_SIGNAL,
         )
-        return indicators
 
     def get_trend_signal(
         self,
         close_price: float,
-        indicators: ConservativeCalculatorIndicators,
+        indicators: TrendIndicators,
     ) -> str:
-        latest_rsi = indicators.rsi.iloc[-1]
-        latest_ema = indicators.ema.iloc[-1]
-        if latest_rsi < 40 and close_price > latest_ema:
+        latest = indicators.latest()
+        if latest.rsi < self.parameters.rsi_buy_threshold and close_price > latest.ema:
             return BUY_SIGNAL
-        elif latest_rsi > 70 and close_price < latest_ema:
+        elif latest.rsi > self.parameters.rsi_sell_threshold and close_price < latest.ema:
             return SELL_SIGNAL
         else:
             return HOLD_SIGNAL
@@ -104,13 +241,12 @@ class IndicatorCalculatorDomainServices:
     def get_bollinger_bands_signals(
         self,
         close_price: float,
-        indicators: BollingerBandsCalculatorIndicators,
+        indicators: BollingerBandsIndicators,
     ) -> str:
-        latest_upper = indicators.upper.iloc[-1]
-        latest_lower = indicators.lower.iloc[-1]
-        if close_price < latest_lower:
+        latest = indicators.latest()
+        if close_price < latest.lower:
             return BUY_SIGNAL
-        elif close_price > latest_upper:
+        elif close_price > latest.upper:
             return SELL_SIGNAL
         else:
             return HOLD_SIGNAL
@@ -120,10 +256,10 @@ class IndicatorCalculatorDomainServices:
         market_analysis: MarketAnalysis,
     ) -> MarketAnalysis:
         for market in market_analysis.markets:
-            trend_indicators = self.apply_trend_indicators(pd.Series(market.price))
+            trend_indicators = self.apply_trend_indicators([market.price])
             trend_signal = self.get_trend_signal(market.price, trend_indicators)
             market.trend_signal = trend_signal
-            trade_indicators = self.apply_bollinger_bands_indicators(pd.Series(market.price))
+            trade_indicators = self.apply_bollinger_bands_indicators([market.price])
             trade_signal = self.get_bollinger_bands_signals(market.price, trade_indicators)
             market.trade_signal = trade_signal
         return market_analysis
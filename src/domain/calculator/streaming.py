@@ -0,0 +1,242 @@
+# Python imports
+import math
+import threading
+import numpy as np
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+# App imports
+from .value_objects import (
+    LatestBollingerBandsIndicators,
+    LatestTrendIndicators,
+    StrategyParameters,
+)
+
+StreamingIndicators = Tuple[LatestTrendIndicators, LatestBollingerBandsIndicators]
+
+
+class IndicatorHistory:
+    """Closed candles of one (symbol, interval) with the running state of their indicators.
+
+    The newest `capacity` candles sit in ring buffers next to the EMA and the
+    Wilder gain and loss averages run over every candle since the history was
+    reset. A trailing window of L candles re-seeds those averages at its first
+    candle, which `windowed_ewm` turns into
+    e = s[t] - (1 - a)^(L-1) * (s[t-L+1] - seed[t-L+1]),
+    and the Bollinger Bands keep running sums over their last `bb_window`
+    closes, so reading any window up to `capacity` candles or appending a
+    candle costs a few float operations.
+    """
+
+    def __init__(self, parameters: StrategyParameters, capacity: int):
+        self.parameters = parameters
+        self.capacity = max(capacity, parameters.bb_window + 1)
+        self.ema_alpha = 2 / (parameters.ema_window + 1)
+        self.rsi_alpha = 1 / parameters.rsi_window
+        self.open_time = np.zeros(self.capacity, dtype=np.int64)
+        self.close = np.zeros(self.capacity)
+        self.ema = np.zeros(self.capacity)
+        self.gain = np.zeros(self.capacity)
+        self.loss = np.zeros(self.capacity)
+        self.count = 0
+        # Sums of (close - reference) and its square over the last `bb_window` closes;
+        # the shift avoids cancellation when the variance is small next to the price
+        self.reference = 0.0
+        self.shifted_sum = 0.0
+        self.shifted_sum_sq = 0.0
+        self.updates_since_resync = 0
+
+    @property
+    def stored(self) -> int:
+        return min(self.count, self.capacity)
+
+    def _index(self, back: int) -> int:
+        """Ring position of the candle `back` places from the newest (1 is the newest)"""
+        return (self.count - back) % self.capacity
+
+    def last_open_time(self) -> Optional[int]:
+        return int(self.open_time[self._index(1)]) if self.count else None
+
+    def _next(self, close: float) -> Tuple[float, float, float]:
+        """EMA, average gain and average loss once `close` is appended"""
+        if not self.count:
+            # `ta` counts the undefined first change as zero
+            return close, 0.0, 0.0
+        last = self._index(1)
+        change = close - self.close[last]
+        return (
+            self.ema[last] + self.ema_alpha * (close - self.ema[last]),
+            self.gain[last] + self.rsi_alpha * (max(change, 0.0) - self.gain[last]),
+            self.loss[last] + self.rsi_alpha * (max(-change, 0.0) - self.loss[last]),
+        )
+
+    def append(self, open_time: int, close: float):
+        ema, gain, loss = self._next(close)
+        window = self.parameters.bb_window
+        position = self.count % self.capacity
+        self.open_time[position] = open_time
+        self.close[position] = close
+        self.ema[position] = ema
+        self.gain[position] = gain
+        self.loss[position] = loss
+        self.count += 1
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= window or self.count <= 1:
+            self._resync()
+            return
+        self.shifted_sum += close - self.reference
+        self.shifted_sum_sq += (close - self.reference) ** 2
+        if self.count > window:
+            dropped = self.close[self._index(window + 1)] - self.reference
+            self.shifted_sum -= dropped
+            self.shifted_sum_sq -= dropped ** 2
+
+    def _resync(self):
+        """Rebuild the band sums from the stored closes, which bounds their rounding drift"""
+        closes = self.closes(min(self.count, self.parameters.bb_window))
+        self.reference = float(closes[-1])
+        shifted = closes - self.reference
+        self.shifted_sum = float(shifted.sum())
+        self.shifted_sum_sq = float((shifted ** 2).sum())
+        self.updates_since_resync = 0
+
+    def closes(self, count: int) -> np.ndarray:
+        """The newest `count` closes, oldest first"""
+        return self.close[[self._index(back) for back in range(count, 0, -1)]]
+
+    def window(
+        self,
+        lookback: int,
+        first_open_time: int,
+        last_open_time: int,
+        last_close: float,
+    ) -> Optional[StreamingIndicators]:
+        """Indicators over a window of `lookback` candles, or None when the history does not hold it.
+
+        A window ending at the newest stored candle is read as is; one ending
+        a candle later, typically the still-open one, has `last_close`
+        appended without changing the history.
+        """
+        newest = self.last_open_time()
+        if newest is None or last_open_time < newest:
+            return None
+        preview = last_open_time > newest
+        closed = lookback - 1 if preview else lookback
+        if closed < 1 or closed > self.stored or int(self.open_time[self._index(closed)]) != first_open_time:
+            return None
+        if preview:
+            ema, gain, loss = self._next(last_close)
+        else:
+            last = self._index(1)
+            ema, gain, loss = self.ema[last], self.gain[last], self.loss[last]
+        first = self._index(closed)
+        ema -= (1 - self.ema_alpha) ** (lookback - 1) * (self.ema[first] - self.close[first])
+        decay = (1 - self.rsi_alpha) ** (lookback - 1)
+        gain = gain - decay * self.gain[first]
+        loss = max(loss - decay * self.loss[first], 0.0)
+        if lookback < self.parameters.rsi_window:
+            rsi = math.nan
+        elif loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + gain / loss))
+        return (
+            LatestTrendIndicators(
+                rsi=float(rsi),
+                ema=float(ema) if lookback >= self.parameters.ema_window else math.nan,
+            ),
+            self._bands(lookback, preview, last_close),
+        )
+
+    def _bands(self, lookback: int, preview: bool, last_close: float) -> LatestBollingerBandsIndicators:
+        window = self.parameters.bb_window
+        if lookback < window:
+            return LatestBollingerBandsIndicators(upper=math.nan, lower=math.nan, mavg=math.nan)
+        shifted_sum, shifted_sum_sq = self.shifted_sum, self.shifted_sum_sq
+        if preview:
+            added = last_close - self.reference
+            shifted_sum += added
+            shifted_sum_sq += added ** 2
+            if self.count >= window:
+                dropped = self.close[self._index(window)] - self.reference
+                shifted_sum -= dropped
+                shifted_sum_sq -= dropped ** 2
+        mean = shifted_sum / window
+        deviation = self.parameters.bb_window_dev * math.sqrt(max(shifted_sum_sq / window - mean ** 2, 0.0))
+        mavg = self.reference + mean
+        return LatestBollingerBandsIndicators(upper=mavg + deviation, lower=mavg - deviation, mavg=mavg)
+
+
+class StreamingIndicatorEngine:
+    """Incremental RSI, EMA and Bollinger Bands per (symbol, interval) for one strategy.
+
+    Fed with closed candles as they are cached; each new candle is a
+    constant-time update, and the latest values of any trailing window the
+    history holds are read in constant time. The values match the kernels
+    in `vectorized.py` over the same window, up to float rounding.
+    """
+
+    def __init__(self, parameters: Optional[StrategyParameters] = None, capacity: int = 1000):
+        self.parameters = parameters or StrategyParameters()
+        self.capacity = capacity
+        self._histories: Dict[Tuple[str, str], IndicatorHistory] = {}
+        self._lock = threading.Lock()
+
+    def supports(self, parameters: StrategyParameters) -> bool:
+        """Whether the engine computes the indicators of a strategy"""
+        return (
+            parameters.rsi_window == self.parameters.rsi_window
+            and parameters.ema_window == self.parameters.ema_window
+            and parameters.bb_window == self.parameters.bb_window
+            and parameters.bb_window_dev == self.parameters.bb_window_dev
+        )
+
+    def reset(self, symbol: str, interval: str, candles: Iterable[Tuple[int, float]]):
+        """Rebuild the history of a key from (open time, close) pairs, oldest first"""
+        history = IndicatorHistory(self.parameters, self.capacity)
+        for open_time, close in candles:
+            history.append(open_time, close)
+        with self._lock:
+            self._histories[(symbol, interval)] = history
+
+    def extend(self, symbol: str, interval: str, candles: Iterable[Tuple[int, float]]):
+        """Append (open time, close) pairs newer than the newest candle of the key"""
+        with self._lock:
+            history = self._histories.setdefault(
+                (symbol, interval),
+                IndicatorHistory(self.parameters, self.capacity),
+            )
+            for open_time, close in candles:
+                newest = history.last_open_time()
+                if newest is None or open_time > newest:
+                    history.append(open_time, close)
+
+    def latest(
+        self,
+        symbol: str,
+        interval: str,
+        lookback: int,
+        first_open_time: int,
+        last_open_time: int,
+        last_close: float,
+    ) -> Optional[StreamingIndicators]:
+        """(trend, Bollinger Bands) indicators of the window spanning the given open times, if held"""
+        with self._lock:
+            history = self._histories.get((symbol, interval))
+            if history is None:
+                return None
+            return history.window(lookback, first_open_time, last_open_time, last_close)
+
+    def retain(self, symbols: Iterable[str]):
+        keep = set(symbols)
+        with self._lock:
+            for key in [key for key in self._histories if key[0] not in keep]:
+                del self._histories[key]
+
+    def clear(self):
+        with self._lock:
+            self._histories.clear()
@@ -1,16 +1,62 @@
 # Python imports
 from dataclasses import dataclass
-import pandas as pd
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+)
+
+# NumPy and pandas only appear in annotations; importing them here would make
+# every module reading the strategy parameters pay for them
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 SELL_SIGNAL = 'sell'
 BUY_SIGNAL = 'buy'
 HOLD_SIGNAL = 'hold'
 
+@dataclass(frozen=True)
+class StrategyParameters:
+    """Thresholds and indicator windows used by the trading rules"""
+
+    take_profit_pct: float = 3.0
+    stop_loss_pct: float = 1.0
+    rsi_buy_threshold: float = 40.0
+    rsi_sell_threshold: float = 70.0
+    rsi_window: int = 14
+    ema_window: int = 200
+    bb_window: int = 20
+    bb_window_dev: float = 1.5
+
+    def as_dict(self):
+        return {
+            'take_profit_pct': self.take_profit_pct,
+            'stop_loss_pct': self.stop_loss_pct,
+            'rsi_buy_threshold': self.rsi_buy_threshold,
+            'rsi_sell_threshold': self.rsi_sell_threshold,
+            'rsi_window': self.rsi_window,
+            'ema_window': self.ema_window,
+            'bb_window': self.bb_window,
+            'bb_window_dev': self.bb_window_dev
+        }
+
+def _tail(series: 'pd.Series', tail: int) -> Optional['np.ndarray']:
+    return series.to_numpy(dtype='float64')[-tail:].copy() if tail else None
+
 @dataclass
 class ConservativeCalculatorIndicators:
+    """Full RSI and EMA series, one value per candle"""
 
-    rsi: pd.Series
-    ema: pd.Series
+    rsi: 'pd.Series'
+    ema: 'pd.Series'
+
+    def latest(self, tail: int = 0) -> 'LatestTrendIndicators':
+        return LatestTrendIndicators(
+            rsi=float(self.rsi.iloc[-1]),
+            ema=float(self.ema.iloc[-1]),
+            rsi_tail=_tail(self.rsi, tail),
+            ema_tail=_tail(self.ema, tail),
+        )
 
     def as_dict(self):
         return {
@@ -20,13 +66,89 @@ class ConservativeCalculatorIndicators:
 
 @dataclass
 class BollingerBandsCalculatorIndicators:
+    """Full Bollinger Bands series, one value per candle"""
+
+    upper: 'pd.Series'
+    lower: 'pd.Series'
+    mavg: 'pd.Series'
+
+    def latest(self, tail: int = 0) -> 'LatestBollingerBandsIndicators':
+        return LatestBollingerBandsIndicators(
+            upper=float(self.upper.iloc[-1]),
+            lower=float(self.lower.iloc[-1]),
+            mavg=float(self.mavg.iloc[-1]),
+            upper_tail=_tail(self.upper, tail),
+            lower_tail=_tail(self.lower, tail),
+            mavg_tail=_tail(self.mavg, tail),
+        )
+
+    def as_dict(self):
+        return {
+            'upper': self.upper,
+            'lower': self.lower,
+            'mavg': self.mavg
+        }
+
+@dataclass(frozen=True, slots=True)
+class LatestTrendIndicators:
+    """Latest RSI and EMA, optionally with the last few values (oldest first)"""
 
-    upper: pd.Series
-    lower: pd.Series
-    mavg: pd.Series
+    rsi: float
+    ema: float
+    rsi_tail: Optional['np.ndarray'] = None
+    ema_tail: Optional['np.ndarray'] = None
+
+    def latest(self, tail: int = 0) -> 'LatestTrendIndicators':
+        return self
+
+    def as_dict(self):
+        return {
+            'rsi': self.rsi,
+            'ema': self.ema,
+            'rsi_tail': self.rsi_tail,
+            'ema_tail': self.ema_tail
+        }
+
+@dataclass(frozen=True, slots=True)
+class LatestBollingerBandsIndicators:
+    """Latest Bollinger Bands, optionally with the last few values (oldest first)"""
+
+    upper: float
+    lower: float
+    mavg: float
+    upper_tail: Optional['np.ndarray'] = None
+    lower_tail: Optional['np.ndarray'] = None
+    mavg_tail: Optional['np.ndarray'] = None
+
+    def latest(self, tail: int = 0) -> 'LatestBollingerBandsIndicators':
+        return self
 
     def as_dict(self):
         return {
+            'upper': self.upper,
+            'lower': self.lower,
+            'mavg': self.mavg,
+            'upper_tail': self.upper_tail,
+            'lower_tail': self.lower_tail,
+            'mavg_tail': self.mavg_tail
+        }
+
+@dataclass
+class BatchCalculatorIndicators:
+    """Latest indicator values for many symbols, one array element per row"""
+
+    close: 'np.ndarray'
+    rsi: 'np.ndarray'
+    ema: 'np.ndarray'
+    upper: 'np.ndarray'
+    lower: 'np.ndarray'
+    mavg: 'np.ndarray'
+
+    def as_dict(self):
+        return {
+            'close': self.close,
+            'rsi': self.rsi,
+            'ema': self.ema,
             'upper': self.upper,
             'lower': self.lower,
             'mavg': self.mavg
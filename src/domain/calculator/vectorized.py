@@ -0,0 +1,119 @@
+# Python imports
+import numpy as np
+
+# Helpers computing the latest indicator values for every row of a
+# (symbols x candles) close-price matrix in a single pass. Each row must be a
+# gap-free close series, oldest candle first, and the results match `ta`
+# evaluated over that row.
+
+
+def ewm_weights(alpha: float, length: int) -> np.ndarray:
+    """Weights w such that `series @ w` is the last value of an adjust=False EWM.
+
+    s[T-1] = (1 - a)^(T-1) * x[0] + sum_{t>=1} a * (1 - a)^(T-1-t) * x[t]
+    """
+    decay = (1 - alpha) ** np.arange(length - 1, -1, -1, dtype=np.float64)
+    weights = alpha * decay
+    weights[0] = decay[0]
+    return weights
+
+
+def latest_ema(close_matrix: np.ndarray, window: int = 200) -> np.ndarray:
+    """Latest EMA of every row, NaN when a row is shorter than the window"""
+    symbols, candles = close_matrix.shape
+    if candles < window:
+        return np.full(symbols, np.nan)
+    return close_matrix @ ewm_weights(2 / (window + 1), candles)
+
+
+def latest_rsi(close_matrix: np.ndarray, window: int = 14) -> np.ndarray:
+    """Latest Wilder RSI of every row, NaN when a row is shorter than the window"""
+    symbols, candles = close_matrix.shape
+    if candles < window:
+        return np.full(symbols, np.nan)
+    # `ta` treats the undefined first change as zero, which contributes
+    # nothing to the weighted sum, so the first weight can be dropped.
+    weights = ewm_weights(1 / window, candles)[1:]
+    changes = np.diff(close_matrix, axis=1)
+    average_gain = np.clip(changes, 0, None) @ weights
+    average_loss = np.clip(-changes, 0, None) @ weights
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + average_gain / average_loss))
+    return np.where(average_loss == 0, 100.0, rsi)
+
+
+def latest_bollinger_bands(
+    close_matrix: np.ndarray,
+    window: int = 20,
+    window_dev: float = 1.5,
+) -> tuple:
+    """Latest (upper, lower, mavg) of every row"""
+    symbols, candles = close_matrix.shape
+    if candles < window:
+        empty = np.full(symbols, np.nan)
+        return empty, empty.copy(), empty.copy()
+    tail = close_matrix[:, -window:]
+    mavg = tail.mean(axis=1)
+    deviation = window_dev * tail.std(axis=1, ddof=0)
+    return mavg + deviation, mavg - deviation, mavg
+
+
+# Helpers computing indicator values at every candle of a close series, each
+# evaluated over the trailing `lookback` candles only. This mirrors the live
+# bot, which recomputes the indicators from a fixed-size kline window on every
+# tick, so the EWMs are re-seeded at the start of each window.
+
+
+def windowed_ewm(values: np.ndarray, lookback: int, alpha: float, seed: np.ndarray) -> np.ndarray:
+    """adjust=False EWM of `values` over each trailing window of `lookback` points.
+
+    `seed[i]` is the value the window starting at i is seeded with. Uses
+    e[t] = s[t] - (1 - a)^(L-1) * (s[t-L+1] - seed[t-L+1]), where s is the EWM
+    over the whole series, so the cost is O(n) regardless of the lookback.
+    Positions before the first full window are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(values.shape[0], np.nan)
+    if values.shape[0] < lookback:
+        return result
+    import pandas as pd
+    full = pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    decay = (1 - alpha) ** (lookback - 1)
+    starts = slice(0, values.shape[0] - lookback + 1)
+    result[lookback - 1:] = full[lookback - 1:] - decay * (full[starts] - seed[starts])
+    return result
+
+
+def trailing_ema(close: np.ndarray, lookback: int, window: int = 200) -> np.ndarray:
+    """EMA at every candle over the trailing `lookback` closes"""
+    close = np.asarray(close, dtype=np.float64)
+    if lookback < window:
+        return np.full(close.shape[0], np.nan)
+    return windowed_ewm(close, lookback, 2 / (window + 1), seed=close)
+
+
+def trailing_rsi(close: np.ndarray, lookback: int, window: int = 14) -> np.ndarray:
+    """RSI at every candle over the trailing `lookback` closes"""
+    close = np.asarray(close, dtype=np.float64)
+    result = np.full(close.shape[0], np.nan)
+    if lookback < window or close.shape[0] < lookback:
+        return result
+    changes = np.diff(close, prepend=close[0])
+    # The first change of each window is undefined and counts as zero
+    zeros = np.zeros_like(close)
+    average_gain = windowed_ewm(np.clip(changes, 0, None), lookback, 1 / window, seed=zeros)
+    average_loss = windowed_ewm(np.clip(-changes, 0, None), lookback, 1 / window, seed=zeros)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + average_gain / average_loss))
+    rsi = np.where(average_loss == 0, 100.0, rsi)
+    result[lookback - 1:] = rsi[lookback - 1:]
+    return result
+
+
+def rolling_bollinger_bands(close: np.ndarray, window: int = 20, window_dev: float = 1.5) -> tuple:
+    """(upper, lower, mavg) at every candle"""
+    import pandas as pd
+    rolling = pd.Series(np.asarray(close, dtype=np.float64)).rolling(window)
+    mavg = rolling.mean().to_numpy()
+    deviation = window_dev * rolling.std(ddof=0).to_numpy()
+    return mavg + deviation, mavg - deviation, mavg
@@ -0,0 +1,195 @@
+# Python imports
+import math
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# Local imports
+from .value_objects import (
+    BUY_DIRECTION,
+    SELL_DIRECTION,
+    ConversionLeg,
+    ConversionRoute,
+)
+
+if TYPE_CHECKING:
+    from src.adapters.exchange_metadata import SymbolInfo
+
+DEFAULT_HUBS = ('USDT', 'BTC', 'FDUSD')
+# Edge costs are compared at this precision, so spread jitter alone does not count as a listing change
+COST_PRECISION = 5
+
+# Log-cost of a path and its legs
+Path = Tuple[float, tuple]
+
+
+class ConversionRouter:
+    """Cheapest conversion routes between assets over the graph of listed pairs.
+
+    Every trading symbol links its base and quote assets both ways: selling the
+    base for the quote, or buying the base with the quote. Crossing a pair costs
+    the fee plus half its bid-ask spread, kept as log-losses so costs add up
+    along a route. A route is either the direct pair or goes through hub
+    assets, whose cheapest paths between each other are precomputed.
+
+    Routes between the assets passed to `precompute` are kept in a table, so a
+    lookup at decision time is a dict access. `update` compares the listings
+    with the previous ones and only recomputes the routes they can affect.
+    """
+
+    def __init__(
+        self,
+        hubs: Iterable[str] = DEFAULT_HUBS,
+        fee_rate: float = 0.001,
+        max_spread: float = 0.01,
+    ):
+        self.hubs = tuple(hubs)
+        self.fee_rate = fee_rate
+        # Pairs quoted wider than this are too illiquid to route through
+        self.max_spread = max_spread
+        # Symbol index the graph was last built from
+        self.source: Optional[Dict[str, 'SymbolInfo']] = None
+        self._pairs: Dict[str, tuple] = {}
+        self._edges: Dict[str, Dict[str, Path]] = {}
+        self._hub_paths: Dict[Tuple[str, str], Path] = {}
+        self._assets: set = set()
+        self._routes: Dict[Tuple[str, str], Optional[ConversionRoute]] = {}
+        self._lock = threading.RLock()
+
+    def edge_cost(self, spread: float) -> float:
+        return -math.log(1 - self.fee_rate) - math.log(1 - spread / 2)
+
+    def is_current(self, symbols: Dict[str, 'SymbolInfo']) -> bool:
+        """Whether the graph was built from this index; a metadata refresh replaces the index object"""
+        return symbols is self.source
+
+    def update(self, symbols: Dict[str, 'SymbolInfo'], spreads: Optional[Dict[str, float]] = None) -> int:
+        """Rebuild the graph from the listings and drop the routes touched by a change.
+
+        Returns the number of changed pairs.
+        """
+        spreads = spreads or {}
+        pairs = {}
+        for symbol, info in symbols.items():
+            if not info.is_trading or not info.base_asset or not info.quote_asset:
+                continue
+            spread = spreads.get(symbol, 0.0)
+            if spread > self.max_spread:
+                continue
+            pairs[symbol] = (info.base_asset, info.quote_asset, round(self.edge_cost(spread), COST_PRECISION))
+        with self._lock:
+            self.source = symbols
+            changed = [
+                pairs.get(symbol) or self._pairs[symbol]
+                for symbol in pairs.keys() | self._pairs.keys()
+                if pairs.get(symbol) != self._pairs.get(symbol)
+            ]
+            if not changed:
+                return 0
+            self._pairs = pairs
+            self._edges = self._build_edges(pairs)
+            hubs = set(self.hubs)
+            if not self._hub_paths or any(base in hubs and quote in hubs for base, quote, _ in changed):
+                # Paths between hubs changed, which every route may go through
+                self._hub_paths = self._build_hub_paths()
+                self._routes.clear()
+            else:
+                touched = {asset for base, quote, _ in changed for asset in (base, quote)}
+                for key in [key for key in self._routes if key[0] in touched or key[1] in touched]:
+                    del self._routes[key]
+            self._fill(self._assets)
+            return len(changed)
+
+    def precompute(self, assets: Iterable[str]):
+        """Compute the routes between every pair of the given and previously known assets"""
+        with self._lock:
+            self._assets.update(assets)
+            self._fill(self._assets)
+
+    def route(self, origin: str, target: str) -> Optional[ConversionRoute]:
+        """Cheapest route from origin to target, or None when the assets are not connected"""
+        try:
+            return self._routes[(origin, target)]
+        except KeyError:
+            pass
+        # Assets outside the precomputed set are routed on demand and kept
+        with self._lock:
+            if (origin, target) not in self._routes:
+                self._routes[(origin, target)] = self._compute(origin, target)
+            return self._routes[(origin, target)]
+
+    def _fill(self, assets: Iterable[str]):
+        assets = list(assets)
+        for origin in assets:
+            for target in assets:
+                if origin != target and (origin, target) not in self._routes:
+                    self._routes[(origin, target)] = self._compute(origin, target)
+
+    @staticmethod
+    def _build_edges(pairs: Dict[str, tuple]) -> Dict[str, Dict[str, Path]]:
+        edges: Dict[str, Dict[str, Path]] = {}
+        for symbol, (base, quote, cost) in pairs.items():
+            for from_asset, to_asset, side in ((base, quote, SELL_DIRECTION), (quote, base, BUY_DIRECTION)):
+                current = edges.setdefault(from_asset, {}).get(to_asset)
+                if current is None or cost < current[0]:
+                    leg = ConversionLeg(symbol=symbol, side=side, from_asset=from_asset, to_asset=to_asset)
+                    edges[from_asset][to_asset] = (cost, (leg,))
+        return edges
+
+    def _build_hub_paths(self) -> Dict[Tuple[str, str], Path]:
+        """Cheapest paths between every two hubs, through other hubs only (Floyd-Warshall)"""
+        paths = {(hub, hub): (0.0, ()) for hub in self.hubs}
+        for origin in self.hubs:
+            for target, path in self._edges.get(origin, {}).items():
+                if target in self.hubs:
+                    paths[(origin, target)] = path
+        for via in self.hubs:
+            for origin in self.hubs:
+                for target in self.hubs:
+                    first = paths.get((origin, via))
+                    second = paths.get((via, target))
+                    if first is None or second is None:
+                        continue
+                    current = paths.get((origin, target))
+                    if current is None or first[0] + second[0] < current[0]:
+                        paths[(origin, target)] = (first[0] + second[0], first[1] + second[1])
+        return paths
+
+    def _entries(self, origin: str) -> List[Tuple[str, Path]]:
+        """Hubs the origin reaches in one leg, or the origin itself when it is a hub"""
+        if origin in self.hubs:
+            return [(origin, (0.0, ()))]
+        edges = self._edges.get(origin, {})
+        return [(hub, edges[hub]) for hub in self.hubs if hub in edges]
+
+    def _exits(self, target: str) -> List[Tuple[str, Path]]:
+        """Hubs reaching the target in one leg, or the target itself when it is a hub"""
+        if target in self.hubs:
+            return [(target, (0.0, ()))]
+        return [(hub, self._edges[hub][target]) for hub in self.hubs if target in self._edges.get(hub, {})]
+
+    def _compute(self, origin: str, target: str) -> Optional[ConversionRoute]:
+        best = self._edges.get(origin, {}).get(target)
+        for entry_hub, (entry_cost, entry_legs) in self._entries(origin):
+            for exit_hub, (exit_cost, exit_legs) in self._exits(target):
+                hub_path = self._hub_paths.get((entry_hub, exit_hub))
+                if hub_path is None:
+                    continue
+                cost = entry_cost + hub_path[0] + exit_cost
+                # A direct pair wins ties, as it is a single order
+                if best is None or cost < best[0] - 1e-12:
+                    best = (cost, entry_legs + hub_path[1] + exit_legs)
+        if best is None or not best[1]:
+            return None
+        return ConversionRoute(
+            origin=origin,
+            target=target,
+            legs=best[1],
+            cost=1 - math.exp(-best[0]),
+        )
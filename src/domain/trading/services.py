@@ -1,16 +1,37 @@
 # Python imports
-import pandas as pd
-from binance.exceptions import BinanceAPIException
-from typing import Optional
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Union,
+)
 
 # App imports
-from src.adapters.exchange import Exchange
-from src.adapters.redis import RedisAdapter
-from src.adapters.telegram import TelegramAdapter
+from src.adapters import exchange_errors
+from src.adapters.kline_cache import INTERVAL_MS
+from src.adapters.metrics import metrics
+from src.adapters.rate_limiter import (
+    PRIORITY_SCAN,
+    priority,
+)
+from src.adapters.work_queue import JOB_ERROR
 from src.conf.settings import (
     REDIS_BOT_TRADES_KEY,
     REDIS_BOT_STATE_KEY,
     INITIAL_ASSET,
+    KLINE_DECODING,
+    KLINE_DTYPE,
 )
 
 # Local imports
@@ -21,41 +42,160 @@ from .exceptions import (
     TradingError,
     AssetPriceError,
 )
-from .entities import TradingOrder
+from .entities import (
+    TradingOrder,
+    TradingOrderFactory,
+)
+from .routing import ConversionRouter
 from .value_objects import (
+    TRADING_STATE_SCHEMA,
+    ConversionLeg,
+    ConversionRoute,
+    MarketSnapshot,
     TradeIntent,
     SELL_DIRECTION,
     BUY_DIRECTION,
 )
 
+# Adapters are only needed for type hints, so importing the domain stays cheap
+if TYPE_CHECKING:
+    import pandas as pd
+    from src.adapters.async_exchange import AsyncExchange
+    from src.adapters.candles import Candles
+    from src.adapters.exchange import Exchange
+    from src.adapters.redis import (
+        AsyncRedisAdapter,
+        RedisAdapter,
+    )
+    from src.adapters.telegram import TelegramAdapter
+    from src.adapters.work_queue import RedisWorkQueue
+
+COMPACT_KLINES = 'compact'
+# The strategy only reads close prices from the historical data
+STRATEGY_CANDLE_FIELDS = ('close',)
+
+class SharedMarketData:
+    """Tick-scoped memo of market data and indicators shared by every portfolio.
+
+    The first caller of a key computes it while concurrent callers of the
+    same key wait for that result, so each (symbol, interval) is fetched and
+    analyzed once per tick however many portfolios read it. `begin_tick`
+    discards everything memoized for the previous tick.
+    """
+
+    def __init__(self):
+        self._values: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def begin_tick(self):
+        with self._lock:
+            self._values.clear()
+            self._key_locks.clear()
+            self._pending.clear()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]):
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._values:
+                    self.hits += 1
+                    return self._values[key]
+            value = compute()
+            with self._lock:
+                self._values[key] = value
+                self.misses += 1
+            return value
+
+    async def get_or_compute_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]):
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = asyncio.ensure_future(compute())
+                self._pending[key] = pending
+                self.misses += 1
+            else:
+                self.hits += 1
+        try:
+            value = await asyncio.shield(pending)
+        finally:
+            if pending.done():
+                with self._lock:
+                    if self._pending.get(key) is pending:
+                        del self._pending[key]
+        with self._lock:
+            self._values[key] = value
+        return value
+
+
 class TradingDomainServices:
     def __init__(
         self,
-        exchange_client: Exchange,
-        redis_client: RedisAdapter,
-        telegram_adapter: TelegramAdapter,
+        exchange_client: 'Exchange',
+        redis_client: 'RedisAdapter',
+        telegram_adapter: 'TelegramAdapter',
+        async_redis_client: Optional['AsyncRedisAdapter'] = None,
+        async_exchange_client: Optional['AsyncExchange'] = None,
+        market_data: Optional[SharedMarketData] = None,
+        state_key: str = REDIS_BOT_STATE_KEY,
+        trades_key: str = REDIS_BOT_TRADES_KEY,
+        initial_asset: str = INITIAL_ASSET,
+        name: Optional[str] = None,
+        scan_queue: Optional['RedisWorkQueue'] = None,
+        kline_decoding: str = KLINE_DECODING,
+        kline_dtype: str = KLINE_DTYPE,
+        router: Optional[ConversionRouter] = None,
     ):
         self.exchange_client = exchange_client
         self.redis_client = redis_client
         self.telegram_adapter = telegram_adapter
+        # Used by the coroutine methods so state I/O never blocks the event loop
+        self.async_redis_client = async_redis_client
+        # Lets market data be fetched concurrently on the event loop
+        self.async_exchange_client = async_exchange_client
+        # Portfolio identity; several instances can share the clients above
+        self.market_data = market_data
+        self.state_key = state_key
+        self.trades_key = trades_key
+        self.initial_asset = initial_asset
+        self.name = name
+        # Spreads market scans over worker processes; None scans in-process
+        self.scan_queue = scan_queue
+        self.kline_decoding = kline_decoding
+        self.kline_dtype = kline_dtype
+        # Conversion routes through hub assets; None only trades direct pairs
+        self.router = router
+        self._snapshot: Optional[MarketSnapshot] = None
 
     def get_available_symbols(self) -> list:
         return self.exchange_client.get_available_symbols()
 
+    def has_symbol(self, symbol: str) -> bool:
+        return self.exchange_client.has_symbol(symbol)
+
     def get_trade_intent(self, base_asset: str, quote_asset: str) -> TradeIntent:
-        available_symbols = self.get_available_symbols()
         origin = base_asset
         quote = quote_asset
         if base_asset == quote_asset:
             raise TradingError("Base asset and quote asset cannot be the same")
         symbol = f"{base_asset}{quote_asset}"
         direction = SELL_DIRECTION
-        if symbol not in available_symbols:
+        if not self.has_symbol(symbol):
             origin = quote_asset
             quote = base_asset
             symbol = f"{quote_asset}{base_asset}"
             direction = BUY_DIRECTION
-            if symbol not in available_symbols:
+            if not self.has_symbol(symbol):
                 raise TradingError(f"Symbol {symbol} not available for trading")
         return TradeIntent(
             origin=origin,
@@ -64,24 +204,165 @@ class TradingDomainServices:
             side=direction,
         )
 
+    def update_routes(self):
+        """Bring the router up to date with the listings, if they were refreshed since the last call"""
+        try:
+            symbols = self.exchange_client.get_symbols()
+        except Exception as e:
+            raise TradingError(f"Error fetching exchange metadata: {e}")
+        if self.router.is_current(symbols):
+            return
+        try:
+            spreads = self.exchange_client.get_book_spreads()
+        except Exception:
+            # Route on fees alone until the next metadata refresh
+            spreads = None
+        self.router.update(symbols, spreads=spreads)
+
+    def prepare_routes(self, assets: List[str]):
+        """Precompute the routes between the given assets, so decisions only look them up"""
+        if self.router is None:
+            return
+        self.update_routes()
+        self.router.precompute(assets)
+
+    def get_conversion_route(self, base_asset: str, quote_asset: str) -> ConversionRoute:
+        """Cheapest route converting `base_asset` into `quote_asset`, through hub assets if needed"""
+        if self.router is None:
+            intent = self.get_trade_intent(base_asset, quote_asset)
+            leg = ConversionLeg(symbol=intent.symbol, side=intent.side, from_asset=base_asset, to_asset=quote_asset)
+            return ConversionRoute(origin=base_asset, target=quote_asset, legs=(leg,))
+        if base_asset == quote_asset:
+            raise TradingError("Base asset and quote asset cannot be the same")
+        self.update_routes()
+        route = self.router.route(base_asset, quote_asset)
+        if route is None:
+            raise TradingError(f"No conversion route from {base_asset} to {quote_asset}")
+        return route
+
+    def get_symbol_price(self, symbol: str) -> float:
+        """Get the current price of a symbol"""
+        if self._snapshot is not None:
+            price = self._snapshot.get_price(symbol)
+            if not price:
+                raise AssetPriceError(f"Price not found for {symbol}")
+            return price
+        try:
+            return float(self.exchange_client.get_symbol_ticker(symbol=symbol))
+        except exchange_errors.BinanceAPIException as e:
+            raise AssetPriceError(f"Error fetching price for {symbol}: {e.message}")
+        except Exception as e:
+            raise TradingError(f"Unexpected error fetching price for {symbol}: {e}")
+
+    async def execute_route(
+        self,
+        route: ConversionRoute,
+        amount: float,
+        usd_amount: float,
+        profit: float,
+        next_entry_price: Optional[float] = 0.0,
+    ) -> List[TradingOrder]:
+        """Place the orders of a route one after another, moving to its target with the last one.
+
+        `amount` is the holding of the origin asset. Every leg is sized in its
+        symbol's base asset from what the previous leg is expected to return at
+        the snapshot prices, net of the fee. If a leg fails after others went
+        through, the state moves to the asset held at that point before raising.
+        """
+        # Price lookups may wait on the rate limiter, so they run off the event loop
+        prices = await asyncio.to_thread(self.get_route_prices, route)
+        fee_rate = self.router.fee_rate if self.router is not None else 0.0
+        orders = []
+        for index, (leg, price) in enumerate(zip(route.legs, prices)):
+            last = index == len(route.legs) - 1
+            if leg.side == SELL_DIRECTION:
+                quantity = amount
+                received = amount * price
+            else:
+                quantity = received = amount / price
+            order = TradingOrderFactory.create_order(
+                symbol=leg.symbol,
+                side=leg.side,
+                quantity=quantity,
+                usd_amount=usd_amount,
+                profit=profit if last else 0.0,
+            )
+            try:
+                await self.place_order(
+                    order,
+                    next_asset=route.target if last else None,
+                    next_entry_price=next_entry_price,
+                )
+            except (OrderPlacementError, TradingError):
+                if orders:
+                    await self.set_trading_state_async(leg.from_asset, entry_price=usd_amount / amount)
+                raise
+            orders.append(order)
+            amount = received * (1 - fee_rate)
+        return orders
+
+    def get_route_prices(self, route: ConversionRoute) -> List[float]:
+        """Price of every leg of a route, from one market snapshot"""
+        with self.market_snapshot():
+            return [self.get_symbol_price(leg.symbol) for leg in route.legs]
+
+    def take_snapshot(self) -> MarketSnapshot:
+        """Fetch every price and every balance with one request each"""
+        try:
+            prices = self.exchange_client.get_all_prices()
+            balances = self.exchange_client.get_balances()
+        except exchange_errors.BinanceAPIException as e:
+            raise TradingError(f"Error fetching market snapshot: {e.message}")
+        except Exception as e:
+            raise TradingError(f"Unexpected error fetching market snapshot: {e}")
+        return MarketSnapshot(
+            prices=prices,
+            balances=balances,
+            taken_at=time.time(),
+        )
+
+    @contextmanager
+    def market_snapshot(self):
+        """Serve price and balance lookups from a single snapshot within the block.
+
+        Every lookup made inside the block sees the same prices and balances,
+        so computed volumes and recorded USD amounts cannot drift apart.
+        Nested blocks reuse the outer snapshot.
+        """
+        if self._snapshot is not None:
+            yield self._snapshot
+            return
+        self._snapshot = self.take_snapshot()
+        try:
+            yield self._snapshot
+        finally:
+            self._snapshot = None
+
     def get_asset_balance(self, asset: str) -> float:
         """Get the balance of a specific asset"""
+        if self._snapshot is not None:
+            return self._snapshot.get_balance(asset)
         try:
             balance = self.exchange_client.get_balance(asset=asset)
             return balance
-        except BinanceAPIException as e:
+        except exchange_errors.BinanceAPIException as e:
             raise AssetBalanceError(f"Error fetching balance for {asset}: {e.message}")
         except Exception as e:
             raise TradingError(f"Unexpected error fetching balance for {asset}: {e}")
 
     def get_asset_price(self, asset: str) -> float:
         """Get the current price of a specific asset"""
+        if self._snapshot is not None:
+            price = self._snapshot.get_price(f"{asset}USDT")
+            if not price:
+                raise AssetPriceError(f"Price not found for {asset}")
+            return price
         try:
             price = self.exchange_client.get_symbol_ticker(symbol=f"{asset}USDT")
             if not price:
                 raise AssetPriceError(f"Price not found for {asset}")
             return float(price)
-        except BinanceAPIException as e:
+        except exchange_errors.BinanceAPIException as e:
             raise AssetPriceError(f"Error fetching price for {asset}: {e.message}")
         except Exception as e:
             raise TradingError(f"Unexpected error fetching price for {asset}: {e}")
@@ -94,66 +375,222 @@ class TradingDomainServices:
         else:
             raise AssetBalanceError(f"No balance for {asset}")
 
-    def get_historical_data(self, symbol: str, interval: str = '1h', lookback: int = 100) -> pd.DataFrame:
+    def get_historical_data(self, symbol: str, interval: str = '1h', lookback: int = 100) -> Union['Candles', 'pd.DataFrame']:
+        """Historical data of a symbol, as compact `Candles` unless `kline_decoding` asks for a frame"""
+        if self.market_data is not None:
+            return self.market_data.get_or_compute(
+                ('klines', symbol, interval, lookback),
+                lambda: self._fetch_historical_data(symbol, interval, lookback),
+            )
+        return self._fetch_historical_data(symbol, interval, lookback)
+
+    def _fetch_historical_data(self, symbol: str, interval: str, lookback: int) -> Union['Candles', 'pd.DataFrame']:
         try:
-            return self.exchange_client.get_historical_data(
-                symbol=symbol,
-                interval=interval,
-                lookback=lookback,
+            with metrics.span('kline_fetch', symbol=symbol, interval=interval):
+                if self.kline_decoding == COMPACT_KLINES:
+                    return self.exchange_client.get_candles(
+                        symbol=symbol,
+                        interval=interval,
+                        lookback=lookback,
+                        fields=STRATEGY_CANDLE_FIELDS,
+                        dtype=self.kline_dtype,
+                    )
+                return self.exchange_client.get_historical_data(
+                    symbol=symbol,
+                    interval=interval,
+                    lookback=lookback,
+                )
+        except exchange_errors.BinanceAPIException as e:
+            raise HistoricalDataError(f"Error fetching historical data for {symbol}: {e.message}")
+        except Exception as e:
+            raise TradingError(f"Unexpected error fetching historical data for {symbol}: {e}")
+
+    def market_scan_priority(self):
+        """Context manager running the market data requests of the block as deferrable scan traffic"""
+        return priority(PRIORITY_SCAN)
+
+    async def get_historical_data_async(self, symbol: str, interval: str = '1h', lookback: int = 100) -> Union['Candles', 'pd.DataFrame']:
+        if self.market_data is not None:
+            return await self.market_data.get_or_compute_async(
+                ('klines', symbol, interval, lookback),
+                lambda: self._fetch_historical_data_async(symbol, interval, lookback),
             )
-        except BinanceAPIException as e:
+        return await self._fetch_historical_data_async(symbol, interval, lookback)
+
+    async def _fetch_historical_data_async(self, symbol: str, interval: str, lookback: int) -> Union['Candles', 'pd.DataFrame']:
+        if self.async_exchange_client is None:
+            return await asyncio.to_thread(self._fetch_historical_data, symbol, interval, lookback)
+        try:
+            with metrics.span('kline_fetch', symbol=symbol, interval=interval):
+                if self.kline_decoding == COMPACT_KLINES:
+                    return await self.async_exchange_client.get_candles(
+                        symbol=symbol,
+                        interval=interval,
+                        lookback=lookback,
+                        fields=STRATEGY_CANDLE_FIELDS,
+                        dtype=self.kline_dtype,
+                    )
+                return await self.async_exchange_client.get_historical_data(
+                    symbol=symbol,
+                    interval=interval,
+                    lookback=lookback,
+                )
+        except exchange_errors.BinanceAPIException as e:
             raise HistoricalDataError(f"Error fetching historical data for {symbol}: {e.message}")
         except Exception as e:
             raise TradingError(f"Unexpected error fetching historical data for {symbol}: {e}")
 
+    @staticmethod
+    def market_scan_job_id(symbol: str, interval: str, lookback: int, parameters: dict) -> str:
+        """Job id shared by every scan of a symbol in the same candle with the same strategy"""
+        candle = int(time.time() * 1000) // INTERVAL_MS[interval]
+        strategy = hashlib.sha1(json.dumps(parameters, sort_keys=True).encode()).hexdigest()[:12]
+        return f"{symbol}:{interval}:{lookback}:{candle}:{strategy}"
+
+    def submit_market_scans(self, jobs: Dict[str, dict]) -> int:
+        """Queue market scan jobs for the workers, keyed by idempotent job ids"""
+        return self.scan_queue.enqueue(jobs)
+
+    def gather_market_scans(
+        self,
+        job_ids: list,
+        handler: Callable[[dict], dict],
+        timeout: float,
+        job_timeout: Optional[float] = None,
+    ) -> tuple:
+        """Collect (results, error messages) of market scan jobs, running queued jobs with `handler` while waiting"""
+        finished = self.scan_queue.gather(job_ids, handler, timeout, job_timeout=job_timeout)
+        results = {job_id: result for job_id, result in finished.items() if JOB_ERROR not in result}
+        errors = {job_id: result[JOB_ERROR] for job_id, result in finished.items() if JOB_ERROR in result}
+        return results, errors
+
+    def count_scan_workers(self) -> int:
+        return self.scan_queue.live_workers()
+
+    def serve_market_scans(self, handler: Callable[[dict], dict], stop: Optional[threading.Event] = None):
+        """Run market scan jobs queued by other processes until `stop` is set"""
+        self.scan_queue.serve(handler, stop=stop)
+
+    def evict_historical_data(self, keep_symbols: list):
+        """Release cached market data for symbols that are no longer tracked"""
+        self.exchange_client.evict_historical_data(keep_symbols)
+
     async def place_order(
         self,
-        order: TradingOrder
+        order: TradingOrder,
+        next_asset: Optional[str] = None,
+        next_entry_price: Optional[float] = 0.0,
     ):
-        """Place an order on the exchange"""
-        quantity = round(order.quantity, 4)
+        """Place an order on the exchange.
+
+        When `next_asset` is given, the trade record and the move to the new
+        asset are written to Redis as a single atomic transition.
+        """
         try:
-            self.exchange_client.create_order(
-                symbol=order.symbol,
-                side=order.side,
-                quantity=quantity,
-            )
-        except BinanceAPIException as e:
+            # Exchange calls may wait on the rate limiter, so they run off the event loop
+            await asyncio.to_thread(self.submit_order, order)
+        except exchange_errors.BinanceAPIException as e:
             raise OrderPlacementError(f"Error placing order for {order.symbol}: {e.message}")
+        except ValueError as e:
+            # Rejected by the symbol's trading rules before reaching the exchange
+            raise OrderPlacementError(f"Error placing order for {order.symbol}: {e}")
         except Exception as e:
             raise TradingError(f"Unexpected error placing order for {order.symbol}: {e}")
-        self.redis_client.push_record(
-            REDIS_BOT_TRADES_KEY,
-            order.as_dict(),
-        )
-        if "USDT" in order.symbol:
-            await self.telegram_adapter.send_message(
-                "Placing stop loss order...",
+        await self.record_order(order, next_asset=next_asset, next_entry_price=next_entry_price)
+        if next_asset == "USDT":
+            await self.telegram_adapter.notify(
+                f"[{self.name}] Placing stop loss order..." if self.name else "Placing stop loss order...",
             )
         message = f"❗ Order placed: \n" +\
                     f"Symbol: {order.symbol}\n" +\
                     f"Side: {order.side}\n" +\
-                    f"Quantity: {quantity}\n" +\
+                    f"Quantity: {order.quantity}\n" +\
                     f"USD Amount: {order.usd_amount}\n" + \
                     f"Profit: {order.profit}\n"
-        await self.telegram_adapter.send_message(message)
+        if self.name:
+            message = f"[{self.name}] {message}"
+        await self.telegram_adapter.notify(message)
 
-    def set_trading_state(self, asset: str, entry_price: Optional[float] = 0.0):
-        """Set the current trading state"""
-        trading_state = {
+    def submit_order(self, order: TradingOrder):
+        """Send an order to the exchange, which rounds it down to the lot step and checks its minimums"""
+        price = self.get_symbol_price(order.symbol)
+        with metrics.span('order'):
+            self.exchange_client.create_order(
+                symbol=order.symbol,
+                side=order.side,
+                quantity=order.quantity,
+                price=price,
+            )
+
+    @staticmethod
+    def build_trading_state(asset: str, entry_price: Optional[float] = 0.0) -> dict:
+        return {
             "current_asset": asset,
-            "entry_price": entry_price,
+            "entry_price": float(entry_price or 0.0),
         }
-        self.redis_client.set_state(REDIS_BOT_STATE_KEY, trading_state)
+
+    def set_trading_state(self, asset: str, entry_price: Optional[float] = 0.0):
+        """Set the current trading state"""
+        trading_state = self.build_trading_state(asset, entry_price)
+        with metrics.span('redis', operation='set_state'):
+            self.redis_client.set_state(self.state_key, trading_state)
 
     def get_trading_state(self) -> dict:
-        """Get the current trading state"""
-        state = self.redis_client.get_state(REDIS_BOT_STATE_KEY)
-        if not state:
-            self.set_trading_state(INITIAL_ASSET)
-            state = self.redis_client.get_state(REDIS_BOT_STATE_KEY)
-        return state
+        """Get the current trading state, initializing it on first use"""
+        with metrics.span('redis', operation='get_state'):
+            return self.redis_client.get_or_init_state(
+                self.state_key,
+                defaults=self.build_trading_state(self.initial_asset),
+                schema=TRADING_STATE_SCHEMA,
+            )
+
+    async def record_order(
+        self,
+        order: TradingOrder,
+        next_asset: Optional[str] = None,
+        next_entry_price: Optional[float] = 0.0,
+    ):
+        """Store the order record, together with the next trading state if given"""
+        if next_asset is None:
+            with metrics.span('redis', operation='push_record'):
+                if self.async_redis_client is not None:
+                    await self.async_redis_client.push_record(self.trades_key, order.as_dict())
+                else:
+                    self.redis_client.push_record(self.trades_key, order.as_dict())
+            return
+        transition = {
+            "records_key": self.trades_key,
+            "record": order.as_dict(),
+            "state_key": self.state_key,
+            "mapping": self.build_trading_state(next_asset, next_entry_price),
+        }
+        with metrics.span('redis', operation='push_record_and_set_state'):
+            if self.async_redis_client is not None:
+                await self.async_redis_client.push_record_and_set_state(**transition)
+            else:
+                self.redis_client.push_record_and_set_state(**transition)
+
+    async def set_trading_state_async(self, asset: str, entry_price: Optional[float] = 0.0):
+        """Set the current trading state without blocking the event loop"""
+        if self.async_redis_client is None:
+            return self.set_trading_state(asset, entry_price=entry_price)
+        with metrics.span('redis', operation='set_state'):
+            await self.async_redis_client.set_state(
+                self.state_key,
+                self.build_trading_state(asset, entry_price),
+            )
+
+    async def get_trading_state_async(self) -> dict:
+        """Get the current trading state without blocking the event loop"""
+        if self.async_redis_client is None:
+            return self.get_trading_state()
+        with metrics.span('redis', operation='get_state'):
+            return await self.async_redis_client.get_or_init_state(
+                self.state_key,
+                defaults=self.build_trading_state(self.initial_asset),
+                schema=TRADING_STATE_SCHEMA,
+            )
 
     def wipe_trading_state(self):
         """Wipe the current trading state"""
-        self.redis_client.clear_state(REDIS_BOT_STATE_KEY)
\ No newline at end of file
+        self.redis_client.clear_state(self.state_key)
\ No newline at end of file
@@ -1,8 +1,11 @@
 # Python imports
-from typing import List
-from attr import dataclass
+from typing import Dict, List
+from attr import dataclass, Factory
 from typing import Optional
 
+# App imports
+from src.domain.calculator.value_objects import StrategyParameters
+
 
 SELL_DIRECTION = 'sell'
 BUY_DIRECTION = 'buy'
@@ -10,7 +13,17 @@ MARKET_ORDER = 'market'
 LIMIT_ORDER = 'limit'
 STOP_ORDER = 'stop'
 
-@dataclass
+# Field types of the trading state hash stored in Redis
+TRADING_STATE_SCHEMA = {
+    'current_asset': str,
+    'entry_price': float,
+}
+
+SCAN_ERROR = 'error'
+SCAN_TIMEOUT = 'timeout'
+SCAN_DEADLINE_EXCEEDED = 'deadline_exceeded'
+
+@dataclass(slots=True)
 class AssetAnalysis:
     asset: str
     symbol: str
@@ -37,9 +50,23 @@ class AssetAnalysis:
             'trend_signal': self.trend_signal,
         }
 
+@dataclass
+class MarketScanFailure:
+    symbol: str
+    reason: str
+    message: str
+
+    def as_dict(self):
+        return {
+            'symbol': self.symbol,
+            'reason': self.reason,
+            'message': self.message,
+        }
+
 @dataclass
 class MarketAnalysis:
     markets: List[AssetAnalysis]
+    failures: List[MarketScanFailure] = Factory(list)
 
     def as_list(self):
         return [market.as_dict() for market in self.markets]
@@ -59,3 +86,123 @@ class TradeIntent:
             'side': self.side,
         }
 
+
+@dataclass(frozen=True)
+class ConversionLeg:
+    """One order of a conversion route, moving the holding from one asset to another"""
+    symbol: str
+    side: str
+    from_asset: str
+    to_asset: str
+
+    def as_intent(self) -> TradeIntent:
+        """The same trade in the shape `get_trade_intent` returns for a direct pair"""
+        if self.side == SELL_DIRECTION:
+            return TradeIntent(origin=self.from_asset, quote=self.to_asset, symbol=self.symbol, side=self.side)
+        return TradeIntent(origin=self.to_asset, quote=self.from_asset, symbol=self.symbol, side=self.side)
+
+    def as_dict(self):
+        return {
+            'symbol': self.symbol,
+            'side': self.side,
+            'from_asset': self.from_asset,
+            'to_asset': self.to_asset,
+        }
+
+
+@dataclass(frozen=True)
+class ConversionRoute:
+    """Orders converting `origin` into `target`, and the fraction of value they are expected to lose"""
+    origin: str
+    target: str
+    legs: tuple
+    cost: float = 0.0
+
+    @property
+    def is_direct(self) -> bool:
+        return len(self.legs) == 1
+
+    def as_dict(self):
+        return {
+            'origin': self.origin,
+            'target': self.target,
+            'legs': [leg.as_dict() for leg in self.legs],
+            'cost': self.cost,
+        }
+
+
+@dataclass
+class MarketSnapshot:
+    """Prices and balances fetched together, shared by every lookup of a tick"""
+    prices: Dict[str, float]
+    balances: Dict[str, float]
+    taken_at: float
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        return self.prices.get(symbol)
+
+    def get_balance(self, asset: str) -> float:
+        return self.balances.get(asset, 0.0)
+
+    def as_dict(self):
+        return {
+            'prices': self.prices,
+            'balances': self.balances,
+            'taken_at': self.taken_at,
+        }
+
+
+@dataclass(frozen=True)
+class PortfolioConfig:
+    """An independently traded portfolio: its Redis keys, account, starting asset, markets and strategy"""
+    name: str
+    state_key: str
+    trades_key: str
+    initial_asset: str
+    parameters: StrategyParameters = Factory(StrategyParameters)
+    # Exchange account the portfolio trades on; None is the main API_KEY account
+    account: Optional[str] = None
+    # Symbols the portfolio may rotate into; None is the bot's watchlist
+    watchlist: Optional[List[str]] = None
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'state_key': self.state_key,
+            'trades_key': self.trades_key,
+            'initial_asset': self.initial_asset,
+            'parameters': self.parameters.as_dict(),
+            'account': self.account,
+            'watchlist': self.watchlist,
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        data: dict,
+        state_key_prefix: str,
+        trades_key_prefix: str,
+        initial_asset: str,
+        parameters: StrategyParameters,
+    ) -> 'PortfolioConfig':
+        """Build a portfolio from a config entry, filling unset fields from the defaults"""
+        name = data['name']
+        # Strategy overrides may be given flat or nested as in `as_dict`
+        values = {**data.get('parameters', {}), **data}
+        overrides = {
+            field: type(getattr(parameters, field))(values[field])
+            for field in parameters.as_dict()
+            if field in values
+        }
+        watchlist = data.get('watchlist')
+        if isinstance(watchlist, str):
+            watchlist = [symbol for symbol in watchlist.split(',') if symbol]
+        return cls(
+            name=name,
+            state_key=data.get('state_key', f"{state_key_prefix}:{name}"),
+            trades_key=data.get('trades_key', f"{trades_key_prefix}:{name}"),
+            initial_asset=data.get('initial_asset', initial_asset),
+            parameters=StrategyParameters(**{**parameters.as_dict(), **overrides}),
+            account=data.get('account'),
+            watchlist=watchlist,
+        )
@@ -0,0 +1,173 @@
+# Python imports
+import asyncio
+import hashlib
+import hmac
+from contextlib import asynccontextmanager
+from urllib.parse import urlencode
+import pytest
+from aiohttp import web
+
+# App imports
+from src.adapters import exchange_errors
+from src.adapters.async_exchange import AsyncExchange
+from src.adapters.fakes import FakeBinanceClient
+
+API_KEY = 'test-key'
+API_SECRET = 'test-secret'
+
+
+class MockBinance:
+    """Local stand-in for the Binance REST endpoints the adapter calls, backed by a `FakeBinanceClient`"""
+
+    def __init__(self, delay: float = 0.05):
+        self.client = FakeBinanceClient(symbols=['ETHUSDT'], balances={'ETH': 1.5})
+        self.delay = delay
+        self.hits = {}
+        self.signed_requests = []
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/api/v3/klines', self.klines)
+        app.router.add_get('/api/v3/account', self.account)
+        app.router.add_get('/api/v3/ticker/price', self.ticker)
+        return app
+
+    def hit(self, request: web.Request):
+        self.hits[request.path] = self.hits.get(request.path, 0) + 1
+
+    async def klines(self, request: web.Request) -> web.Response:
+        self.hit(request)
+        # Slow enough for concurrent callers to overlap
+        await asyncio.sleep(self.delay)
+        query = request.query
+        return web.json_response(self.client.get_klines(query['symbol'], query['interval'], limit=int(query['limit'])))
+
+    async def account(self, request: web.Request) -> web.Response:
+        self.hit(request)
+        params = dict(request.query)
+        signature = params.pop('signature', None)
+        expected = hmac.new(API_SECRET.encode(), urlencode(params).encode(), hashlib.sha256).hexdigest()
+        self.signed_requests.append(request.headers.get('X-MBX-APIKEY'))
+        if request.headers.get('X-MBX-APIKEY') != API_KEY or signature != expected:
+            return web.json_response({'code': -1022, 'msg': 'Signature for this request is not valid.'}, status=401)
+        return web.json_response(self.client.get_account())
+
+    async def ticker(self, request: web.Request) -> web.Response:
+        self.hit(request)
+        if request.query.get('symbol') not in self.client.symbols:
+            return web.json_response({'code': -1121, 'msg': 'Invalid symbol.'}, status=400)
+        if request.query.get('symbol') == 'ETHUSDT' and request.query.get('fail'):
+            return web.Response(text='<html>Bad gateway</html>', status=502)
+        return web.json_response(self.client.get_symbol_ticker(request.query['symbol']))
+
+
+@asynccontextmanager
+async def serve(mock: MockBinance):
+    runner = web.AppRunner(mock.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        yield f"http://127.0.0.1:{port}/api"
+    finally:
+        await runner.cleanup()
+
+
+def build_exchange(api_url: str) -> AsyncExchange:
+    return AsyncExchange(api_key=API_KEY, api_secret=API_SECRET, api_url=api_url)
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    mock = MockBinance()
+
+    async def scenario():
+        async with serve(mock) as api_url:
+            exchange = build_exchange(api_url)
+            try:
+                results = await asyncio.gather(*(
+                    exchange.get_klines('ETHUSDT', '5m', lookback=50) for _ in range(5)
+                ))
+                # A request issued after the first completed goes upstream again
+                await exchange.get_klines('ETHUSDT', '5m', lookback=50)
+            finally:
+                await exchange.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert mock.hits['/api/v3/klines'] == 2
+    assert all(result == results[0] for result in results)
+    assert len(results[0]) == 50
+
+
+def test_signed_requests_carry_the_key_and_a_valid_signature():
+    mock = MockBinance()
+
+    async def scenario():
+        async with serve(mock) as api_url:
+            exchange = build_exchange(api_url)
+            try:
+                return await exchange.get_balances()
+            finally:
+                await exchange.close()
+
+    assert asyncio.run(scenario()) == {'ETH': 1.5}
+    assert mock.signed_requests == [API_KEY]
+
+
+def test_a_wrong_secret_is_rejected_by_the_signature_check():
+    mock = MockBinance()
+
+    async def scenario():
+        async with serve(mock) as api_url:
+            exchange = AsyncExchange(api_key=API_KEY, api_secret='other', api_url=api_url)
+            try:
+                await exchange.get_balances()
+            finally:
+                await exchange.close()
+
+    with pytest.raises(exchange_errors.BinanceAPIException) as error:
+        asyncio.run(scenario())
+    assert error.value.code == -1022
+
+
+def test_error_replies_map_to_binance_exceptions():
+    mock = MockBinance()
+
+    async def scenario():
+        async with serve(mock) as api_url:
+            exchange = build_exchange(api_url)
+            try:
+                with pytest.raises(exchange_errors.BinanceAPIException) as api_error:
+                    await exchange.get_symbol_ticker('NOPEUSDT')
+                # A reply that is not JSON, e.g. from a proxy, is a request error
+                with pytest.raises(exchange_errors.BinanceRequestException):
+                    await exchange._request('GET', 'ticker/price', {'symbol': 'ETHUSDT', 'fail': 1})
+                return api_error.value
+            finally:
+                await exchange.close()
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 400
+    assert error.code == -1121
+    assert error.message == 'Invalid symbol.'
+
+
+def test_the_session_is_rebuilt_on_a_new_event_loop():
+    mock = MockBinance(delay=0)
+    exchange = build_exchange('')
+    sessions = []
+
+    async def fetch_on_this_loop():
+        # A fresh server per loop; the previous session belongs to a closed loop
+        async with serve(mock) as api_url:
+            exchange.api_url = api_url
+            klines = await exchange.get_klines('ETHUSDT', '1h', lookback=10)
+            sessions.append(exchange.session)
+            return klines
+
+    asyncio.run(fetch_on_this_loop())
+    assert len(asyncio.run(fetch_on_this_loop())) == 10
+    assert sessions[0] is not sessions[1]
+    assert mock.hits['/api/v3/klines'] == 2
+    asyncio.run(exchange.close())
@@ -0,0 +1,135 @@
+# Python imports
+import numpy as np
+import pandas as pd
+import pytest
+
+# App imports
+from src.application.backtest.services import BacktestApplicationServices
+from src.domain.backtest.services import (
+    BUY_CODE,
+    HOLD_CODE,
+    SELL_CODE,
+    BacktestDomainServices,
+)
+from src.domain.backtest.value_objects import (
+    ONE_HOUR_MS,
+    BacktestConfig,
+)
+from src.domain.calculator.services import IndicatorCalculatorDomainServices
+from src.domain.calculator.value_objects import (
+    BUY_SIGNAL,
+    HOLD_SIGNAL,
+    SELL_SIGNAL,
+)
+from src.domain.trading.value_objects import (
+    AssetAnalysis,
+    MarketAnalysis,
+)
+
+SIGNALS = {BUY_CODE: BUY_SIGNAL, HOLD_CODE: HOLD_SIGNAL, SELL_CODE: SELL_SIGNAL}
+SAMPLES = 30
+
+
+@pytest.fixture(scope='module')
+def replay():
+    config = BacktestConfig(initial_asset='SYM0')
+    services = BacktestDomainServices()
+    history = BacktestApplicationServices.generate_price_history(symbols=4, candles=2600, seed=7)
+    signals = services.get_signals(history, config)
+    start = services.get_warmup(history, config)
+    candles = np.linspace(start, history.candles - 1, SAMPLES).astype(int)
+    return config, services, history, signals, candles
+
+
+def hourly_window(history, symbol: int, candle: int, lookback: int) -> np.ndarray:
+    """The 1h closes the live bot fetches at a 5m candle: closed hours plus the hour so far"""
+    hours = history.timestamps[:candle + 1] // ONE_HOUR_MS
+    last_of_hour = np.flatnonzero(np.diff(hours))
+    closed = history.closes[symbol, last_of_hour][-(lookback - 1):]
+    return np.r_[closed, history.closes[symbol, candle]]
+
+
+def live_signals(calculator, window: np.ndarray) -> tuple:
+    """(trend indicators, Bollinger Bands, trend signal, trade signal) as computed by `ta`"""
+    close_prices = pd.Series(window)
+    trend = calculator.apply_trend_indicators(close_prices, series=True)
+    bands = calculator.apply_bollinger_bands_indicators(close_prices, series=True)
+    return (
+        trend,
+        bands,
+        calculator.get_trend_signal(close_prices.iloc[-1], trend),
+        calculator.get_bollinger_bands_signals(close_prices.iloc[-1], bands),
+    )
+
+
+def test_timeframe_signals_match_the_live_decision(replay):
+    config, services, history, signals, candles = replay
+    calculator = IndicatorCalculatorDomainServices(parameters=config.parameters)
+    seen = set()
+    for candle in candles:
+        for symbol in range(len(history.symbols)):
+            close = history.closes[symbol]
+            short_window = close[candle - config.short_term_lookback + 1:candle + 1]
+            long_window = hourly_window(history, symbol, candle, config.long_term_lookback)
+            short_trend, short_bands, short_trend_signal, short_trade_signal = live_signals(calculator, short_window)
+            long_trend, long_bands, long_trend_signal, long_trade_signal = live_signals(calculator, long_window)
+            assert SIGNALS[signals.short_trend[symbol, candle]] == short_trend_signal
+            assert SIGNALS[signals.short_trade[symbol, candle]] == short_trade_signal
+            assert SIGNALS[signals.long_trend[symbol, candle]] == long_trend_signal
+            assert SIGNALS[signals.long_trade[symbol, candle]] == long_trade_signal
+            seen.update([short_trend_signal, short_trade_signal, long_trend_signal, long_trade_signal])
+            # Entry prices putting the change above take profit, inside the band and below stop loss
+            for entry_price in close[candle] * np.array([0.95, 1.0, 1.005, 1.05]):
+                change = np.array([(close[candle] - entry_price) / entry_price * 100])
+                short_sell = calculator.evaluate_trading_decision(
+                    entry_price, pd.Series(short_window), short_trend, short_bands,
+                ) == SELL_SIGNAL
+                long_sell = calculator.evaluate_trading_decision(
+                    entry_price, pd.Series(long_window), long_trend, long_bands,
+                ) == SELL_SIGNAL
+                replayed = (
+                    services.get_sell_mask(
+                        change,
+                        signals.short_trend[symbol, candle:candle + 1],
+                        signals.short_trade[symbol, candle:candle + 1],
+                        config.parameters,
+                    )
+                    & services.get_sell_mask(
+                        change,
+                        signals.long_trend[symbol, candle:candle + 1],
+                        signals.long_trade[symbol, candle:candle + 1],
+                        config.parameters,
+                    )
+                )
+                assert bool(replayed[0]) == (short_sell and long_sell)
+    # The sample exercises every signal, not just holds
+    assert seen == {BUY_SIGNAL, HOLD_SIGNAL, SELL_SIGNAL}
+
+
+def test_best_symbol_matches_the_live_market_scan(replay):
+    config, services, history, signals, candles = replay
+    calculator = IndicatorCalculatorDomainServices(parameters=config.parameters)
+    picks = set()
+    for candle in candles:
+        markets = []
+        for symbol, name in enumerate(history.symbols):
+            window = history.closes[symbol, candle - config.scan_lookback + 1:candle + 1]
+            trend, bands, trend_signal, trade_signal = live_signals(calculator, window)
+            latest_trend, latest_bands = trend.latest(), bands.latest()
+            markets.append(AssetAnalysis(
+                asset=name[:-4],
+                symbol=name,
+                price=float(window[-1]),
+                rsi=latest_trend.rsi,
+                ema=latest_trend.ema,
+                lower_bb=latest_bands.lower,
+                upper_bb=latest_bands.upper,
+                mavg_bb=latest_bands.mavg,
+                trade_signal=trade_signal,
+                trend_signal=trend_signal,
+            ))
+        best = calculator.get_best_market_opportunity(MarketAnalysis(markets=markets))
+        replayed = services.get_best_symbol(signals, candle)
+        assert replayed == (history.symbols.index(best.symbol) if best is not None else None)
+        picks.add(replayed)
+    assert len(picks) > 1
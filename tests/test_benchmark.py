@@ -0,0 +1,32 @@
+# Python imports
+import asyncio
+
+# App imports
+import main
+from src.domain.benchmark.services import BenchmarkDomainServices
+from src.application.benchmark.services import (
+    HELD_ASSET,
+    BenchmarkApplicationServices,
+)
+
+
+def test_cycle_runs_the_bot_tick_on_the_fake_app(monkeypatch):
+    benchmark_app_services = BenchmarkApplicationServices(BenchmarkDomainServices(), repeat=1, warmup=0)
+    app = benchmark_app_services.build_app(10)
+    monkeypatch.setattr(main, 'app', app)
+    trading_app_services = app.portfolios[0].trading_app_services
+    entry_price = trading_app_services.get_asset_price(HELD_ASSET) * 1.1
+    trading_app_services.set_current_asset(HELD_ASSET, entry_price=entry_price)
+
+    asyncio.run(main.run_portfolios())
+
+    assert trading_app_services.get_current_asset()['current_asset'] != HELD_ASSET
+    assert app.exchange.client.orders
+
+
+def test_cycle_case_restores_the_bot_app():
+    bot_app = main.app
+    benchmark_app_services = BenchmarkApplicationServices(BenchmarkDomainServices(), repeat=1, warmup=0)
+    result = benchmark_app_services.bench_cycle(10)
+    assert result.name == 'cycle'
+    assert main.app is bot_app
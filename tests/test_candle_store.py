@@ -0,0 +1,70 @@
+# Python imports
+import numpy as np
+import pytest
+
+# App imports
+from src.adapters import exchange as exchange_module
+from src.adapters.candle_store import CandleStore
+from src.adapters.fakes import (
+    FakeBinanceClient,
+    FakeExchange,
+)
+from src.adapters.kline_cache import (
+    INTERVAL_MS,
+    KlineCache,
+)
+from src.application.backtest.services import BacktestApplicationServices
+from src.domain.backtest.services import BacktestDomainServices
+
+SYMBOL = 'SYM0USDT'
+INTERVAL = '5m'
+LOOKBACK = 288
+STEP = INTERVAL_MS[INTERVAL]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeBinanceClient(symbols=[SYMBOL])
+    # The exchange decides what is missing from the wall clock, so follow the fake one
+    monkeypatch.setattr(exchange_module.time, 'time', lambda: client.now_ms / 1000)
+    return client
+
+
+def test_append_after_a_hole_is_reported_as_a_gap(tmp_path, client):
+    store = CandleStore(path=str(tmp_path))
+    klines = client.get_klines(symbol=SYMBOL, interval=INTERVAL, limit=100)
+    store.append(SYMBOL, INTERVAL, klines[:40])
+    store.append(SYMBOL, INTERVAL, klines[60:])
+    assert store.size(SYMBOL, INTERVAL) == 80
+    assert store.gaps(SYMBOL, INTERVAL) == [(klines[40][0], klines[59][0])]
+    assert store.gaps(SYMBOL, INTERVAL, start_ms=klines[60][0]) == []
+
+
+def test_reseed_after_downtime_backfills_the_store(tmp_path, client):
+    store = CandleStore(path=str(tmp_path))
+    FakeExchange(client, kline_cache=KlineCache(), candle_store=store).get_klines(SYMBOL, INTERVAL, LOOKBACK)
+    assert store.size(SYMBOL, INTERVAL) == LOOKBACK - 1
+    # Down for longer than the lookback, then restarted with an empty cache
+    client.advance(600 * STEP)
+    exchange = FakeExchange(client, kline_cache=KlineCache(), candle_store=store)
+    klines = exchange.get_klines(SYMBOL, INTERVAL, LOOKBACK)
+    assert len(klines) == LOOKBACK
+    assert store.gaps(SYMBOL, INTERVAL) == []
+    assert store.size(SYMBOL, INTERVAL) == LOOKBACK - 1 + 600
+    assert store.last_timestamp(SYMBOL, INTERVAL) == klines[-2][0]
+
+
+def test_stored_price_history_fills_holes_from_the_exchange(tmp_path, client):
+    store = CandleStore(path=str(tmp_path))
+    klines = client.get_klines(symbol=SYMBOL, interval=INTERVAL, limit=600)
+    store.append(SYMBOL, INTERVAL, klines[:100])
+    store.append(SYMBOL, INTERVAL, klines[390:-1])
+    services = BacktestApplicationServices(
+        backtest_domain_services=BacktestDomainServices(),
+        exchange_client=FakeExchange(client),
+        candle_store=store,
+    )
+    history = services.load_stored_price_history([SYMBOL], start_ms=klines[0][0])
+    expected = np.array([float(kline[4]) for kline in klines[:-1]])
+    assert list(history.timestamps) == [kline[0] for kline in klines[:-1]]
+    np.testing.assert_allclose(history.closes[0], expected)
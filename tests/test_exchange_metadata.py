@@ -0,0 +1,55 @@
+# Python imports
+from decimal import Decimal
+import pytest
+
+# App imports
+from src.adapters.exchange_metadata import SymbolInfo
+from src.adapters.fakes import (
+    FakeBinanceClient,
+    FakeExchange,
+)
+
+SYMBOL = 'SYM0USDT'
+
+
+@pytest.fixture
+def exchange():
+    # The fake lists every symbol with a 0.00001 lot step and a notional minimum of 5
+    return FakeExchange(FakeBinanceClient(symbols=[SYMBOL]))
+
+
+def test_quantity_keeps_lots_finer_than_four_decimals(exchange):
+    assert exchange.quantize_quantity(SYMBOL, 0.00123456) == Decimal('0.00123')
+
+
+def test_quantity_rounds_down_to_the_lot_step(exchange):
+    # Rounding half-even to four decimals would give 0.1235, more than is held
+    assert exchange.quantize_quantity(SYMBOL, 0.12349999) == Decimal('0.12349')
+
+
+def test_quantity_below_the_minimum_is_rejected(exchange):
+    with pytest.raises(ValueError):
+        exchange.quantize_quantity(SYMBOL, 0.000009)
+
+
+def test_notional_below_the_minimum_is_rejected(exchange):
+    assert exchange.quantize_quantity(SYMBOL, 0.1, price=50.0) == Decimal('0.1')
+    with pytest.raises(ValueError):
+        exchange.quantize_quantity(SYMBOL, 0.09, price=50.0)
+
+
+def test_create_order_sends_the_quantized_quantity(exchange):
+    exchange.create_order(SYMBOL, 'SELL', 0.12349999, price=100.0)
+    assert exchange.client.orders[-1]['quantity'] == '0.12349'
+
+
+def test_symbol_info_parses_the_notional_filter():
+    info = SymbolInfo.from_exchange_info({
+        'symbol': 'BTCUSDT',
+        'filters': [
+            {'filterType': 'LOT_SIZE', 'stepSize': '0.00001000', 'minQty': '0.00001000'},
+            {'filterType': 'NOTIONAL', 'minNotional': '5.00000000'},
+        ],
+    })
+    assert info.step_size == Decimal('0.00001')
+    assert info.min_notional == Decimal('5')
@@ -0,0 +1,192 @@
+# Python imports
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import RSIIndicator
+from ta.trend import EMAIndicator
+from ta.volatility import BollingerBands
+
+# App imports
+from src.adapters import exchange as exchange_module
+from src.adapters.candles import klines_to_candles
+from src.adapters.fakes import (
+    FakeBinanceClient,
+    FakeExchange,
+    FakeRedisAdapter,
+    FakeTelegramAdapter,
+)
+from src.adapters.kline_cache import (
+    INTERVAL_MS,
+    KlineCache,
+)
+from src.domain.calculator.services import IndicatorCalculatorDomainServices
+from src.domain.calculator.streaming import StreamingIndicatorEngine
+from src.domain.calculator.value_objects import StrategyParameters
+from src.domain.trading.services import TradingDomainServices
+from src.application.calculator.services import IndicatorCalculatorApplicationServices
+from src.application.trading.services import TradingApplicationServices
+
+# Latest-only values are compared with the last row of the `ta` series
+RELATIVE_TOLERANCE = 1e-9
+
+
+def close_prices(length: int, seed: int = 7) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, length))))
+
+
+@pytest.fixture
+def services():
+    return IndicatorCalculatorDomainServices(parameters=StrategyParameters())
+
+
+@pytest.mark.parametrize('length', [200, 288, 1000])
+def test_trend_indicators_match_ta(services, length):
+    closes = close_prices(length)
+    indicators = services.apply_trend_indicators(closes)
+    parameters = services.parameters
+    rsi = RSIIndicator(close=closes, window=parameters.rsi_window).rsi().iloc[-1]
+    ema = EMAIndicator(close=closes, window=parameters.ema_window).ema_indicator().iloc[-1]
+    assert indicators.rsi == pytest.approx(rsi, rel=RELATIVE_TOLERANCE)
+    assert indicators.ema == pytest.approx(ema, rel=RELATIVE_TOLERANCE)
+
+
+@pytest.mark.parametrize('length', [20, 288, 1000])
+def test_bollinger_bands_match_ta(services, length):
+    closes = close_prices(length)
+    indicators = services.apply_bollinger_bands_indicators(closes)
+    bb = BollingerBands(
+        close=closes,
+        window=services.parameters.bb_window,
+        window_dev=services.parameters.bb_window_dev,
+    )
+    assert indicators.upper == pytest.approx(bb.bollinger_hband().iloc[-1], rel=RELATIVE_TOLERANCE)
+    assert indicators.lower == pytest.approx(bb.bollinger_lband().iloc[-1], rel=RELATIVE_TOLERANCE)
+    assert indicators.mavg == pytest.approx(bb.bollinger_mavg().iloc[-1], rel=RELATIVE_TOLERANCE)
+
+
+def test_rsi_of_a_rising_series_is_100(services):
+    closes = pd.Series(np.arange(1, 101, dtype=float))
+    assert services.apply_trend_indicators(closes).rsi == 100.0
+
+
+def test_short_series_are_nan(services):
+    closes = close_prices(services.parameters.ema_window - 1)
+    indicators = services.apply_trend_indicators(closes)
+    assert np.isnan(indicators.ema)
+    assert not np.isnan(indicators.rsi)
+
+
+def test_batch_indicators_match_single_symbol(services):
+    matrix = np.vstack([close_prices(288, seed=seed).to_numpy() for seed in range(5)])
+    batch = services.apply_batch_indicators(matrix)
+    for row, closes in enumerate(matrix):
+        trend = services.apply_trend_indicators(closes)
+        bands = services.apply_bollinger_bands_indicators(closes)
+        assert batch.rsi[row] == pytest.approx(trend.rsi, rel=RELATIVE_TOLERANCE)
+        assert batch.ema[row] == pytest.approx(trend.ema, rel=RELATIVE_TOLERANCE)
+        assert batch.upper[row] == pytest.approx(bands.upper, rel=RELATIVE_TOLERANCE)
+        assert batch.lower[row] == pytest.approx(bands.lower, rel=RELATIVE_TOLERANCE)
+
+
+def candles(closes: np.ndarray, start: int = 0) -> list:
+    return [(start + i, float(close)) for i, close in enumerate(closes)]
+
+
+@pytest.mark.parametrize('lookback', [20, 168, 200, 288])
+def test_streaming_engine_matches_ta_over_trailing_windows(lookback):
+    closes = close_prices(1500).to_numpy()
+    engine = StreamingIndicatorEngine(capacity=1000)
+    engine.reset('SYM', '5m', candles(closes[:500]))
+    parameters = engine.parameters
+    for t in range(500, 1500, 97):
+        engine.extend('SYM', '5m', candles(closes[500:t + 1], start=500))
+        window = pd.Series(closes[t - lookback + 1:t + 1])
+        trend, bands = engine.latest('SYM', '5m', lookback, t - lookback + 1, t, closes[t])
+        rsi = RSIIndicator(close=window, window=parameters.rsi_window).rsi().iloc[-1]
+        ema = EMAIndicator(close=window, window=parameters.ema_window).ema_indicator().iloc[-1]
+        bb = BollingerBands(close=window, window=parameters.bb_window, window_dev=parameters.bb_window_dev)
+        assert trend.rsi == pytest.approx(rsi, rel=RELATIVE_TOLERANCE)
+        if np.isnan(ema):
+            assert np.isnan(trend.ema)
+        else:
+            assert trend.ema == pytest.approx(ema, rel=RELATIVE_TOLERANCE)
+        assert bands.upper == pytest.approx(bb.bollinger_hband().iloc[-1], rel=RELATIVE_TOLERANCE)
+        assert bands.lower == pytest.approx(bb.bollinger_lband().iloc[-1], rel=RELATIVE_TOLERANCE)
+        assert bands.mavg == pytest.approx(bb.bollinger_mavg().iloc[-1], rel=RELATIVE_TOLERANCE)
+
+
+def test_streaming_engine_previews_the_open_candle(services):
+    closes = close_prices(600).to_numpy()
+    engine = StreamingIndicatorEngine(capacity=1000)
+    engine.reset('SYM', '5m', candles(closes[:-1]))
+    # The window ends with a candle the engine has not seen closing yet
+    trend, bands = engine.latest('SYM', '5m', 288, 600 - 288, 599, closes[-1])
+    window = closes[-288:]
+    expected_trend = services.apply_trend_indicators(window)
+    expected_bands = services.apply_bollinger_bands_indicators(window)
+    assert trend.rsi == pytest.approx(expected_trend.rsi, rel=RELATIVE_TOLERANCE)
+    assert trend.ema == pytest.approx(expected_trend.ema, rel=RELATIVE_TOLERANCE)
+    assert bands.upper == pytest.approx(expected_bands.upper, rel=RELATIVE_TOLERANCE)
+    assert bands.lower == pytest.approx(expected_bands.lower, rel=RELATIVE_TOLERANCE)
+    # Previewing leaves the history as it was
+    assert engine.latest('SYM', '5m', 288, 599 - 288, 598, closes[-2]) is not None
+
+
+def test_streaming_engine_only_serves_windows_it_holds():
+    engine = StreamingIndicatorEngine(capacity=300)
+    engine.reset('SYM', '5m', candles(close_prices(1000).to_numpy()))
+    # Longer than the history, starting elsewhere, ending before the newest candle, or an unknown key
+    assert engine.latest('SYM', '5m', 400, 600, 999, 1.0) is None
+    assert engine.latest('SYM', '5m', 288, 700, 999, 1.0) is None
+    assert engine.latest('SYM', '5m', 288, 710, 997, 1.0) is None
+    assert engine.latest('OTHER', '5m', 288, 712, 999, 1.0) is None
+
+
+def test_kline_cache_feeds_the_engine_used_by_the_services():
+    engine = StreamingIndicatorEngine(capacity=1000)
+    kline_cache = KlineCache(max_candles=1000, indicators=engine)
+    client = FakeBinanceClient(symbols=['SYM0USDT'])
+    step = INTERVAL_MS['5m']
+    klines = client.get_klines('SYM0USDT', '5m', limit=400)
+    kline_cache.replace('SYM0USDT', '5m', klines[:-1])
+    client.advance(step)
+    kline_cache.extend('SYM0USDT', '5m', client.get_klines('SYM0USDT', '5m', limit=3)[:-1])
+    cached = kline_cache.get('SYM0USDT', '5m')
+    window = klines_to_candles(cached[-288:], fields=('close',))
+    services = IndicatorCalculatorDomainServices(parameters=StrategyParameters(), streaming_indicators=engine)
+    trend, bands = services.apply_streaming_indicators('SYM0USDT', '5m', window.array('timestamp'), window['close'])
+    assert trend.ema == pytest.approx(services.apply_trend_indicators(window['close']).ema, rel=RELATIVE_TOLERANCE)
+    assert bands.mavg == pytest.approx(services.apply_bollinger_bands_indicators(window['close']).mavg, rel=RELATIVE_TOLERANCE)
+    # A strategy with other windows, or one keeping a tail, computes its own
+    other = IndicatorCalculatorDomainServices(parameters=StrategyParameters(ema_window=50), streaming_indicators=engine)
+    assert other.apply_streaming_indicators('SYM0USDT', '5m', window.array('timestamp'), window['close']) is None
+    kline_cache.retain([])
+    assert services.apply_streaming_indicators('SYM0USDT', '5m', window.array('timestamp'), window['close']) is None
+
+
+def test_market_indicators_are_read_from_the_engine_fed_by_the_exchange(monkeypatch):
+    engine = StreamingIndicatorEngine(capacity=1000)
+    client = FakeBinanceClient(symbols=['SYM0USDT'])
+    monkeypatch.setattr(exchange_module.time, 'time', lambda: client.now_ms / 1000)
+    exchange = FakeExchange(client, kline_cache=KlineCache(max_candles=1000, indicators=engine))
+    calculator = IndicatorCalculatorDomainServices(parameters=StrategyParameters(), streaming_indicators=engine)
+    trading_app_services = TradingApplicationServices(
+        calculator_indicator_app_services=IndicatorCalculatorApplicationServices(calculator),
+        trading_domain_services=TradingDomainServices(
+            exchange_client=exchange,
+            redis_client=FakeRedisAdapter(),
+            telegram_adapter=FakeTelegramAdapter(),
+        ),
+    )
+    hd, expected_trend, expected_bands = trading_app_services.get_market_indicators('SYM0USDT', '5m', 288)
+    client.advance(INTERVAL_MS['5m'])
+
+    def recompute(*args, **kwargs):
+        raise AssertionError("indicators recomputed over the whole window")
+    monkeypatch.setattr(calculator, 'apply_trend_indicators', recompute)
+    monkeypatch.setattr(calculator, 'apply_bollinger_bands_indicators', recompute)
+    hd, trend, bands = trading_app_services.get_market_indicators('SYM0USDT', '5m', 288)
+    monkeypatch.undo()
+    assert trend.ema == pytest.approx(calculator.apply_trend_indicators(hd['close']).ema, rel=RELATIVE_TOLERANCE)
+    assert bands.upper == pytest.approx(calculator.apply_bollinger_bands_indicators(hd['close']).upper, rel=RELATIVE_TOLERANCE)
@@ -0,0 +1,117 @@
+# Python imports
+import json
+import struct
+import pytest
+
+# App imports
+from src.adapters.fakes import FakeBinanceClient
+from src.adapters.kline_cache import KlineCache
+from src.adapters.kline_snapshot import (
+    SNAPSHOT_MAGIC,
+    SNAPSHOT_PREAMBLE,
+    SNAPSHOT_VERSION,
+    FileSnapshotStore,
+    KlineSnapshotter,
+    SnapshotError,
+    decode_snapshot,
+    encode_snapshot,
+)
+from src.domain.calculator.streaming import StreamingIndicatorEngine
+
+SYMBOLS = ['SYM0USDT', 'SYM1USDT']
+INTERVAL = '5m'
+LOOKBACK = 288
+
+
+def numeric(kline: list) -> list:
+    """A REST kline row with its string fields parsed, as the snapshot restores it"""
+    return [
+        int(value) if index in (0, 6, 8) else float(value)
+        for index, value in enumerate(kline[:11])
+    ] + [0]
+
+
+def cached_buffers(client: FakeBinanceClient) -> dict:
+    return {
+        (symbol, INTERVAL): [numeric(kline) for kline in client.get_klines(symbol, INTERVAL, limit=LOOKBACK)[:-1]]
+        for symbol in SYMBOLS
+    }
+
+
+def test_buffers_round_trip_exactly():
+    buffers = cached_buffers(FakeBinanceClient(symbols=SYMBOLS))
+    # Values without a short decimal form, and extremes of the float range
+    buffers[('SYM0USDT', INTERVAL)][-1][4] = 0.1 + 0.2
+    buffers[('SYM0USDT', INTERVAL)][-2][4] = 5e-324
+    buffers[('SYM0USDT', INTERVAL)][-3][4] = -1.7976931348623157e308
+    header, decoded = decode_snapshot(encode_snapshot(buffers, created_ms=123))
+    assert header['created_ms'] == 123
+    assert decoded == buffers
+    assert all(
+        type(restored) is type(original)
+        for key in buffers
+        for restored_row, original_row in zip(decoded[key], buffers[key])
+        for restored, original in zip(restored_row, original_row)
+    )
+
+
+def test_snapshots_of_another_version_or_layout_are_rejected():
+    data = encode_snapshot(cached_buffers(FakeBinanceClient(symbols=SYMBOLS)))
+    _, _, header_length = SNAPSHOT_PREAMBLE.unpack_from(data)
+    body = data[SNAPSHOT_PREAMBLE.size:]
+    with pytest.raises(SnapshotError, match="version"):
+        decode_snapshot(SNAPSHOT_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION + 1, header_length) + body)
+    header = json.loads(body[:header_length])
+    header['columns'] = header['columns'][:-1]
+    encoded_header = json.dumps(header).encode()
+    with pytest.raises(SnapshotError, match="columns"):
+        decode_snapshot(
+            SNAPSHOT_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(encoded_header))
+            + encoded_header
+            + body[header_length:]
+        )
+    with pytest.raises(SnapshotError):
+        decode_snapshot(b'JSON' + data[4:])
+    with pytest.raises(SnapshotError):
+        decode_snapshot(data[:struct.calcsize('<4s')])
+
+
+def test_a_rejected_snapshot_leaves_the_cache_cold(tmp_path):
+    store = FileSnapshotStore(str(tmp_path / 'klines.snapshot'))
+    store.save(b'KSNP' + b'\x00' * 16)
+    cache = KlineCache()
+    assert KlineSnapshotter(cache, store).restore() == 0
+    assert cache.items() == []
+
+
+def test_an_empty_cache_does_not_overwrite_the_snapshot(tmp_path):
+    store = FileSnapshotStore(str(tmp_path / 'klines.snapshot'))
+    cache = KlineCache()
+    for (symbol, interval), klines in cached_buffers(FakeBinanceClient(symbols=SYMBOLS)).items():
+        cache.replace(symbol, interval, klines)
+    assert KlineSnapshotter(cache, store).save() > 0
+    saved = store.load()
+    assert KlineSnapshotter(KlineCache(), store).save() == 0
+    assert store.load() == saved
+
+
+def test_restore_only_seeds_empty_buffers_and_rebuilds_their_indicators(tmp_path):
+    client = FakeBinanceClient(symbols=SYMBOLS)
+    buffers = cached_buffers(client)
+    store = FileSnapshotStore(str(tmp_path / 'klines.snapshot'))
+    store.save(encode_snapshot(buffers))
+    engine = StreamingIndicatorEngine(capacity=1000)
+    cache = KlineCache(indicators=engine)
+    # Fetched before the restore, so newer than the snapshot
+    fresh = buffers[('SYM1USDT', INTERVAL)][1:]
+    cache.replace('SYM1USDT', INTERVAL, fresh)
+    assert KlineSnapshotter(cache, store).restore() == 1
+    assert cache.get('SYM0USDT', INTERVAL) == buffers[('SYM0USDT', INTERVAL)]
+    assert cache.get('SYM1USDT', INTERVAL) == fresh
+    # The indicator state is not stored; seeding the cache rebuilds it from the restored candles
+    restored = buffers[('SYM0USDT', INTERVAL)]
+    expected = StreamingIndicatorEngine(capacity=1000)
+    expected.reset('SYM0USDT', INTERVAL, [(kline[0], kline[4]) for kline in restored])
+    window = (len(restored), restored[0][0], restored[-1][0], restored[-1][4])
+    assert engine.latest('SYM0USDT', INTERVAL, *window) == expected.latest('SYM0USDT', INTERVAL, *window)
+    assert engine.latest('SYM0USDT', INTERVAL, *window) is not None
@@ -0,0 +1,105 @@
+# Python imports
+import asyncio
+import pytest
+
+# App imports
+import main
+from src.adapters.fakes import (
+    FakeBinanceClient,
+    FakeExchange,
+    FakeRedisAdapter,
+    FakeTelegramAdapter,
+)
+from src.application.bootstrap import TradingBotApp
+from src.domain.calculator.value_objects import StrategyParameters
+from src.domain.trading.value_objects import PortfolioConfig
+
+WATCHLIST = ['SYM0USDT', 'SYM1USDT', 'SYM2USDT']
+
+
+def portfolio_config(name: str, initial_asset: str, **kwargs) -> PortfolioConfig:
+    return PortfolioConfig(
+        name=name,
+        state_key=f"bot:state:{name}",
+        trades_key=f"bot:trades:{name}",
+        initial_asset=initial_asset,
+        parameters=StrategyParameters(),
+        **kwargs,
+    )
+
+
+def build_app(portfolio_configs: list, **components) -> TradingBotApp:
+    components.setdefault('exchange', FakeExchange(FakeBinanceClient(symbols=WATCHLIST)))
+    return TradingBotApp(
+        redis_client=FakeRedisAdapter(),
+        async_redis_client=None,
+        async_exchange=None,
+        scan_queue=None,
+        telegram=FakeTelegramAdapter(),
+        kline_snapshot=None,
+        metrics_server=None,
+        watchlist=WATCHLIST,
+        portfolio_configs=portfolio_configs,
+        **components,
+    )
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = build_app(
+        [portfolio_config('main', 'SYM0'), portfolio_config('parked', 'USDT', account='sub')],
+        account_exchanges={'sub': FakeExchange(FakeBinanceClient(symbols=WATCHLIST))},
+    )
+    monkeypatch.setattr(main, 'app', app)
+    return app
+
+
+def test_held_symbols_skip_portfolios_parked_in_usdt(app):
+    assert asyncio.run(main.get_held_symbols()) == ['SYM0USDT']
+    assert asyncio.run(main.get_tracked_symbols()) == WATCHLIST
+
+
+def test_portfolios_trade_on_their_own_account():
+    main_client = FakeBinanceClient(symbols=WATCHLIST, balances={'SYM0': 1.0})
+    sub_client = FakeBinanceClient(symbols=WATCHLIST, balances={'SYM0': 3.0})
+    app = build_app(
+        [
+            portfolio_config('main', 'SYM0'),
+            portfolio_config('sub', 'SYM0', account='sub', watchlist=['SYM1USDT']),
+        ],
+        exchange=FakeExchange(main_client),
+        account_exchanges={'sub': FakeExchange(sub_client)},
+    )
+    balances = [portfolio.trading_app_services.get_asset_balance(asset='SYM0') for portfolio in app.portfolios]
+    assert balances == [1.0, 3.0]
+    assert app.portfolios[1].watchlist == ['SYM1USDT']
+
+
+def test_portfolios_sharing_an_account_cannot_hold_the_same_asset():
+    app = build_app([portfolio_config('main', 'SYM0'), portfolio_config('alt', 'SYM1')])
+    with pytest.raises(ValueError, match="can both hold"):
+        app.portfolios
+
+
+def test_portfolios_sharing_an_account_with_disjoint_assets_are_allowed():
+    app = build_app(
+        [
+            portfolio_config('main', 'SYM0', watchlist=['SYM1USDT']),
+            portfolio_config('alt', 'SYM2', watchlist=[]),
+        ],
+        conversion_router=None,
+    )
+    assert [portfolio.config.name for portfolio in app.portfolios] == ['main', 'alt']
+
+
+def test_portfolio_config_reads_account_and_watchlist():
+    config = PortfolioConfig.from_dict(
+        {'name': 'alt', 'account': 'sub', 'watchlist': 'SYM1USDT,SYM2USDT'},
+        state_key_prefix='bot:state',
+        trades_key_prefix='bot:trades',
+        initial_asset='SYM0',
+        parameters=StrategyParameters(),
+    )
+    assert config.account == 'sub'
+    assert config.watchlist == ['SYM1USDT', 'SYM2USDT']
+    assert PortfolioConfig.from_dict({'name': 'main'}, 'bot:state', 'bot:trades', 'SYM0', StrategyParameters()).account is None
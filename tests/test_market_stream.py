@@ -0,0 +1,240 @@
+# Python imports
+import asyncio
+import json
+import time
+import websockets
+
+# App imports
+from src.adapters.fakes import (
+    FakeBinanceClient,
+    FakeExchange,
+)
+from src.adapters.kline_cache import (
+    INTERVAL_MS,
+    OPEN_TIME_INDEX,
+    KlineCache,
+)
+from src.adapters.market_stream import KlineStream
+
+SYMBOL = 'SYM0USDT'
+INTERVAL = '1m'
+LOOKBACK = 30
+STEP = INTERVAL_MS[INTERVAL]
+
+
+def kline_event(row: list, closed: bool = True) -> str:
+    """Combined-stream kline message for a REST-style kline row"""
+    return json.dumps({
+        'stream': f"{SYMBOL.lower()}@kline_{INTERVAL}",
+        'data': {
+            'e': 'kline',
+            's': SYMBOL,
+            'k': {
+                't': row[0], 'o': row[1], 'h': row[2], 'l': row[3], 'c': row[4], 'v': row[5],
+                'T': row[6], 'q': row[7], 'n': row[8], 'V': row[9], 'Q': row[10], 'B': row[11],
+                's': SYMBOL, 'i': INTERVAL, 'x': closed,
+            },
+        },
+    })
+
+
+class StandInServer:
+    """Local websocket server playing one scripted session per connection"""
+
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        self.paths = []
+
+    async def handler(self, connection):
+        self.paths.append(connection.request.path)
+        session = self.sessions.pop(0) if self.sessions else None
+        if session is None:
+            await connection.wait_closed()
+            return
+        await session(connection)
+
+    async def run(self, scenario):
+        async with websockets.serve(self.handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            await asyncio.wait_for(scenario(f"ws://127.0.0.1:{port}"), timeout=10)
+
+
+def build_stream(ws_url: str, closes: list, symbols=(SYMBOL,)):
+    # The fake exchange shares the wall clock, as the stream compares candle times with it
+    client = FakeBinanceClient(symbols=list(symbols), now_ms=int(time.time() * 1000))
+    cache = KlineCache(max_candles=100)
+    exchange = FakeExchange(client, kline_cache=cache)
+
+    async def on_candle_close(symbol: str, interval: str, row: list):
+        closes.append(row)
+
+    stream = KlineStream(
+        exchange=exchange,
+        kline_cache=cache,
+        ws_url=ws_url,
+        on_candle_close=on_candle_close,
+        reconnect_delay=0.01,
+    )
+    stream.subscribe([SYMBOL], INTERVAL, LOOKBACK)
+    return client, cache, stream
+
+
+async def resynced(cache: KlineCache, symbol: str = SYMBOL):
+    """Wait until the stream has backfilled the buffer after connecting"""
+    while not cache.is_streaming(symbol, INTERVAL):
+        await asyncio.sleep(0.01)
+
+
+def open_candle(client: FakeBinanceClient) -> list:
+    return client.get_klines(symbol=SYMBOL, interval=INTERVAL, limit=1)[-1]
+
+
+def assert_contiguous(klines: list):
+    opens = [int(row[OPEN_TIME_INDEX]) for row in klines]
+    assert all(later - earlier == STEP for earlier, later in zip(opens, opens[1:]))
+
+
+def test_connect_resyncs_and_reports_candle_closes():
+    closes = []
+
+    async def scenario(ws_url):
+        client, cache, stream = build_stream(ws_url, closes)
+
+        async def session(connection):
+            await resynced(cache)
+            # The buffer was backfilled over REST before streaming
+            assert cache.size(SYMBOL, INTERVAL) == LOOKBACK - 1
+            row = open_candle(client)
+            await connection.send(kline_event(row, closed=False))
+            await connection.send(kline_event(row, closed=True))
+            await stream.stop()
+
+        server.sessions.append(session)
+        await stream.run()
+        assert len(closes) == 1
+        assert cache.get(SYMBOL, INTERVAL)[-1] == closes[0]
+        assert cache.get_live(SYMBOL, INTERVAL) is None
+        assert_contiguous(cache.get(SYMBOL, INTERVAL))
+
+    server = StandInServer([])
+    asyncio.run(server.run(scenario))
+    assert server.paths == [f"/stream?streams={SYMBOL.lower()}@kline_{INTERVAL}"]
+
+
+def test_gap_triggers_a_resync_of_the_key():
+    closes = []
+
+    async def scenario(ws_url):
+        client, cache, stream = build_stream(ws_url, closes)
+
+        async def session(connection):
+            await resynced(cache)
+            # Lose the two newest closed candles, as if their messages were dropped
+            cache.replace(SYMBOL, INTERVAL, cache.get(SYMBOL, INTERVAL)[:-2])
+            requests = client.requests
+            await connection.send(kline_event(open_candle(client)))
+            await asyncio.sleep(0.1)
+            assert client.requests > requests
+            await stream.stop()
+
+        server.sessions.append(session)
+        await stream.run()
+        assert len(closes) == 1
+        klines = cache.get(SYMBOL, INTERVAL)
+        assert klines[-1] == closes[0]
+        assert_contiguous(klines)
+
+    server = StandInServer([])
+    asyncio.run(server.run(scenario))
+
+
+def test_reconnects_and_resyncs_after_a_dropped_connection():
+    closes = []
+
+    async def scenario(ws_url):
+        client, cache, stream = build_stream(ws_url, closes)
+        requests = []
+
+        async def dropped(connection):
+            await resynced(cache)
+            requests.append(client.requests)
+            await connection.close()
+
+        async def recovered(connection):
+            await resynced(cache)
+            requests.append(client.requests)
+            await connection.send(kline_event(open_candle(client)))
+            await stream.stop()
+
+        server.sessions.extend([dropped, recovered])
+        await stream.run()
+        # The second connection backfilled again before streaming
+        assert requests[1] > requests[0]
+        assert len(closes) == 1
+        assert not cache.is_streaming(SYMBOL, INTERVAL)
+
+    server = StandInServer([])
+    asyncio.run(server.run(scenario))
+    assert len(server.paths) == 2
+
+
+def test_a_key_failing_to_resync_does_not_hold_back_the_others():
+    closes = []
+
+    async def scenario(ws_url):
+        client, cache, stream = build_stream(ws_url, closes)
+        # Not listed on the exchange, so its backfill fails
+        stream.subscribe(['USDTUSDT'], INTERVAL, LOOKBACK)
+
+        async def session(connection):
+            await resynced(cache)
+            await connection.send(kline_event(open_candle(client)))
+            await stream.stop()
+
+        server.sessions.append(session)
+        await stream.run()
+        assert len(closes) == 1
+        assert cache.size('USDTUSDT', INTERVAL) == 0
+
+    server = StandInServer([])
+    asyncio.run(server.run(scenario))
+    assert len(server.paths) == 1
+
+
+def test_resubscribing_reconnects_to_the_new_streams():
+    closes = []
+    parked = 'BTCUSDT'
+
+    async def scenario(ws_url):
+        client, cache, stream = build_stream(ws_url, closes, symbols=(SYMBOL, parked))
+
+        async def before(connection):
+            await resynced(cache)
+            # Same streams: the connection is kept
+            assert not await stream.resubscribe([SYMBOL], {INTERVAL: LOOKBACK})
+            # A portfolio got parked in BTC by a failed route leg
+            assert await stream.resubscribe([SYMBOL, parked], {INTERVAL: LOOKBACK})
+            await connection.wait_closed()
+
+        async def after(connection):
+            await resynced(cache, parked)
+            assert cache.size(parked, INTERVAL) == LOOKBACK - 1
+            await stream.resubscribe([parked], {INTERVAL: LOOKBACK})
+            await connection.wait_closed()
+
+        async def dropped(connection):
+            await resynced(cache, parked)
+            # The stream of the symbol no longer tracked is not served anymore
+            assert not cache.is_streaming(SYMBOL, INTERVAL)
+            await stream.stop()
+
+        server.sessions.extend([before, after, dropped])
+        await stream.run()
+
+    server = StandInServer([])
+    asyncio.run(server.run(scenario))
+    assert server.paths == [
+        f"/stream?streams={SYMBOL.lower()}@kline_{INTERVAL}",
+        f"/stream?streams={SYMBOL.lower()}@kline_{INTERVAL}/{parked.lower()}@kline_{INTERVAL}",
+        f"/stream?streams={parked.lower()}@kline_{INTERVAL}",
+    ]
@@ -0,0 +1,57 @@
+# Python imports
+import asyncio
+import time
+
+# App imports
+from src.adapters.fakes import (
+    FakeBinanceClient,
+    FakeExchange,
+    FakeRedisAdapter,
+    FakeTelegramAdapter,
+)
+from src.adapters.rate_limiter import (
+    RETRY_AFTER_HEADER,
+    RequestWeightLimiter,
+)
+from src.domain.trading.entities import TradingOrderFactory
+from src.domain.trading.services import TradingDomainServices
+
+SYMBOL = 'SYM0USDT'
+BAN_SECONDS = 0.3
+
+
+def test_ban_blocks_requests_until_retry_after():
+    limiter = RequestWeightLimiter(limit=100)
+    limiter.update({RETRY_AFTER_HEADER: str(BAN_SECONDS)}, status=429)
+    started = time.monotonic()
+    limiter.acquire(1)
+    assert time.monotonic() - started >= BAN_SECONDS - 0.05
+
+
+def test_order_waiting_on_the_limiter_leaves_the_event_loop_running():
+    limiter = RequestWeightLimiter(limit=100)
+    trading_domain_services = TradingDomainServices(
+        exchange_client=FakeExchange(FakeBinanceClient(symbols=[SYMBOL]), rate_limiter=limiter),
+        redis_client=FakeRedisAdapter(),
+        telegram_adapter=FakeTelegramAdapter(),
+        initial_asset='SYM0',
+    )
+    order = TradingOrderFactory.create_order(symbol=SYMBOL, side='SELL', quantity=1000.0, usd_amount=350.0, profit=0.0)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beating = asyncio.create_task(heartbeat())
+        limiter.update({RETRY_AFTER_HEADER: str(BAN_SECONDS)}, status=429)
+        await trading_domain_services.place_order(order)
+        beating.cancel()
+        return ticks
+
+    # The heartbeat keeps ticking for the whole ban
+    assert asyncio.run(scenario()) >= BAN_SECONDS / 0.01 / 2
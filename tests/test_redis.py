@@ -0,0 +1,148 @@
+# Python imports
+import asyncio
+import fakeredis
+import pytest
+
+# App imports
+from src.adapters.redis import (
+    AsyncRedisAdapter,
+    RedisAdapter,
+)
+from src.domain.trading.value_objects import TRADING_STATE_SCHEMA
+
+
+class PipelineSpy:
+    """Wraps a client to record the pipelines it opens and when they are executed"""
+
+    def __init__(self, client):
+        self.client = client
+        self.transactions = []
+        self.executed = 0
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def pipeline(self, transaction=True):
+        self.transactions.append(transaction)
+        pipeline = self.client.pipeline(transaction=transaction)
+        execute = pipeline.execute
+
+        def counted_execute(*args, **kwargs):
+            self.executed += 1
+            return execute(*args, **kwargs)
+
+        pipeline.execute = counted_execute
+        return pipeline
+
+
+@pytest.fixture
+def adapter():
+    adapter = RedisAdapter()
+    adapter.redis = fakeredis.FakeRedis(decode_responses=True)
+    return adapter
+
+
+def test_schema_fields_decode_negative_and_exponent_numbers(adapter):
+    adapter.set_state('bot:state', {'current_asset': 'ETH', 'entry_price': -1.5e-07})
+    assert adapter.redis.hget('bot:state', 'entry_price') == '-1.5e-07'
+    state = adapter.get_state('bot:state', TRADING_STATE_SCHEMA)
+    assert state == {'current_asset': 'ETH', 'entry_price': -1.5e-07}
+    # Without a schema, numbers are still recognised and words left alone
+    adapter.set_state('bot:other', {'current_asset': 'NaN', 'entry_price': -1.5e-07})
+    assert adapter.get_state('bot:other') == {'current_asset': 'NaN', 'entry_price': -1.5e-07}
+
+
+def test_get_or_init_state_fills_a_cold_start_and_keeps_existing_fields(adapter):
+    defaults = {'current_asset': 'USDT', 'entry_price': 0.0}
+    assert adapter.get_or_init_state('bot:state', defaults, TRADING_STATE_SCHEMA) == defaults
+    adapter.set_state('bot:state', {'current_asset': 'ETH', 'entry_price': 2500.5})
+    assert adapter.get_or_init_state('bot:state', defaults, TRADING_STATE_SCHEMA) == {
+        'current_asset': 'ETH',
+        'entry_price': 2500.5,
+    }
+    # A partially written hash only gets its missing fields
+    adapter.redis.hset('bot:partial', 'current_asset', 'SOL')
+    assert adapter.get_or_init_state('bot:partial', defaults, TRADING_STATE_SCHEMA) == {
+        'current_asset': 'SOL',
+        'entry_price': 0.0,
+    }
+
+
+def test_get_states_reads_several_hashes_in_one_pipeline(adapter):
+    adapter.set_state('account:a', {'current_asset': 'ETH', 'entry_price': 2500.5})
+    adapter.redis = PipelineSpy(adapter.redis)
+    states = adapter.get_states(['account:a', 'account:b'], TRADING_STATE_SCHEMA)
+    assert states == {'account:a': {'current_asset': 'ETH', 'entry_price': 2500.5}, 'account:b': None}
+    assert adapter.redis.transactions == [False]
+    assert adapter.redis.executed == 1
+
+
+def test_push_record_and_set_state_is_a_single_transaction(adapter):
+    adapter.set_state('bot:state', {'current_asset': 'USDT', 'entry_price': 0.0, 'stale': 'field'})
+    adapter.redis = PipelineSpy(adapter.redis)
+    record = {'symbol': 'ETHUSDT', 'side': 'buy', 'price': 2500.5}
+    adapter.push_record_and_set_state('bot:trades', record, 'bot:state', {'current_asset': 'ETH', 'entry_price': 2500.5})
+    assert adapter.redis.transactions == [True]
+    assert adapter.redis.executed == 1
+    assert adapter.get_records('bot:trades') == [record]
+    # The state hash is replaced, not merged
+    assert adapter.get_state('bot:state', TRADING_STATE_SCHEMA) == {'current_asset': 'ETH', 'entry_price': 2500.5}
+
+
+def test_a_failed_transaction_applies_neither_write(adapter, monkeypatch):
+    adapter.set_state('bot:state', {'current_asset': 'USDT', 'entry_price': 0.0})
+    client = adapter.redis
+    pipeline_factory = client.pipeline
+
+    def failing_pipeline(transaction=True):
+        pipeline = pipeline_factory(transaction=transaction)
+
+        def lost_connection(*args, **kwargs):
+            raise ConnectionError("connection lost before EXEC")
+
+        pipeline.execute = lost_connection
+        return pipeline
+
+    monkeypatch.setattr(client, 'pipeline', failing_pipeline, raising=False)
+    with pytest.raises(ConnectionError):
+        adapter.push_record_and_set_state('bot:trades', {'side': 'buy'}, 'bot:state', {'current_asset': 'ETH'})
+    assert adapter.get_records('bot:trades') == []
+    assert adapter.get_state('bot:state', TRADING_STATE_SCHEMA) == {'current_asset': 'USDT', 'entry_price': 0.0}
+
+
+def test_async_adapter_reads_and_writes_state_like_the_sync_one():
+    adapter = AsyncRedisAdapter(client=fakeredis.FakeAsyncRedis(decode_responses=True))
+    defaults = {'current_asset': 'USDT', 'entry_price': 0.0}
+    record = {'symbol': 'ETHUSDT', 'side': 'buy', 'price': 2500.5}
+
+    async def scenario():
+        cold = await adapter.get_or_init_state('bot:state', defaults, TRADING_STATE_SCHEMA)
+        await adapter.set_state('bot:state', {'entry_price': -1.5e-07})
+        updated = await adapter.get_state('bot:state', TRADING_STATE_SCHEMA)
+        await adapter.push_record_and_set_state('bot:trades', record, 'bot:state', {'current_asset': 'ETH'})
+        states = await adapter.get_states(['bot:state', 'bot:missing'], TRADING_STATE_SCHEMA)
+        return cold, updated, states, await adapter.get_records('bot:trades')
+
+    cold, updated, states, records = asyncio.run(scenario())
+    assert cold == defaults
+    assert updated == {'current_asset': 'USDT', 'entry_price': -1.5e-07}
+    # The transaction replaced the whole hash
+    assert states == {'bot:state': {'current_asset': 'ETH'}, 'bot:missing': None}
+    assert records == [record]
+
+
+def test_async_adapter_rebuilds_its_pool_on_a_new_event_loop():
+    adapter = AsyncRedisAdapter(max_connections=3)
+
+    async def client_on_this_loop():
+        # The same loop keeps its client
+        client = adapter.redis
+        assert adapter.redis is client
+        return client
+
+    first = asyncio.run(client_on_this_loop())
+    second = asyncio.run(client_on_this_loop())
+    assert first is not second
+    assert second.connection_pool.max_connections == 3
+    asyncio.run(adapter.close())
+    assert adapter._client is None
@@ -0,0 +1,156 @@
+# Python imports
+import asyncio
+from decimal import Decimal
+import pytest
+
+# App imports
+from src.adapters.exchange_metadata import (
+    TRADING_STATUS,
+    SymbolInfo,
+)
+from src.adapters.fakes import (
+    FakeBinanceClient,
+    FakeExchange,
+    FakeRedisAdapter,
+    FakeTelegramAdapter,
+)
+from src.domain.trading.exceptions import OrderPlacementError
+from src.domain.trading.routing import ConversionRouter
+from src.domain.trading.services import TradingDomainServices
+from src.domain.trading.value_objects import (
+    BUY_DIRECTION,
+    SELL_DIRECTION,
+    ConversionLeg,
+    ConversionRoute,
+)
+
+# (symbol, base, quote); PEPE only trades against FDUSD
+PAIRS = [
+    ('BTCUSDT', 'BTC', 'USDT'),
+    ('BTCFDUSD', 'BTC', 'FDUSD'),
+    ('FDUSDUSDT', 'FDUSD', 'USDT'),
+    ('ETHUSDT', 'ETH', 'USDT'),
+    ('ETHBTC', 'ETH', 'BTC'),
+    ('SOLUSDT', 'SOL', 'USDT'),
+    ('SOLBTC', 'SOL', 'BTC'),
+    ('PEPEFDUSD', 'PEPE', 'FDUSD'),
+]
+
+
+def listing(*delisted: str) -> dict:
+    return {
+        symbol: SymbolInfo(
+            symbol=symbol,
+            base_asset=base,
+            quote_asset=quote,
+            status=TRADING_STATUS,
+            step_size=Decimal('0.00001'),
+            min_qty=Decimal('0.00001'),
+            tick_size=Decimal('0.00000001'),
+            min_notional=Decimal('5'),
+        )
+        for symbol, base, quote in PAIRS
+        if symbol not in delisted
+    }
+
+
+def legs(route: ConversionRoute) -> list:
+    return [(leg.symbol, leg.side) for leg in route.legs]
+
+
+@pytest.fixture
+def router():
+    router = ConversionRouter()
+    router.update(listing())
+    router.precompute(['USDT', 'ETH', 'SOL', 'PEPE'])
+    return router
+
+
+def test_a_listed_pair_is_a_direct_route(router):
+    route = router.route('ETH', 'USDT')
+    assert route.is_direct
+    assert legs(route) == [('ETHUSDT', SELL_DIRECTION)]
+    # Edge costs are rounded to the cost precision
+    assert route.cost == pytest.approx(router.fee_rate, abs=1e-5)
+    assert legs(router.route('USDT', 'SOL')) == [('SOLUSDT', BUY_DIRECTION)]
+
+
+def test_assets_without_a_common_pair_are_routed_through_hubs(router):
+    route = router.route('PEPE', 'USDT')
+    assert legs(route) == [('PEPEFDUSD', SELL_DIRECTION), ('FDUSDUSDT', SELL_DIRECTION)]
+    assert [(leg.from_asset, leg.to_asset) for leg in route.legs] == [('PEPE', 'FDUSD'), ('FDUSD', 'USDT')]
+    # Each leg pays the fee once
+    assert route.cost == pytest.approx(1 - (1 - router.fee_rate) ** 2, abs=1e-5)
+    assert len(router.route('PEPE', 'ETH').legs) == 3
+    # Assets off the precomputed set are routed on demand
+    route = router.route('SOL', 'FDUSD')
+    assert len(route.legs) == 2 and route.legs[-1].to_asset == 'FDUSD'
+    assert router.route('ETH', 'DOGE') is None
+
+
+def test_a_wider_spread_moves_the_route_to_another_hub(router):
+    assert legs(router.route('SOL', 'ETH'))[0][0] in ('SOLUSDT', 'SOLBTC')
+    router.update(listing(), spreads={'SOLUSDT': 0.004, 'ETHUSDT': 0.004})
+    assert legs(router.route('SOL', 'ETH')) == [('SOLBTC', SELL_DIRECTION), ('ETHBTC', BUY_DIRECTION)]
+    router.update(listing(), spreads={'SOLBTC': 0.004, 'ETHBTC': 0.004})
+    assert legs(router.route('SOL', 'ETH')) == [('SOLUSDT', SELL_DIRECTION), ('ETHUSDT', BUY_DIRECTION)]
+    # Pairs wider than the limit are not routed through at all
+    router.update(listing(), spreads={'SOLUSDT': 0.05})
+    assert legs(router.route('SOL', 'USDT')) == [('SOLBTC', SELL_DIRECTION), ('BTCUSDT', SELL_DIRECTION)]
+
+
+def test_a_non_hub_pair_change_only_drops_the_routes_it_touches(router):
+    untouched = router.route('PEPE', 'ETH')
+    touched = router.route('SOL', 'USDT')
+    # Spread jitter below the cost precision is not a change
+    assert router.update(listing(), spreads={'SOLUSDT': 1e-9}) == 0
+    assert router.update(listing('SOLUSDT')) == 1
+    assert router.route('PEPE', 'ETH') is untouched
+    assert router.route('SOL', 'USDT') is not touched
+    assert legs(router.route('SOL', 'USDT')) == [('SOLBTC', SELL_DIRECTION), ('BTCUSDT', SELL_DIRECTION)]
+    # A pair between hubs can change every route
+    assert router.update(listing('SOLUSDT', 'FDUSDUSDT')) == 1
+    assert router.route('PEPE', 'ETH') is not untouched
+    assert legs(router.route('PEPE', 'USDT')) == [
+        ('PEPEFDUSD', SELL_DIRECTION),
+        ('BTCFDUSD', BUY_DIRECTION),
+        ('BTCUSDT', SELL_DIRECTION),
+    ]
+
+
+def test_a_failed_leg_parks_the_state_in_the_asset_held_at_that_point(monkeypatch):
+    client = FakeBinanceClient(symbols=['SOLUSDT', 'ETHUSDT'], balances={'SOL': 10.0})
+    exchange = FakeExchange(client)
+    services = TradingDomainServices(
+        exchange_client=exchange,
+        redis_client=FakeRedisAdapter(),
+        telegram_adapter=FakeTelegramAdapter(),
+        router=ConversionRouter(),
+    )
+    services.set_trading_state('SOL', entry_price=20.0)
+    place_order = exchange.create_order
+
+    def create_order(symbol: str, side: str, quantity: float, price=None):
+        if symbol == 'ETHUSDT':
+            raise ValueError("Filter failure: NOTIONAL")
+        return place_order(symbol, side, quantity, price=price)
+
+    monkeypatch.setattr(exchange, 'create_order', create_order)
+    route = ConversionRoute(
+        origin='SOL',
+        target='ETH',
+        legs=(
+            ConversionLeg(symbol='SOLUSDT', side=SELL_DIRECTION, from_asset='SOL', to_asset='USDT'),
+            ConversionLeg(symbol='ETHUSDT', side=BUY_DIRECTION, from_asset='USDT', to_asset='ETH'),
+        ),
+    )
+    usd_amount = 10.0 * exchange.get_symbol_ticker('SOLUSDT')
+    with pytest.raises(OrderPlacementError):
+        asyncio.run(services.execute_route(route, amount=10.0, usd_amount=usd_amount, profit=0.0))
+    assert [order['symbol'] for order in client.orders] == ['SOLUSDT']
+    state = services.get_trading_state()
+    assert state['current_asset'] == 'USDT'
+    # The USD value spent, per unit of USDT received net of the fee
+    assert state['entry_price'] == pytest.approx(1 / (1 - services.router.fee_rate), rel=1e-6)
+    # Only the leg that went through was recorded
+    assert [record['symbol'] for record in services.redis_client.get_records(services.trades_key)] == ['SOLUSDT']
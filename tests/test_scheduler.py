@@ -0,0 +1,180 @@
+# Python imports
+import asyncio
+import heapq
+import itertools
+import pytest
+
+# App imports
+from src.adapters.scheduler import (
+    MERGE_OVERRUNS,
+    SKIP_OVERRUNS,
+    CandleScheduler,
+    ScheduledJob,
+)
+
+# A 5m candle boundary, so also a 1m one
+BOUNDARY = 1_700_000_100.0
+PERIOD = 60.0
+OFFSET = 5.0
+# Bound on the sleeps a test may wake, so a scheduler spinning on one tick fails instead of hanging
+MAX_WAKE_UPS = 1000
+
+
+class FakeClock:
+    """Virtual wall clock whose sleeps wake in time order as soon as every task is idle"""
+
+    def __init__(self, now: float = BOUNDARY + 10):
+        self.now = now
+        # Seconds a sleep wakes after (or, when negative, before) its due time
+        self.lateness = 0.0
+        self._sleepers = []
+        self._order = itertools.count()
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + seconds + self.lateness, next(self._order), future))
+        await future
+
+    async def run_until(self, until: float):
+        """Wake the sleepers due up to `until`, one at a time, then move the clock there"""
+        for _ in range(MAX_WAKE_UPS):
+            await settle()
+            if not self._sleepers or self._sleepers[0][0] > until:
+                break
+            wake_at, _, future = heapq.heappop(self._sleepers)
+            self.now = wake_at
+            if not future.done():
+                future.set_result(None)
+        else:
+            raise AssertionError("sleepers keep waking up without the clock reaching its target")
+        self.now = until
+
+    async def drain(self):
+        """Wake every remaining sleeper without moving the clock, letting running jobs end"""
+        while self._sleepers:
+            _, _, future = heapq.heappop(self._sleepers)
+            if not future.done():
+                future.set_result(None)
+            await settle()
+
+
+async def settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def run_schedule(clock: FakeClock, until: float, job_seconds: float, overrun: str, fail: bool = False):
+    """Run a job taking `job_seconds` on a 1m schedule until `until`, returning its metrics and start times"""
+    scheduler = CandleScheduler(clock=clock, sleep=clock.sleep)
+    starts = []
+
+    async def job():
+        starts.append(clock.now - BOUNDARY)
+        await clock.sleep(job_seconds)
+        if fail:
+            raise RuntimeError("exchange unavailable")
+
+    async def scenario():
+        task = asyncio.create_task(scheduler.run())
+        await clock.run_until(until)
+        observed = scheduler.metrics()['job'], list(starts)
+        scheduler.stop()
+        await settle()
+        # Stopping waits for the run in progress
+        await clock.drain()
+        await task
+        return observed
+
+    scheduler.schedule(job, interval='1m', offset=OFFSET, overrun=overrun)
+    return asyncio.run(scenario())
+
+
+def test_next_fire_time_is_the_next_candle_close_plus_offset():
+    job = ScheduledJob('job', None, interval='5m', offset=OFFSET, overrun=SKIP_OVERRUNS)
+    assert job.next_fire_time(BOUNDARY + 3) == BOUNDARY + OFFSET
+    assert job.next_fire_time(BOUNDARY + OFFSET - 0.001) == BOUNDARY + OFFSET
+    # Strictly after: a tick that just fired is not due again
+    assert job.next_fire_time(BOUNDARY + OFFSET) == BOUNDARY + 300 + OFFSET
+    assert job.next_fire_time(BOUNDARY + 299) == BOUNDARY + 300 + OFFSET
+    hourly = ScheduledJob('job', None, interval='1h', offset=0, overrun=SKIP_OVERRUNS)
+    assert hourly.next_fire_time(BOUNDARY) % 3600 == 0
+    with pytest.raises(ValueError):
+        ScheduledJob('job', None, interval='7m', offset=0, overrun=SKIP_OVERRUNS)
+    with pytest.raises(ValueError):
+        ScheduledJob('job', None, interval='5m', offset=0, overrun='queue')
+
+
+def test_skip_drops_ticks_that_come_due_during_a_run():
+    # Ticks at +65, +125, +185, +245 and +305; every run takes two and a half periods
+    clock = FakeClock(now=BOUNDARY + OFFSET + 1)
+    metrics, starts = run_schedule(clock, BOUNDARY + 306, job_seconds=150, overrun=SKIP_OVERRUNS)
+    assert starts == [65, 245]
+    assert metrics['ticks'] == 5
+    assert metrics['skipped'] == 3
+    assert metrics['merged'] == 0
+    assert metrics['runs'] == 1
+
+
+def test_merge_folds_overdue_ticks_into_one_catch_up_run():
+    clock = FakeClock(now=BOUNDARY + OFFSET + 1)
+    metrics, starts = run_schedule(clock, BOUNDARY + 306, job_seconds=150, overrun=MERGE_OVERRUNS)
+    # The catch-up run starts as soon as the first one finishes
+    assert starts == [65, 215]
+    assert metrics['ticks'] == 5
+    assert metrics['merged'] == 4
+    assert metrics['skipped'] == 0
+    assert metrics['runs'] == 1
+
+
+def test_lag_metrics_track_late_wake_ups():
+    clock = FakeClock()
+    clock.lateness = 2.0
+    metrics, _ = run_schedule(clock, BOUNDARY + 70, job_seconds=1, overrun=SKIP_OVERRUNS)
+    assert metrics['last_lag'] == pytest.approx(2.0)
+    clock.lateness = 0.5
+    scheduler_metrics, _ = run_schedule(clock, BOUNDARY + 130, job_seconds=1, overrun=SKIP_OVERRUNS)
+    assert scheduler_metrics['last_lag'] == pytest.approx(0.5)
+
+
+def test_max_lag_and_failures_accumulate_across_ticks():
+    clock = FakeClock()
+    lags = iter([3.0, 0.25, 0.5])
+    sleep = clock.sleep
+
+    async def uneven_sleep(seconds: float):
+        # Only the scheduler's own sleeps run late here
+        clock.lateness = next(lags, 0.0) if seconds > 1 else 0.0
+        await sleep(seconds)
+
+    scheduler = CandleScheduler(clock=clock, sleep=uneven_sleep)
+
+    async def job():
+        raise RuntimeError("exchange unavailable")
+
+    async def scenario():
+        task = asyncio.create_task(scheduler.run())
+        await clock.run_until(BOUNDARY + 4 * PERIOD)
+        scheduler.stop()
+        await settle()
+        await clock.drain()
+        await task
+
+    scheduler.schedule(job, interval='1m', offset=OFFSET)
+    asyncio.run(scenario())
+    metrics = scheduler.metrics()['job']
+    assert metrics['ticks'] == 3
+    assert metrics['max_lag'] == pytest.approx(3.0)
+    assert metrics['last_lag'] == pytest.approx(0.5)
+    # Failing runs are counted and do not stop the schedule
+    assert metrics['failures'] == metrics['runs'] == 3
+
+
+def test_an_early_wake_up_does_not_fire_the_same_tick_twice():
+    clock = FakeClock()
+    clock.lateness = -0.01
+    metrics, starts = run_schedule(clock, BOUNDARY + 4 * PERIOD, job_seconds=1, overrun=SKIP_OVERRUNS)
+    assert metrics['ticks'] == 3
+    assert starts == pytest.approx([tick * PERIOD + OFFSET - 0.01 for tick in (1, 2, 3)])
@@ -0,0 +1,185 @@
+# Python imports
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from aiohttp import web
+
+# App imports
+from src.adapters.telegram import (
+    MESSAGE_SEPARATOR,
+    NotificationQueue,
+    TelegramAdapter,
+)
+
+TOKEN = '123:test'
+CHAT_ID = '42'
+
+
+class TelegramStandIn:
+    """Local stand-in for the Bot API `sendMessage` method, replying with scripted failures first"""
+
+    def __init__(self, failures=()):
+        # Each failure is a (status, payload) reply returned before messages are accepted
+        self.failures = list(failures)
+        self.messages = []
+        self.attempts = []
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(f"/bot{TOKEN}/sendMessage", self.send_message)
+        return app
+
+    async def send_message(self, request: web.Request) -> web.Response:
+        self.attempts.append(time.monotonic())
+        if self.failures:
+            status, payload = self.failures.pop(0)
+            return web.json_response(payload, status=status)
+        data = await request.post() if request.content_type != 'application/json' else await request.json()
+        self.messages.append(data['text'])
+        return web.json_response({
+            'ok': True,
+            'result': {
+                'message_id': len(self.messages),
+                'date': int(time.time()),
+                'chat': {'id': int(CHAT_ID), 'type': 'private'},
+                'text': data['text'],
+            },
+        })
+
+
+@asynccontextmanager
+async def serve(stand_in: TelegramStandIn, **queue_options):
+    runner = web.AppRunner(stand_in.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    adapter = TelegramAdapter(api_token=TOKEN, chat_id=CHAT_ID, base_url=f"http://127.0.0.1:{port}/bot")
+    adapter.notifications = NotificationQueue(telegram_adapter=adapter, **queue_options)
+    try:
+        yield adapter
+    finally:
+        await adapter.notifications.stop(timeout=1)
+        await runner.cleanup()
+
+
+def test_a_burst_is_coalesced_into_one_message():
+    stand_in = TelegramStandIn()
+
+    async def scenario():
+        async with serve(stand_in, coalesce_delay=0.05) as adapter:
+            for i in range(3):
+                await adapter.notify(f"order {i}")
+            await adapter.flush(timeout=5)
+            return adapter.notifications.sent
+
+    assert asyncio.run(scenario()) == 1
+    assert stand_in.messages == [MESSAGE_SEPARATOR.join(f"order {i}" for i in range(3))]
+
+
+def test_flood_control_is_honoured():
+    stand_in = TelegramStandIn(failures=[(429, {
+        'ok': False,
+        'error_code': 429,
+        'description': 'Too Many Requests: retry after 1',
+        'parameters': {'retry_after': 1},
+    })])
+
+    async def scenario():
+        async with serve(stand_in, coalesce_delay=0) as adapter:
+            await adapter.notify("order filled")
+            await adapter.flush(timeout=5)
+
+    asyncio.run(scenario())
+    assert stand_in.messages == ["order filled"]
+    assert stand_in.attempts[1] - stand_in.attempts[0] >= 1
+
+
+def test_network_errors_are_retried_with_backoff():
+    bad_gateway = (502, {'ok': False, 'error_code': 502, 'description': 'Bad Gateway'})
+    stand_in = TelegramStandIn(failures=[bad_gateway, bad_gateway])
+
+    async def scenario():
+        async with serve(stand_in, coalesce_delay=0, retry_delay=0.1) as adapter:
+            await adapter.notify("order filled")
+            await adapter.flush(timeout=5)
+
+    asyncio.run(scenario())
+    assert stand_in.messages == ["order filled"]
+    first_wait, second_wait = (later - earlier for earlier, later in zip(stand_in.attempts, stand_in.attempts[1:]))
+    assert first_wait >= 0.1
+    assert second_wait >= 0.2
+
+
+def test_a_message_is_dropped_after_the_last_retry():
+    bad_gateway = (502, {'ok': False, 'error_code': 502, 'description': 'Bad Gateway'})
+    stand_in = TelegramStandIn(failures=[bad_gateway] * 3)
+
+    async def scenario():
+        async with serve(stand_in, coalesce_delay=0, retry_delay=0.01, max_retries=2) as adapter:
+            await adapter.notify("lost")
+            await adapter.flush(timeout=5)
+            return adapter.notifications
+
+    notifications = asyncio.run(scenario())
+    assert stand_in.messages == []
+    assert len(stand_in.attempts) == 3
+    assert notifications.dropped == 1
+
+
+def test_the_oldest_message_is_dropped_when_the_queue_is_full():
+    stand_in = TelegramStandIn()
+
+    async def scenario():
+        async with serve(stand_in, max_size=2, coalesce_delay=0) as adapter:
+            # Queued before the drain task runs
+            for i in range(3):
+                adapter.notifications.enqueue(f"order {i}")
+            adapter.start()
+            await adapter.flush(timeout=5)
+            return adapter.notifications.dropped
+
+    assert asyncio.run(scenario()) == 1
+    assert stand_in.messages == [MESSAGE_SEPARATOR.join(["order 1", "order 2"])]
+
+
+def test_stop_delivers_pending_messages_and_ends_the_drain_task():
+    stand_in = TelegramStandIn()
+
+    async def scenario():
+        async with serve(stand_in, coalesce_delay=0.05) as adapter:
+            notifications = adapter.notifications
+            await adapter.notify("order filled")
+            await notifications.stop(timeout=5)
+            stopped = notifications._task is None
+            # Without a drain task, flush returns instead of waiting forever
+            notifications.enqueue("after stop")
+            started = time.monotonic()
+            await notifications.flush(timeout=5)
+            return stopped, time.monotonic() - started, len(notifications)
+
+    stopped, flush_seconds, pending = asyncio.run(scenario())
+    assert stopped
+    assert stand_in.messages == ["order filled"]
+    assert flush_seconds < 1
+    assert pending == 1
+
+
+def test_flush_gives_up_at_its_timeout():
+    stand_in = TelegramStandIn(failures=[(429, {
+        'ok': False,
+        'error_code': 429,
+        'description': 'Too Many Requests: retry after 5',
+        'parameters': {'retry_after': 5},
+    })])
+
+    async def scenario():
+        async with serve(stand_in, coalesce_delay=0) as adapter:
+            await adapter.notify("order filled")
+            started = time.monotonic()
+            await adapter.flush(timeout=0.3)
+            elapsed = time.monotonic() - started
+            adapter.notifications._task.cancel()
+            return elapsed
+
+    assert asyncio.run(scenario()) < 1
@@ -0,0 +1,118 @@
+# Python imports
+import threading
+import time
+import fakeredis
+import pytest
+
+# App imports
+from src.adapters.work_queue import (
+    JOB_ERROR,
+    RedisWorkQueue,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def analyze(payload: dict) -> dict:
+    if payload['symbol'] == 'BADUSDT':
+        raise ValueError("no candles")
+    return {'symbol': payload['symbol'], 'score': len(payload['symbol'])}
+
+
+def scan_jobs(*symbols: str) -> dict:
+    return {f"{symbol}:5m": {'symbol': symbol} for symbol in symbols}
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def queue(clock):
+    return RedisWorkQueue(fakeredis.FakeRedis(decode_responses=True), lease=30, max_attempts=2, clock=clock)
+
+
+def test_worker_thread_runs_queued_jobs(queue):
+    jobs = scan_jobs('ETHUSDT', 'SOLUSDT', 'TAOUSDT')
+    stop = threading.Event()
+    worker = threading.Thread(target=queue.serve, args=(analyze,), kwargs={'worker_id': 'w1', 'stop': stop})
+    worker.start()
+    try:
+        queue.enqueue(jobs)
+        deadline = time.monotonic() + 5
+        while len(queue.results(jobs)) < len(jobs) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert queue.live_workers() == 1
+    finally:
+        stop.set()
+        worker.join()
+    assert queue.results(jobs) == {job_id: analyze(payload) for job_id, payload in jobs.items()}
+    assert queue.live_workers() == 0
+
+
+def test_jobs_of_a_dead_worker_are_requeued_once_the_lease_expires(queue, clock):
+    jobs = scan_jobs('ETHUSDT', 'SOLUSDT')
+    queue.enqueue(jobs)
+    # A worker claims a job and dies before completing it
+    job_id, _ = queue.claim()
+    assert queue.requeue_expired() == 0
+    clock.now += queue.lease + 1
+    assert queue.requeue_expired() == 1
+    results = queue.gather(jobs, analyze, timeout=5)
+    assert results == {job_id: analyze(payload) for job_id, payload in jobs.items()}
+    assert queue.redis.llen(queue.processing_key) == 0
+
+
+def test_a_job_is_failed_once_it_runs_out_of_attempts(queue, clock):
+    jobs = scan_jobs('ETHUSDT')
+    queue.enqueue(jobs)
+    for _ in range(queue.max_attempts):
+        queue.claim()
+        clock.now += queue.lease + 1
+        queue.requeue_expired()
+    assert queue.claim() is None
+    assert JOB_ERROR in queue.results(jobs)['ETHUSDT:5m']
+
+
+def test_a_failing_symbol_does_not_fail_the_others(queue):
+    jobs = scan_jobs('ETHUSDT', 'BADUSDT', 'SOLUSDT')
+    queue.enqueue(jobs)
+    results = queue.gather(jobs, analyze, timeout=5)
+    assert results['BADUSDT:5m'] == {JOB_ERROR: "no candles"}
+    assert results['ETHUSDT:5m'] == analyze({'symbol': 'ETHUSDT'})
+    assert results['SOLUSDT:5m'] == analyze({'symbol': 'SOLUSDT'})
+
+
+def test_enqueueing_a_known_job_is_a_no_op(queue):
+    jobs = scan_jobs('ETHUSDT', 'SOLUSDT')
+    assert queue.enqueue(jobs) == 2
+    assert queue.enqueue(jobs) == 0
+    assert queue.redis.llen(queue.pending_key) == 2
+    queue.gather(jobs, analyze, timeout=5)
+    # Finished jobs are not run again by a concurrent coordinator either
+    assert queue.enqueue({**jobs, **scan_jobs('TAOUSDT')}) == 1
+    assert queue.redis.lrange(queue.pending_key, 0, -1) == ['TAOUSDT:5m']
+
+
+@pytest.mark.parametrize('job_timeout', [None, 0.2])
+def test_gather_stops_claiming_jobs_it_cannot_finish_before_the_deadline(queue, job_timeout):
+    def slow_analyze(payload: dict) -> dict:
+        time.sleep(0.2)
+        return analyze(payload)
+
+    jobs = scan_jobs('ETHUSDT', 'SOLUSDT', 'TAOUSDT')
+    queue.enqueue(jobs)
+    started = time.monotonic()
+    results = queue.gather(jobs, slow_analyze, timeout=0.5, job_timeout=job_timeout)
+    elapsed = time.monotonic() - started
+    assert elapsed < 0.55
+    assert len(results) == 2
+    # The job left over stays queued for the workers
+    assert queue.redis.llen(queue.pending_key) == 1